@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from fract.model.bet import BettingSystem
+from fract.model.ensemble import Ensemble
+from fract.model.ewma import Ewma
+from fract.model.feature import LogReturnFeature
+from fract.model.kalman import Kalman
+from fract.model.sieve import LRFeatureSieve
+from fract.model.standalone import StandaloneTrader
+from fract.util.candle import CandleFrame
+from fract.util.kalmanfilter import KalmanFilterOptimizer
+from fract.util.synthetic import generate_candle_df, generate_tick_df
+
+logging.disable(logging.CRITICAL)
+
+GRANULARITIES = [
+    'TICK', 'S5', 'S10', 'S15', 'S30', 'M1', 'M2', 'M3', 'M5', 'M10', 'M15',
+    'M30', 'H1'
+]
+FEATURE_TYPES = {
+    'LR': 'Log Return', 'LRV': 'LR Velocity', 'LRA': 'LR Acceleration'
+}
+LENGTHS = [500, 1000, 5000]
+
+
+def read_default_config():
+    with open(
+            Path(__import__('fract').__file__).parent.joinpath(
+                'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        return yaml.safe_load(f)
+
+
+def generate_history_dict(count, granularities=None, seed=0):
+    end_time = pd.Timestamp('2020-01-06 12:00:00', tz='UTC')
+    return {
+        g: (
+            generate_tick_df(count=count, end_time=end_time, seed=seed).assign(
+                volume=1
+            ) if g == 'TICK' else generate_candle_df(
+                count=count, granularity=g, end_time=end_time, seed=seed
+            )
+        ) for g in (granularities or GRANULARITIES)
+    }
+
+
+class TimeLogReturnFeature(object):
+    params = (list(FEATURE_TYPES.keys()), LENGTHS)
+    param_names = ['feature', 'length']
+
+    def setup(self, feature, length):
+        self.lrf = LogReturnFeature(type=FEATURE_TYPES[feature])
+        self.df_rate = generate_candle_df(count=length, seed=0)
+
+    def time_series(self, feature, length):
+        self.lrf.series(df_rate=self.df_rate)
+
+
+class TimeLRFeatureSieve(object):
+    params = LENGTHS
+    param_names = ['length']
+
+    def setup(self, length):
+        self.lrfs = LRFeatureSieve(type='LR Velocity')
+        self.history_dict = generate_history_dict(count=length)
+
+    def time_extract_best_feature(self, length):
+        self.lrfs.extract_best_feature(history_dict=self.history_dict)
+
+
+class TimeDetectSignal(object):
+    params = (['ewma', 'kalman', 'ewma,kalman'], LENGTHS)
+    param_names = ['model', 'length']
+    timeout = 300
+
+    def setup(self, model, length):
+        cf = read_default_config()
+        self.ai = (
+            Ensemble(config_dict=cf, models=model.split(','))
+            if ',' in model
+            else (Ewma if model == 'ewma' else Kalman)(config_dict=cf)
+        )
+        self.history_dict = generate_history_dict(count=length)
+
+    def time_detect_signal(self, model, length):
+        self.ai.detect_signal(history_dict=self.history_dict)
+
+
+class TimeDetectSignals(object):
+    params = ([1, 4, 16], LENGTHS)
+    param_names = ['n_instruments', 'length']
+    timeout = 300
+
+    def setup(self, n_instruments, length):
+        self.ai = Ewma(config_dict=read_default_config())
+        self.history_by_instrument = {
+            f'I{k}': {
+                g: CandleFrame.from_df(df=d)
+                for g, d in generate_history_dict(count=length, seed=k).items()
+            } for k in range(n_instruments)
+        }
+
+    def time_detect_signal_loop(self, n_instruments, length):
+        for h in self.history_by_instrument.values():
+            self.ai.detect_signal(history_dict=h)
+
+    def time_detect_signals(self, n_instruments, length):
+        self.ai.detect_signals(
+            history_by_instrument=self.history_by_instrument
+        )
+
+
+class TimeKalmanFilterOptimizer(object):
+    params = LENGTHS
+    param_names = ['length']
+    timeout = 300
+
+    def setup(self, length):
+        self.y = LogReturnFeature(type='LR Velocity').series(
+            df_rate=generate_candle_df(count=(length + 1), seed=0)
+        ).dropna()
+
+    def time_optimize(self, length):
+        KalmanFilterOptimizer(y=self.y, pmv_ratio=1).optimize()
+
+    def time_optimize_steady_state(self, length):
+        KalmanFilterOptimizer(
+            y=self.y, pmv_ratio=1, steady_state=True
+        ).optimize()
+
+
+class TrackKalmanSteadyState(object):
+    params = ([1e-3, 1, 1e3], LENGTHS)
+    param_names = ['pmv_ratio', 'length']
+    unit = 'relative error'
+
+    def setup(self, pmv_ratio, length):
+        self.y = LogReturnFeature(type='LR Velocity').series(
+            df_rate=generate_candle_df(count=(length + 1), seed=0)
+        ).dropna()
+
+    def track_loss_error(self, pmv_ratio, length):
+        log_var = np.log(np.var(self.y))
+        return max([
+            abs(f / e - 1) for e, f in [
+                [
+                    KalmanFilterOptimizer._loss(
+                        a, self.y, 0, 1e-8, pmv_ratio, s
+                    ) for s in [False, True]
+                ] for a in np.linspace(log_var - 10, log_var + 5, 16)
+            ]
+        ])
+
+
+class TimeBettingSystem(object):
+    params = (
+        ['Martingale', 'Paroli', "d'Alembert", "Oscar's grind"],
+        [100, 1000, 10000]
+    )
+    param_names = ['strategy', 'n_txn']
+
+    def setup(self, strategy, n_txn):
+        self.bs = BettingSystem(strategy=strategy)
+        pl = generate_candle_df(count=n_txn, seed=0)['bid'].diff().fillna(0)
+        self.txns = [
+            {'pl': str(p), 'units': str((-1) ** n * 1000)}
+            for n, p in enumerate(pl * 1e6)
+        ]
+
+    def time_calculate_size_by_pl(self, strategy, n_txn):
+        self.bs.calculate_size_by_pl(
+            unit_size=1000, inst_pl_txns=self.txns, init_size=1000
+        )
+
+
+class TimeUpdateCaches(object):
+    params = LENGTHS
+    param_names = ['cache']
+
+    def setup(self, cache):
+        cf = read_default_config()
+        cf['feature']['cache'] = cache
+        self.trader = StandaloneTrader(
+            model='ewma', config_dict=cf, instruments=['EUR_USD'], quiet=True
+        )
+        df_tick = generate_tick_df(count=(cache + 100), seed=0).assign(
+            instrument='EUR_USD'
+        )
+        self.df_ticks = [df_tick.iloc[[n]] for n in range(len(df_tick))]
+        for df_rate in self.df_ticks[:cache]:
+            self.trader.update_caches(df_rate=df_rate)
+
+    def time_update_caches(self, cache):
+        for df_rate in self.df_ticks[-100:]:
+            self.trader.update_caches(df_rate=df_rate)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+
+import subprocess
+import sys
+
+
+def timeraw_import_fract():
+    return 'import fract'
+
+
+def timeraw_import_fract_cli():
+    return 'import fract.cli.main'
+
+
+def timeraw_import_fract_trader():
+    return 'import fract.call.trader'
+
+
+class TimeCommand(object):
+    repeat = 10
+    number = 1
+
+    def time_version(self):
+        self._run_fract('--version')
+
+    def time_help(self):
+        self._run_fract('--help')
+
+    @staticmethod
+    def _run_fract(*args):
+        subprocess.run(
+            [sys.executable, '-c', 'from fract.cli.main import main; main()']
+            + list(args),
+            stdout=subprocess.DEVNULL, check=True
+        )
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import json
+import os
+
+import numpy as np
+import redis
+
+from fract.util.shmring import TickRingReader, TickRingWriter
+
+INSTRUMENT = 'EUR_USD'
+
+
+class TimeTickTransport(object):
+    params = (['redis', 'shm'], [1, 100, 1000])
+    param_names = ['transport', 'ticks']
+
+    def setup(self, transport, ticks):
+        t0 = np.datetime64('2020-01-06T12:00:00', 'ns').astype(np.int64)
+        self.ticks = [
+            (int(t0 + k * 250000000), 1.1 + k * 1e-5, 1.1001 + k * 1e-5)
+            for k in range(ticks)
+        ]
+        if transport == 'redis':
+            self.redis_c = redis.StrictRedis(
+                host=os.getenv('REDIS_HOST', '127.0.0.1'), db=15
+            )
+            try:
+                self.redis_c.ping()
+            except redis.exceptions.ConnectionError:
+                raise NotImplementedError('Redis is not available')
+            self.redis_c.delete(INSTRUMENT)
+            self.messages = [
+                {
+                    'instrument': INSTRUMENT,
+                    'time': str(np.datetime64(t, 'ns')) + 'Z',
+                    'closeoutBid': str(b), 'closeoutAsk': str(a),
+                    'tradeable': True
+                } for t, b, a in self.ticks
+            ]
+        else:
+            name = f'fract_bench_{os.getpid()}'
+            self.writer = TickRingWriter(instruments=[INSTRUMENT], name=name)
+            self.reader = TickRingReader(instruments=[INSTRUMENT], name=name)
+            self.reader.read(instrument=INSTRUMENT)
+
+    def teardown(self, transport, ticks):
+        if transport == 'redis':
+            self.redis_c.delete(INSTRUMENT)
+        else:
+            self.reader.close()
+            self.writer.close()
+
+    def time_roundtrip(self, transport, ticks):
+        if transport == 'redis':
+            for m in self.messages:
+                self.redis_c.rpush(INSTRUMENT, json.dumps(m))
+            rates = [
+                json.loads(s) for s in self.redis_c.lrange(INSTRUMENT, 0, -1)
+            ]
+            for _ in rates:
+                self.redis_c.lpop(INSTRUMENT)
+            np.array([
+                (float(r['closeoutBid']), float(r['closeoutAsk']))
+                for r in rates
+            ])
+        else:
+            for t, b, a in self.ticks:
+                self.writer.write(
+                    instrument=INSTRUMENT, time_ns=t, bid=b, ask=a
+                )
+            self.reader.read(instrument=INSTRUMENT)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import json
+import logging
+from pathlib import Path
+
+import pandas as pd
+from oandacli.util.config import read_yml
+
+from ..model.backtest import Backtester
+from ..util.candle import read_candle_df
+
+
+def invoke_backtest(config_yml, data_path, instruments=None, model='ewma',
+                    granularity='S5', csv_path=None, print_json=False,
+                    quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Backtesting')
+    cf = read_yml(path=config_yml)
+    insts = (instruments or cf['instruments'])
+    backtester = Backtester(
+        config_dict=cf, model=model, granularity=granularity
+    )
+    summaries = dict()
+    df_trades = list()
+    for i in insts:
+        df_rate = read_candle_df(
+            data_path=data_path, instrument=i, granularity=granularity
+        )
+        logger.info(f'Run a backtest:\t{i} ({len(df_rate)} candles)')
+        res = backtester.run(df_rate=df_rate)
+        summaries[i] = res['summary']
+        df_trades.append(res['df_trade'].assign(instrument=i))
+    if csv_path:
+        csv = Path(csv_path).resolve()
+        logger.info(f'Write trades:\t{csv}')
+        pd.concat(df_trades).to_csv(csv, index=False)
+    if not quiet:
+        if print_json:
+            print(json.dumps(summaries, indent=2))
+        else:
+            with pd.option_context('display.max_columns', None):
+                print(pd.DataFrame.from_dict(summaries, orient='index'))
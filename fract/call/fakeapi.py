@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import logging
+
+from oandacli.util.config import read_yml
+
+from ..util.candle import read_candle_df
+from ..util.fakeapi import (INSTRUMENTS, FakeV20Account, FakeV20Backend,
+                            FakeV20Server)
+from ..util.synthetic import SyntheticMarket
+
+
+def invoke_fake_api(config_yml, instruments=None, host='127.0.0.1',
+                    port=8080, latency_sec=0, rate_limit=None, seed=0,
+                    data_path=None, granularity='S5'):
+    logger = logging.getLogger(__name__)
+    cf = read_yml(path=config_yml)
+    insts = (instruments or INSTRUMENTS)
+    df_rates = (
+        {
+            i: read_candle_df(
+                data_path=data_path, instrument=i, granularity=granularity
+            ) for i in insts
+        } if data_path else None
+    )
+    market = SyntheticMarket(
+        instruments=insts, df_rates=df_rates, seed=int(seed)
+    )
+    backend = FakeV20Backend(
+        account=FakeV20Account(
+            account_id=cf['oanda']['account_id'], market=market
+        )
+    )
+    server = FakeV20Server(
+        backend=backend, host=host, port=port, latency_sec=latency_sec,
+        rate_limit=rate_limit
+    )
+    logger.info(f'Serve a fake V20 API:\thttp://{host}:{port}')
+    print(f'Serving a fake V20 API on http://{host}:{port} (Ctrl-C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import json
+import logging
+
+import pandas as pd
+
+from ..util.recording import ReplayMismatchError, SessionPlayer
+
+
+def invoke_replay(recording_path, print_json=False, quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Replay a recorded session')
+    player = SessionPlayer(path=recording_path)
+    meta = player.meta
+    player.close()
+    for k in ['checkpoint', 'candle_archive', 'async_order']:
+        if meta.get(k):
+            logger.warning(f'Recorded with {k}; decisions may diverge')
+    kwargs = {
+        'model': meta['model'], 'config_dict': meta['config'],
+        'instruments': meta['instruments'], 'interval_sec': 0,
+        'timeout_sec': None, 'paper': meta['paper'],
+        'replay_path': recording_path, 'quiet': True,
+        'ignore_api_error': meta['ignore_api_error'],
+        'dry_run': meta['dry_run']
+    }
+    if meta['standalone']:
+        from ..model.standalone import StandaloneTrader
+        trader = StandaloneTrader(**kwargs)
+    else:
+        from ..model.kvs import RedisTrader
+        trader = RedisTrader(**kwargs)
+    summary = trader.replay()
+    if not quiet:
+        if print_json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print(pd.Series(summary).to_string())
+    n_mismatch = summary['decision_mismatches'] + summary['order_mismatches']
+    if n_mismatch:
+        raise ReplayMismatchError(f'replay mismatches:\t{n_mismatch}')
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import os
+
+import pandas as pd
+from oandacli.util.config import read_yml
+
+from ..util.fakeapi import INSTRUMENTS, FakeV20Account, FakeV20Backend
+from ..util.memory import MemoryGrowthError, MemoryMonitor
+from ..util.synthetic import SimulatedClock, SyntheticMarket
+
+
+def invoke_soak(config_yml, instruments=None, model='ewma', hours=1,
+                step_sec=5, snapshots=10, max_growth_mb=64, top=10, seed=0,
+                print_json=False, quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Soak test')
+    cf = read_yml(path=config_yml)
+    n_turn = max(int(float(hours) * 3600 / float(step_sec)), 1)
+    n_snapshot = max(int(snapshots), 2)
+    clock = SimulatedClock(step_sec=float(step_sec))
+    backend = FakeV20Backend(
+        account=FakeV20Account(
+            account_id=cf['oanda']['account_id'],
+            market=SyntheticMarket(
+                instruments=sorted({*INSTRUMENTS, *(instruments or [])}),
+                seed=int(seed), clock=clock
+            )
+        )
+    )
+    monitor = MemoryMonitor()
+    monitor.start()
+    from ..model.standalone import StandaloneTrader
+    trader = StandaloneTrader(
+        model=model, config_dict=cf, instruments=instruments,
+        interval_sec=0, timeout_sec=None, fake_backend=backend, quiet=True
+    )
+    # the first snapshot is taken after a warm-up turn fills the caches
+    warmup = max(n_turn // (n_snapshot * 2), 1)
+    at = {
+        warmup + (n_turn - warmup) * k // (n_snapshot - 1)
+        for k in range(n_snapshot)
+    }
+    try:
+        for t in range(1, n_turn + 1):
+            trader._trade_once()
+            clock.advance()
+            if t == warmup:
+                monitor.snapshot(baseline=True, turn=t, sim_hours=0.0)
+            elif t in at:
+                monitor.snapshot(
+                    turn=t, sim_hours=(t - warmup) * clock.step_sec / 3600
+                )
+    finally:
+        trader.shutdown()
+        monitor.stop()
+    growth = monitor.growth()
+    df_top = monitor.top_sites(n=top)
+    if not quiet:
+        if print_json:
+            print(
+                json.dumps(
+                    {
+                        'snapshots': monitor.rows, 'growth': growth,
+                        'top_sites': df_top.to_dict(orient='records')
+                    },
+                    indent=2
+                )
+            )
+        else:
+            print(
+                monitor.summary_df().set_index('turn').to_string()
+                + os.linesep * 2 + pd.Series(growth).to_string()
+                + os.linesep * 2 + df_top.to_string(index=False)
+            )
+    if growth['rss_mb'] > float(max_growth_mb):
+        raise MemoryGrowthError(
+            'memory growth exceeds {0} MB:\t{1:.1f} MB'.format(
+                max_growth_mb, growth['rss_mb']
+            )
+        )
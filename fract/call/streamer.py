@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import logging
+
+import numpy as np
+from oandacli.call.streamer import StreamDriver
+from oandacli.util.config import read_yml
+
+from ..util.api import create_api
+from ..util.shmring import TickRingWriter
+
+
+class TickRingRecorder(StreamDriver):
+    def __init__(self, api, account_id, instruments, timeout_sec=0,
+                 ignore_api_error=False, shm_name='fract', shm_capacity=4096,
+                 quiet=False):
+        super().__init__(
+            api=api, account_id=account_id, target='pricing',
+            instruments=instruments, timeout_sec=timeout_sec, snapshot=True,
+            ignore_api_error=ignore_api_error
+        )
+        self.__logger = logging.getLogger(__name__)
+        self.__quiet = quiet
+        self.__ring = TickRingWriter(
+            instruments=instruments, name=shm_name, capacity=shm_capacity
+        )
+
+    def act(self, msg_type, msg):
+        if msg_type == 'pricing.ClientPrice':
+            self.__ring.write(
+                instrument=msg.instrument,
+                time_ns=np.datetime64(msg.time.rstrip('Z'), 'ns').astype(
+                    np.int64
+                ),
+                bid=float(msg.closeoutBid), ask=float(msg.closeoutAsk),
+                tradeable=bool(msg.tradeable)
+            )
+            if not self.__quiet:
+                print(msg.json(), flush=True)
+        else:
+            self.__logger.debug(msg)
+
+    def invoke(self):
+        try:
+            super().invoke()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.__ring.close()
+
+
+def invoke_shm_streamer(config_yml, target='pricing', instruments=None,
+                        timeout_sec=0, shm_name='fract', shm_capacity=4096,
+                        ignore_api_error=False, quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Streaming into shared-memory tick rings')
+    if target != 'pricing':
+        raise ValueError(f'invalid target for tick rings:\t{target}')
+    cf = read_yml(path=config_yml)
+    streamer = TickRingRecorder(
+        api=create_api(config=cf, stream=True),
+        account_id=cf['oanda']['account_id'],
+        instruments=(instruments or cf['instruments']),
+        timeout_sec=timeout_sec, ignore_api_error=ignore_api_error,
+        shm_name=shm_name, shm_capacity=int(shm_capacity), quiet=quiet
+    )
+    streamer.invoke()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+from oandacli.util.config import read_yml
+
+from ..model.sweep import ParameterSweeper
+from ..util.candle import read_candle_df
+
+
+def invoke_sweep(config_yml, spec_yml, data_path, instruments=None,
+                 model='ewma', granularity='S5', processes=None,
+                 csv_path=None, quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Parameter sweep')
+    cf = read_yml(path=config_yml)
+    sweeper = ParameterSweeper(
+        config_dict=cf, spec_dict=read_yml(path=spec_yml), model=model,
+        granularity=granularity, processes=processes
+    )
+    df_result = sweeper.run(
+        df_rates={
+            i: read_candle_df(
+                data_path=data_path, instrument=i, granularity=granularity
+            ) for i in (instruments or cf['instruments'])
+        }
+    )
+    if csv_path:
+        csv = Path(csv_path).resolve()
+        logger.info(f'Write results:\t{csv}')
+        df_result.to_csv(csv)
+    if not quiet:
+        with pd.option_context('display.max_rows', None,
+                               'display.max_columns', None):
+            print(df_result)
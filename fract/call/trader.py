@@ -4,34 +4,49 @@ import logging
 
 from oandacli.util.config import read_yml
 
-from ..model.kvs import RedisTrader
-from ..model.standalone import StandaloneTrader
-
 
 def invoke_trader(config_yml, instruments=None, model='ewma', interval_sec=0,
                   timeout_sec=3600, standalone=False, redis_host=None,
-                  redis_port=6379, redis_db=0, log_dir_path=None,
-                  ignore_api_error=False, quiet=False, dry_run=False):
+                  redis_port=6379, redis_db=0, use_shm=False,
+                  shm_name='fract', log_dir_path=None, journal_path=None,
+                  checkpoint_path=None, candle_archive_path=None,
+                  timing=False, metrics_port=None, async_order=False,
+                  paper=False, record_path=None, profile_turns=None,
+                  print_json=False, ignore_api_error=False, quiet=False,
+                  dry_run=False):
     logger = logging.getLogger(__name__)
     logger.info('Autonomous trading')
     cf = read_yml(path=config_yml)
     if standalone:
+        from ..model.standalone import StandaloneTrader
         trader = StandaloneTrader(
             model=model, config_dict=cf, instruments=instruments,
             interval_sec=interval_sec, timeout_sec=timeout_sec,
-            log_dir_path=log_dir_path, ignore_api_error=ignore_api_error,
-            quiet=quiet, dry_run=False
+            log_dir_path=log_dir_path, journal_path=journal_path,
+            checkpoint_path=checkpoint_path,
+            candle_archive_path=candle_archive_path, timing=timing,
+            metrics_port=metrics_port, async_order=async_order, paper=paper,
+            record_path=record_path, profile_turns=profile_turns,
+            print_json=print_json, ignore_api_error=ignore_api_error,
+            quiet=quiet, dry_run=dry_run
         )
     else:
+        from ..model.kvs import RedisTrader
         rd = cf['redis'] if 'redis' in cf else {}
         trader = RedisTrader(
             model=model, config_dict=cf, instruments=instruments,
             redis_host=(redis_host or rd.get('host')),
             redis_port=(redis_port or rd.get('port')),
             redis_db=(redis_db if redis_db is not None else rd.get('db')),
+            shm_name=(shm_name if use_shm else None),
             interval_sec=interval_sec, timeout_sec=timeout_sec,
-            log_dir_path=log_dir_path, ignore_api_error=ignore_api_error,
-            quiet=quiet, dry_run=False
+            log_dir_path=log_dir_path, journal_path=journal_path,
+            checkpoint_path=checkpoint_path,
+            candle_archive_path=candle_archive_path, timing=timing,
+            metrics_port=metrics_port, async_order=async_order, paper=paper,
+            record_path=record_path, profile_turns=profile_turns,
+            print_json=print_json, ignore_api_error=ignore_api_error,
+            quiet=quiet, dry_run=dry_run
         )
     logger.info('Invoke a trader')
     trader.invoke()
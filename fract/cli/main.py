@@ -14,7 +14,8 @@ Usage:
     fract stream [--debug|--info] [--file=<yaml>] [--target=<str>]
                  [--timeout=<sec>] [--csv=<path>] [--sqlite=<path>]
                  [--use-redis] [--redis-host=<ip>] [--redis-port=<int>]
-                 [--redis-db=<int>] [--redis-max-llen=<int>]
+                 [--redis-db=<int>] [--redis-max-llen=<int>] [--use-shm]
+                 [--shm-name=<str>] [--shm-capacity=<int>]
                  [--ignore-api-error] [--quiet] [<instrument>...]
     fract transaction [--debug|--info] [--file=<yaml>] [--from=<date>]
                       [--to=<date>] [--csv=<path>] [--sqlite=<path>]
@@ -26,8 +27,27 @@ Usage:
     fract open [--debug|--info] [--file=<yaml>] [--model=<str>]
                [--interval=<sec>] [--timeout=<sec>] [--standalone]
                [--redis-host=<ip>] [--redis-port=<int>] [--redis-db=<int>]
-               [--log-dir=<path>] [--ignore-api-error] [--quiet] [--dry-run]
-               [<instrument>...]
+               [--use-shm] [--shm-name=<str>] [--log-dir=<path>]
+               [--journal=<path>] [--checkpoint=<path>]
+               [--candle-archive=<path>] [--timing] [--metrics-port=<int>]
+               [--async-order] [--paper] [--record=<path>]
+               [--profile=<int>] [--ignore-api-error] [--json] [--quiet]
+               [--dry-run] [<instrument>...]
+    fract backtest [--debug|--info] [--file=<yaml>] [--model=<str>]
+                   [--granularity=<code>] [--csv=<path>] [--json] [--quiet]
+                   <data_path> [<instrument>...]
+    fract sweep [--debug|--info] [--file=<yaml>] [--model=<str>]
+                [--granularity=<code>] [--processes=<int>] [--csv=<path>]
+                [--quiet] <spec_path> <data_path> [<instrument>...]
+    fract fakeapi [--debug|--info] [--file=<yaml>] [--host=<ip>]
+                  [--port=<int>] [--latency=<sec>] [--rate-limit=<int>]
+                  [--seed=<int>] [--granularity=<code>] [--data=<path>]
+                  [<instrument>...]
+    fract replay [--debug|--info] [--json] [--quiet] <recording_path>
+    fract soak [--debug|--info] [--file=<yaml>] [--model=<str>]
+               [--hours=<float>] [--step=<sec>] [--snapshots=<int>]
+               [--max-growth=<mb>] [--top=<int>] [--seed=<int>] [--json]
+               [--quiet] [<instrument>...]
 
 Options:
     -h, --help          Print help and exit
@@ -40,7 +60,8 @@ Options:
     --granularity=<code>
                         Set a granularity for rate tracking [default: S5]
     --count=<int>       Set a size for rate tracking (max: 5000) [default: 60]
-    --json              Print data with JSON
+    --json              Print data with JSON (and write logs as JSON lines
+                        with `open`)
     --target=<str>      Set a streaming target [default: pricing]
                         { pricing, transaction }
     --timeout=<sec>     Set senconds for response timeout
@@ -51,15 +72,56 @@ Options:
     --redis-db=<int>    Set a Redis database (override YAML configurations)
     --redis-max-llen=<int>
                         Limit Redis list length (override YAML configurations)
+    --use-shm           Pass prices through shared-memory ring buffers on the
+                        same host instead of Redis (`stream` then writes
+                        only the rings)
+    --shm-name=<str>    Set a name prefix for the ring buffers [default: fract]
+    --shm-capacity=<int>
+                        Set ticks kept per instrument ring [default: 4096]
     --ignore-api-error  Ignore Oanda API connection errors
-    --model=<str>       Set trading models [default: ewma]
+    --model=<str>       Set trading models (comma-separated for an ensemble,
+                        e.g., ewma,kalman) [default: ewma]
     --interval=<sec>    Wait seconds between iterations [default: 0]
     --standalone        Invoke a trader with standalone mode
     --log-dir=<path>    Write output log files in a directory
+    --journal=<path>    Write rates, signals, orders, and transactions into an
+                        SQLite3 journal
+    --checkpoint=<path> Save trader state periodically into a file and restore
+                        it at startup
+    --candle-archive=<path>
+                        Cache candles in memory-mapped files in a directory
+                        shared across processes
+    --timing            Record per-stage latency histograms (p50/p95/p99)
+    --metrics-port=<int>
+                        Serve Prometheus metrics on a local port
+    --async-order       Place orders from a worker thread with a prioritized
+                        queue (closes before opens, newest signal wins)
+    --paper             Simulate fills, limits, and the account in-process
+                        against live prices instead of placing orders
+    --record=<path>     Record V20 responses, Redis tick batches, clock reads,
+                        and decisions into a gzipped JSON-lines file
+    --profile=<int>     Sample stacks over the first N trading cycles and
+                        write collapsed stacks into --log-dir (SIGUSR1 starts
+                        the same for a running trader; N defaults to 100)
     --dry-run           Invoke a trader with dry-run mode
     --from=<date>       Specify the starting time
     --to=<date>         Specify the ending time
     --pl-graph=<path>   Visualize PL in a graphics file such as PDF or PNG
+    --processes=<int>   Set the number of worker processes
+    --host=<ip>         Set a host to bind [default: 127.0.0.1]
+    --port=<int>        Set a port to bind [default: 8080]
+    --latency=<sec>     Delay each response by seconds [default: 0]
+    --rate-limit=<int>  Reject requests over a rate per second with HTTP 429
+    --seed=<int>        Set a random seed for synthetic prices [default: 0]
+    --data=<path>       Replay candles from a CSV or SQLite file (or a
+                        directory of CSV files written by `fract track`)
+    --hours=<float>     Set simulated hours to trade [default: 1]
+    --step=<sec>        Advance the simulated clock by seconds per cycle
+                        [default: 5]
+    --snapshots=<int>   Set the number of memory snapshots [default: 10]
+    --max-growth=<mb>   Fail if RSS grows by more megabytes after warm-up
+                        [default: 64]
+    --top=<int>         Print the top allocation sites by growth [default: 10]
 
 Commands:
     init                Create a YAML template for configuration
@@ -71,6 +133,15 @@ Commands:
     spread              Print the ratios of spread to price
     close               Close positions (if not <instrument>, close all)
     open                Invoke an autonomous trader
+    backtest            Replay historical candles through a trading model
+                        on --granularity only (no granularity selection;
+                        balance, sizes, and P/L in the quote currency)
+    sweep               Evaluate model and position parameters on historical
+                        candles
+    fakeapi             Serve a local stand-in for the Oanda V20 REST API
+    replay              Replay a recorded session and check decisions
+    soak                Trade synthetic prices in simulated time and check
+                        memory growth
 
 Arguments:
     <info_target>       { instruments, prices, account, accounts, orders,
@@ -88,8 +159,13 @@ Arguments:
                           USD_CNH, USD_CZK, USD_DKK, USD_HKD, USD_HUF, USD_INR,
                           USD_JPY, USD_MXN, USD_NOK, USD_PLN, USD_SAR, USD_SEK,
                           USD_SGD, USD_THB, USD_TRY, USD_ZAR, ZAR_JPY }
-    <data_path>         Path to an input CSV or SQLite file
+    <data_path>         Path to an input CSV or SQLite file (or a directory
+                        of CSV files written by `fract track` or of
+                        candle archives written by `fract open`)
     <graph_path>        Path to an output graphics file such as PDF or PNG
+    <spec_path>         Path to a YAML of a grid or random search over
+                        configuration keys (e.g., model.ewma.alpha)
+    <recording_path>    Path to a session recorded by `fract open --record`
 """
 
 import logging
@@ -97,17 +173,19 @@ import os
 from pathlib import Path
 
 from docopt import docopt
-from oandacli.cli.main import execute_command
-from oandacli.util.config import fetch_config_yml_path, write_config_yml
-from oandacli.util.logger import set_log_config
 
 from .. import __version__
-from ..call.trader import invoke_trader
+from ..util.logger import set_log_config
 
 
 def main():
     args = docopt(__doc__, version=f'fract {__version__}')
-    set_log_config(debug=args['--debug'], info=args['--info'])
+    set_log_config(
+        debug=args['--debug'], info=args['--info'],
+        json_lines=(args['open'] and args['--json'])
+    )
+    # heavy modules are imported after parsing to keep command startup fast
+    from oandacli.util.config import fetch_config_yml_path, write_config_yml
     logger = logging.getLogger(__name__)
     logger.debug(f'args:{os.linesep}{args}')
     config_yml_path = fetch_config_yml_path(
@@ -123,14 +201,75 @@ def main():
             )
         )
     elif args['open']:
+        from ..call.trader import invoke_trader
         invoke_trader(
             config_yml=config_yml_path, instruments=args['<instrument>'],
             model=args['--model'], interval_sec=args['--interval'],
             timeout_sec=args['--timeout'], standalone=args['--standalone'],
             redis_host=args['--redis-host'], redis_port=args['--redis-port'],
-            redis_db=args['--redis-db'], log_dir_path=args['--log-dir'],
+            redis_db=args['--redis-db'], use_shm=args['--use-shm'],
+            shm_name=args['--shm-name'], log_dir_path=args['--log-dir'],
+            journal_path=args['--journal'],
+            checkpoint_path=args['--checkpoint'],
+            candle_archive_path=args['--candle-archive'],
+            timing=args['--timing'],
+            metrics_port=args['--metrics-port'],
+            async_order=args['--async-order'], paper=args['--paper'],
+            record_path=args['--record'],
+            profile_turns=args['--profile'], print_json=args['--json'],
             ignore_api_error=args['--ignore-api-error'], quiet=args['--quiet'],
             dry_run=args['--dry-run']
         )
+    elif args['backtest']:
+        from ..call.backtest import invoke_backtest
+        invoke_backtest(
+            config_yml=config_yml_path, data_path=args['<data_path>'],
+            instruments=args['<instrument>'], model=args['--model'],
+            granularity=args['--granularity'], csv_path=args['--csv'],
+            print_json=args['--json'], quiet=args['--quiet']
+        )
+    elif args['sweep']:
+        from ..call.sweep import invoke_sweep
+        invoke_sweep(
+            config_yml=config_yml_path, spec_yml=args['<spec_path>'],
+            data_path=args['<data_path>'], instruments=args['<instrument>'],
+            model=args['--model'], granularity=args['--granularity'],
+            processes=args['--processes'], csv_path=args['--csv'],
+            quiet=args['--quiet']
+        )
+    elif args['stream'] and args['--use-shm']:
+        from ..call.streamer import invoke_shm_streamer
+        invoke_shm_streamer(
+            config_yml=config_yml_path, target=args['--target'],
+            instruments=args['<instrument>'], timeout_sec=args['--timeout'],
+            shm_name=args['--shm-name'], shm_capacity=args['--shm-capacity'],
+            ignore_api_error=args['--ignore-api-error'], quiet=args['--quiet']
+        )
+    elif args['fakeapi']:
+        from ..call.fakeapi import invoke_fake_api
+        invoke_fake_api(
+            config_yml=config_yml_path, instruments=args['<instrument>'],
+            host=args['--host'], port=args['--port'],
+            latency_sec=args['--latency'], rate_limit=args['--rate-limit'],
+            seed=args['--seed'], data_path=args['--data'],
+            granularity=args['--granularity']
+        )
+    elif args['replay']:
+        from ..call.replay import invoke_replay
+        invoke_replay(
+            recording_path=args['<recording_path>'], print_json=args['--json'],
+            quiet=args['--quiet']
+        )
+    elif args['soak']:
+        from ..call.soak import invoke_soak
+        invoke_soak(
+            config_yml=config_yml_path, instruments=args['<instrument>'],
+            model=args['--model'], hours=args['--hours'],
+            step_sec=args['--step'], snapshots=args['--snapshots'],
+            max_growth_mb=args['--max-growth'], top=args['--top'],
+            seed=args['--seed'], print_json=args['--json'],
+            quiet=args['--quiet']
+        )
     else:
+        from oandacli.cli.main import execute_command
         execute_command(args=args, config_yml_path=config_yml_path)
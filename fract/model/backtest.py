@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+
+import logging
+import time
+from math import ceil
+
+import numpy as np
+import pandas as pd
+
+from ..util.candle import granularity2offset
+from .bet import BettingSystem
+from .feature import LogReturnFeature
+
+
+class Backtester(object):
+    def __init__(self, config_dict, model='ewma', granularity='S5',
+                 balance=1000000, margin_rate=0.04, chunk_size=1024):
+        self.__logger = logging.getLogger(__name__)
+        self.cf = config_dict
+        self.__granularity = granularity
+        self.__init_balance = float(balance)
+        self.__margin_rate = float(margin_rate)
+        self.__chunk_size = int(chunk_size)
+        self.__n_cache = int(self.cf['feature']['cache'])
+        if model == 'ewma':
+            from .ewma import Ewma
+            self.__ai = Ewma(config_dict=self.cf)
+        elif model == 'kalman':
+            from .kalman import Kalman
+            self.__ai = Kalman(config_dict=self.cf)
+        elif ',' in model:
+            from .ensemble import Ensemble
+            self.__ai = Ensemble(config_dict=self.cf, models=model.split(','))
+        else:
+            raise ValueError(f'invalid model name:\t{model}')
+        self.__lrf = LogReturnFeature(
+            type=self.cf['feature']['type'], drop_zero=(model == 'kalman')
+        )
+        self.__bs = BettingSystem(strategy=self.cf['position']['bet'])
+
+    def compute_feature(self, df_rate):
+        return self.__lrf.series(df_rate=df_rate).dropna()
+
+    def run(self, df_rate, feature=None):
+        t0 = time.time()
+        len_r = len(df_rate)
+        sig_dir = self.__ai.signal_frame(
+            series=(self.compute_feature(df_rate=df_rate)
+                    if feature is None else feature)
+        )['sig_dir'].reindex(range(len_r)).ffill().fillna(0).to_numpy(
+            dtype=np.int8
+        )
+        sig_dir[:(self.__n_cache - 1)] = 0
+        bid = df_rate['bid'].to_numpy(dtype=float)
+        ask = df_rate['ask'].to_numpy(dtype=float)
+        bars = {
+            'sig_dir': sig_dir, 'bid': bid, 'ask': ask,
+            't_sec': df_rate.index.asi8 / 1e9,
+            'awake': self._calculate_volatility_states(df_rate=df_rate),
+            'over_spread': (
+                (ask - bid) / (ask + bid) * 2
+                >= self.cf['position']['limit_price_ratio']['max_spread']
+            )
+        }
+        trades = self._simulate(bars=bars)
+        df_trade = pd.DataFrame(
+            trades,
+            columns=[
+                'entry_index', 'exit_index', 'side', 'units', 'entry_price',
+                'exit_price', 'pl', 'reason'
+            ]
+        ).astype(
+            {'entry_index': int, 'exit_index': int}
+        ).assign(
+            entry_time=lambda d: df_rate.index[d['entry_index']],
+            exit_time=lambda d: df_rate.index[d['exit_index']]
+        ).drop(columns=['entry_index', 'exit_index'])
+        summary = self._summarize(df_trade=df_trade)
+        summary['elapsed_sec'] = time.time() - t0
+        self.__logger.info(f'summary:\t{summary}')
+        return {'summary': summary, 'df_trade': df_trade}
+
+    def _calculate_volatility_states(self, df_rate):
+        vcf = self.cf['volatility']
+        if not vcf['sleeping']:
+            return np.ones(len(df_rate), dtype=bool)
+        else:
+            offset = max(
+                granularity2offset(vcf['granularity']),
+                granularity2offset(self.__granularity)
+            )
+            df_v = df_rate.resample(offset).agg(
+                {'ask': 'last', 'bid': 'last', 'volume': 'sum'}
+            ).dropna()
+            v = (
+                np.log(df_v[['ask', 'bid']].mean(axis=1)).diff().rolling(
+                    window=int(vcf['window'])
+                ).std(ddof=0) * df_v['volume']
+            )
+            awake = (
+                v > v.rolling(
+                    window=int(vcf['cache']), min_periods=1
+                ).quantile(vcf['sleeping'])
+            )
+            awake.index = awake.index + offset
+            return awake.reindex(
+                df_rate.index, method='ffill'
+            ).fillna(False).to_numpy(dtype=bool)
+
+    def _simulate(self, bars):
+        pcf = self.cf['position']
+        openable = np.flatnonzero(
+            (bars['sig_dir'] != 0) & bars['awake'] & ~bars['over_spread']
+        )
+        balance = self.__init_balance
+        trades = list()
+        txns = list()
+        i = 0
+        while balance > 0:
+            k = np.searchsorted(openable, i)
+            if k == openable.size:
+                break
+            j = openable[k]
+            mult = (
+                -1 if (
+                    pcf['side'] == 'contrarian' or (
+                        pcf['side'] == 'auto' and txns
+                        and txns[-1]['pl'] < 0
+                    )
+                ) else 1
+            )
+            side = int(bars['sig_dir'][j]) * mult
+            entry = (bars['ask'] if side > 0 else bars['bid'])[j]
+            units = self._design_units(
+                balance=balance, price=(bars['ask'][j] + bars['bid'][j]) / 2,
+                txns=txns
+            )
+            exit_j, exit_price, reason = self._find_exit(
+                bars=bars, entry_index=j, side=side, mult=mult,
+                limits=self._design_limits(price=entry, side=side)
+            )
+            pl = units * side * (exit_price - entry)
+            balance += pl
+            trades.append(
+                (j, exit_j, side, units, entry, exit_price, pl, reason)
+            )
+            txns.append({'pl': pl, 'units': -units * side})
+            if reason == 'END':
+                break
+            else:
+                i = exit_j
+        return trades
+
+    def _design_units(self, balance, price, txns):
+        ratios = self.cf['position']['margin_nav_ratio']
+        unit_cost = price * self.__margin_rate
+        avail_size = max(
+            ceil(balance * (1 - ratios['preserve']) / unit_cost), 0
+        )
+        bet_size = self.__bs.calculate_size_by_pl(
+            unit_size=ceil(balance * ratios['unit'] / unit_cost),
+            inst_pl_txns=txns,
+            init_size=ceil(balance * ratios['init'] / unit_cost)
+        )
+        return int(min(bet_size, avail_size))
+
+    def _design_limits(self, price, side):
+        lpr = self.cf['position']['limit_price_ratio']
+        return {
+            'take_profit': price * (1 + side * lpr['take_profit']),
+            'stop_loss': price * (1 - side * lpr['stop_loss']),
+            'trailing_stop': price * lpr['trailing_stop']
+        }
+
+    def _find_exit(self, bars, entry_index, side, mult, limits):
+        len_b = bars['sig_dir'].size
+        px_all = (bars['bid'] if side > 0 else bars['ask'])
+        best = px_all[entry_index]
+        last_same = bars['t_sec'][entry_index]
+        ttl_sec = self.cf['position']['ttl_sec']
+        a = entry_index + 1
+        size = self.__chunk_size
+        while a < len_b:
+            b = min(a + size, len_b)
+            px = px_all[a:b]
+            eff = bars['sig_dir'][a:b] * mult
+            t_sec = bars['t_sec'][a:b]
+            if side > 0:
+                ref = np.maximum.accumulate(np.maximum(px, best))
+                ts_price = ref - limits['trailing_stop']
+                tp_hit = px >= limits['take_profit']
+                sl_hit = px <= limits['stop_loss']
+                ts_hit = px <= ts_price
+            else:
+                ref = np.minimum.accumulate(np.minimum(px, best))
+                ts_price = ref + limits['trailing_stop']
+                tp_hit = px <= limits['take_profit']
+                sl_hit = px >= limits['stop_loss']
+                ts_hit = px >= ts_price
+            opposite = (eff == -side)
+            refreshed = np.maximum.accumulate(
+                np.maximum(np.where(eff == side, t_sec, -np.inf), last_same)
+            )
+            expired = (eff == 0) & (t_sec - refreshed > ttl_sec)
+            closing = opposite & ~bars['awake'][a:b]
+            reversing = (
+                opposite & bars['awake'][a:b] & ~bars['over_spread'][a:b]
+            )
+            hits = sl_hit | ts_hit | tp_hit | expired | closing | reversing
+            if hits.any():
+                h = int(np.argmax(hits))
+                for hit, price, reason in [
+                        (sl_hit, limits['stop_loss'], 'STOP_LOSS'),
+                        (ts_hit, ts_price[h], 'TRAILING_STOP_LOSS'),
+                        (tp_hit, limits['take_profit'], 'TAKE_PROFIT'),
+                        (expired, px[h], 'POSITION EXPIRED'),
+                        (closing, px[h], 'CLOSING'),
+                        (reversing, px[h], 'REVERSING')
+                ]:
+                    if hit[h]:
+                        return a + h, price, reason
+            best = ref[-1]
+            last_same = refreshed[-1]
+            a = b
+            size *= 2
+        return len_b - 1, px_all[-1], 'END'
+
+    def _summarize(self, df_trade):
+        pl = df_trade['pl'].to_numpy()
+        equity = self.__init_balance + np.cumsum(pl)
+        peak = np.maximum.accumulate(np.append(self.__init_balance, equity))
+        drawdown = (peak[1:] - equity) if pl.size else np.zeros(1)
+        return {
+            'n_trade': int(pl.size), 'n_win': int((pl > 0).sum()),
+            'pl': float(pl.sum()),
+            'max_drawdown': float(drawdown.max()),
+            'max_drawdown_ratio': float(
+                (drawdown / peak[1:]).max() if pl.size else 0
+            ),
+            'balance': float(equity[-1] if pl.size else self.__init_balance)
+        }
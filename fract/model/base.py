@@ -4,39 +4,106 @@ import json
 import logging
 import os
 import signal
+import threading
 import time
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
-from math import ceil
 from pathlib import Path
 from pprint import pformat
 
 import numpy as np
 import pandas as pd
 import yaml
-from oandacli.util.config import create_api, log_response
+from oandacli.util.config import log_response
 from v20 import V20ConnectionError, V20Timeout
 
+from ..util.api import create_api
+from ..util.archive import CandleArchive
+from ..util.candle import CandleFrame, granularity2offset
+from ..util.checkpoint import read_checkpoint, write_checkpoint
+from ..util.conversion import ConversionIndex
+from ..util.execution import OrderExecutor
+from ..util.journal import TradeJournal
+from ..util.latency import LatencyHistogram, LatencyRecorder
+from ..util.metrics import MetricsRegistry
+from ..util.orderspec import OrderSpec
+from ..util.paper import PaperBroker
+from ..util.profiler import SamplingProfiler
+from ..util.ratelimit import TokenBucket
+from ..util.recording import RecordingExhausted, SessionPlayer, SessionRecorder
+from ..util.scheduler import ActivityScheduler
 from .bet import BettingSystem
-from .ewma import Ewma
-from .kalman import Kalman
 
 
 class APIResponseError(RuntimeError):
     pass
 
 
+class _LazyYaml(object):
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return yaml.dump(self.data, default_flow_style=False).strip()
+
+
+class _LazyJson(_LazyYaml):
+    __slots__ = ()
+
+    def __str__(self):
+        return json.dumps(self.data, default=str)
+
+
 class TraderCore(object):
     def __init__(self, config_dict, instruments, log_dir_path=None,
-                 quiet=False, dry_run=False):
+                 journal_path=None, checkpoint_path=None,
+                 candle_archive_path=None, timing=False, metrics_port=None,
+                 async_order=False, paper=False, record_path=None,
+                 replay_path=None, profile_turns=None, print_json=False,
+                 fake_backend=None, quiet=False, dry_run=False):
         self.__logger = logging.getLogger(__name__)
         self.cf = config_dict
-        self.__api = create_api(config=self.cf)
+        self.metrics = MetricsRegistry(enabled=bool(metrics_port))
+        self.recorder = (
+            SessionRecorder(path=record_path) if record_path else None
+        )
+        self.player = (
+            SessionPlayer(path=replay_path) if replay_path else None
+        )
+        self.__fake_backend = fake_backend
+        if self.player:
+            self.__api = self.player.wrap_api(create_api(config=self.cf))
+        else:
+            api = (
+                fake_backend.wrap_api(create_api(config=self.cf))
+                if fake_backend else TokenBucket(
+                    rate=self.cf['oanda'].get('rate_limit', 100),
+                    capacity=self.cf['oanda'].get('burst')
+                ).wrap_api(
+                    self.metrics.instrument_api(create_api(config=self.cf))
+                )
+            )
+            self.__api = (
+                self.recorder.wrap_api(api) if self.recorder else api
+            )
         self.__account_id = self.cf['oanda']['account_id']
         self.instruments = (instruments or self.cf['instruments'])
+        if self.recorder:
+            self.recorder.write(
+                'meta', config={
+                    **self.cf, 'oanda': {**self.cf['oanda'], 'token': None}
+                },
+                instruments=self.instruments, paper=paper, dry_run=dry_run,
+                async_order=async_order, checkpoint=bool(checkpoint_path),
+                candle_archive=bool(candle_archive_path)
+            )
         self.__bs = BettingSystem(strategy=self.cf['position']['bet'])
         self.__quiet = quiet
+        self.__print_json = print_json
         self.__dry_run = dry_run
+        self.__paper = (PaperBroker() if paper else None)
         if log_dir_path:
             log_dir = Path(log_dir_path).resolve()
             self.__log_dir_path = str(log_dir)
@@ -60,6 +127,30 @@ class TraderCore(object):
             self.__log_dir_path = None
             self.__order_log_path = None
             self.__txn_log_path = None
+        self.__journal = (
+            TradeJournal(path=journal_path) if journal_path else None
+        )
+        self.__checkpoint_path = checkpoint_path
+        self.feature_dtype = np.dtype(
+            self.cf['feature'].get('dtype', 'float64')
+        )
+        self.__candle_archive = (
+            CandleArchive(dir_path=candle_archive_path)
+            if candle_archive_path else None
+        )
+        self.__checkpoint_sec = 60
+        self.__last_checkpoint = time.monotonic()
+        self.latency = LatencyRecorder(
+            enabled=timing, log_dir_path=self.__log_dir_path,
+            metrics=self.metrics
+        )
+        if metrics_port:
+            self.metrics.serve(port=metrics_port)
+        self.profiler = SamplingProfiler(
+            log_dir_path=self.__log_dir_path, turns=(profile_turns or 100)
+        )
+        if profile_turns:
+            self.profiler.start()
         self.__last_txn_id = None
         self.pos_dict = dict()
         self.balance = None
@@ -67,34 +158,79 @@ class TraderCore(object):
         self.__account_currency = None
         self.txn_list = list()
         self.__inst_dict = dict()
+        self.__order_specs = dict()
+        self.signal_times = dict()
+        self.__conv_index = None
         self.price_dict = dict()
         self.unit_costs = dict()
+        self.__lock = threading.RLock()
+        self.__order_versions = dict()
+        self.__executor = (
+            OrderExecutor(
+                execute=self._execute_order_step, metrics=self.metrics
+            ) if async_order else None
+        )
 
     def _refresh_account_dicts(self):
-        res = self.__api.account.get(accountID=self.__account_id)
-        # log_response(res, logger=self.__logger)
-        if 'account' in res.body:
-            acc = res.body['account']
+        if self.__paper and self.__paper.is_open:
+            acc = self.__paper.account_dict()
         else:
-            raise APIResponseError(
-                'unexpected response:' + os.linesep + pformat(res.body)
-            )
-        self.balance = float(acc.balance)
-        self.margin_avail = float(acc.marginAvailable)
-        self.__account_currency = acc.currency
+            res = self.__api.account.get(accountID=self.__account_id)
+            # log_response(res, logger=self.__logger)
+            if 'account' in res.body:
+                a = res.body['account']
+            else:
+                raise APIResponseError(
+                    'unexpected response:' + os.linesep + pformat(res.body)
+                )
+            acc = {
+                'currency': a.currency, 'balance': float(a.balance),
+                'marginAvailable': float(a.marginAvailable),
+                'positions': {
+                    p.instrument: (
+                        {'side': 'long', 'units': int(p.long.units)}
+                        if p.long.tradeIDs
+                        else {'side': 'short', 'units': int(p.short.units)}
+                    ) for p in a.positions
+                    if p.long.tradeIDs or p.short.tradeIDs
+                }
+            }
+            if self.__paper:
+                self.__paper.open_account(
+                    balance=acc['balance'], currency=acc['currency'],
+                    last_txn_id=(
+                        self.__last_txn_id
+                        or res.body.get('lastTransactionID')
+                    )
+                )
+                acc = self.__paper.account_dict()
+        self.balance = acc['balance']
+        self.margin_avail = acc['marginAvailable']
+        self.__account_currency = acc['currency']
         pos_dict0 = self.pos_dict
-        self.pos_dict = {
-            p.instrument: (
-                {'side': 'long', 'units': int(p.long.units)} if p.long.tradeIDs
-                else {'side': 'short', 'units': int(p.short.units)}
-            ) for p in acc.positions if p.long.tradeIDs or p.short.tradeIDs
-        }
+        self.pos_dict = acc['positions']
         for i, d in self.pos_dict.items():
             p0 = pos_dict0.get(i)
             if p0 and all([p0[k] == d[k] for k in ['side', 'units']]):
                 self.pos_dict[i]['dt'] = p0['dt']
             else:
-                self.pos_dict[i]['dt'] = datetime.now()
+                self.pos_dict[i]['dt'] = self._now()
+
+    def _now(self):
+        if self.player:
+            return self.player.now()
+        elif self.recorder:
+            return self.recorder.now()
+        elif self.__fake_backend:
+            return datetime.fromtimestamp(self.__fake_backend.market.clock())
+        else:
+            return datetime.now()
+
+    def _trace(self, kind, **data):
+        if self.player:
+            self.player.check(kind, **data)
+        elif self.recorder:
+            self.recorder.write(kind, **data)
 
     def _place_order(self, closing=False, **kwargs):
         if closing:
@@ -108,59 +244,111 @@ class TraderCore(object):
             }
         else:
             f_args = {'accountID': self.__account_id, **kwargs}
-        if self.__dry_run:
+        func = ('position.close' if closing else 'order.create')
+        i = self._order_instrument(f_args)
+        t_sig = self.signal_times.pop(i, None)
+        if t_sig is not None:
+            self.latency.observe(
+                'signal_to_submit', sec=(time.perf_counter() - t_sig),
+                instrument=i
+            )
+        with self.latency.span('place_order', instrument=i):
+            self._call_order_api(func=func, f_args=f_args)
+
+    def _call_order_api(self, func, f_args):
+        self._trace('order', func=func, args=f_args)
+        if self.__paper:
+            status, body = (
+                self.__paper.close_position(
+                    instrument=f_args['instrument'],
+                    long_units=f_args.get('longUnits', 'ALL'),
+                    short_units=f_args.get('shortUnits', 'ALL')
+                ) if func == 'position.close'
+                else self.__paper.create_order(order=f_args['order'])
+            )
+            raw_body = json.dumps(body)
+            self.__logger.info(f'Paper order:\t{status} {raw_body}')
+            if self.__journal:
+                self.__journal.write_order(
+                    instrument=self._order_instrument(f_args),
+                    timestamp=datetime.now(), func=func, status=status,
+                    body=raw_body
+                )
+            if not (100 <= status <= 399):
+                raise APIResponseError(
+                    'unexpected response:' + os.linesep + pformat(body)
+                )
+            elif self.__order_log_path:
+                self._write_data(raw_body, path=self.__order_log_path)
+        elif self.__dry_run:
             self.__logger.info(
-                os.linesep + pformat({
-                    'func': ('position.close' if closing else 'order.create'),
-                    'args': f_args
-                })
+                '%s%s', os.linesep, pformat({'func': func, 'args': f_args})
             )
+            if self.__journal:
+                self.__journal.write_order(
+                    instrument=self._order_instrument(f_args),
+                    timestamp=datetime.now(), func=func, body=f_args
+                )
         else:
-            if closing:
+            if func == 'position.close':
                 res = self.__api.position.close(**f_args)
             else:
                 res = self.__api.order.create(**f_args)
             log_response(res, logger=self.__logger)
+            if self.__journal:
+                self.__journal.write_order(
+                    instrument=self._order_instrument(f_args),
+                    timestamp=datetime.now(), func=func, status=res.status,
+                    body=res.raw_body
+                )
             if not (100 <= res.status <= 399):
                 raise APIResponseError(
                     'unexpected response:' + os.linesep + pformat(res.body)
                 )
             elif self.__order_log_path:
                 self._write_data(res.raw_body, path=self.__order_log_path)
-            else:
-                time.sleep(0.5)
+
+    @staticmethod
+    def _order_instrument(f_args):
+        return f_args.get('instrument') or f_args['order']['instrument']
 
     def refresh_oanda_dicts(self):
-        t0 = datetime.now()
-        self._refresh_account_dicts()
-        self._sleep(last=t0, sec=0.5)
-        self._refresh_txn_list()
-        self._sleep(last=t0, sec=1)
-        self._refresh_inst_dict()
-        self._sleep(last=t0, sec=1.5)
-        self._refresh_price_dict()
-        self._refresh_unit_costs()
+        with self.__lock:
+            if self.__executor:
+                self.__order_versions = self.__executor.versions()
+            self._refresh_account_dicts()
+            self._refresh_txn_list()
+            self._refresh_inst_dict()
+            self._refresh_price_dict()
+            self._refresh_unit_costs()
 
     def _refresh_txn_list(self):
-        res = (
-            self.__api.transaction.since(
-                accountID=self.__account_id, id=self.__last_txn_id
-            ) if self.__last_txn_id
-            else self.__api.transaction.list(accountID=self.__account_id)
-        )
-        # log_response(res, logger=self.__logger)
-        if 'lastTransactionID' in res.body:
-            self.__last_txn_id = res.body['lastTransactionID']
+        if self.__paper:
+            t_new, self.__last_txn_id = self.__paper.transactions_since(
+                txn_id=self.__last_txn_id
+            )
         else:
-            raise APIResponseError(
-                'unexpected response:' + os.linesep + pformat(res.body)
+            res = (
+                self.__api.transaction.since(
+                    accountID=self.__account_id, id=self.__last_txn_id
+                ) if self.__last_txn_id
+                else self.__api.transaction.list(accountID=self.__account_id)
             )
-        if res.body.get('transactions'):
-            t_new = [t.dict() for t in res.body['transactions']]
-            self.print_log(yaml.dump(t_new, default_flow_style=False).strip())
+            # log_response(res, logger=self.__logger)
+            if 'lastTransactionID' in res.body:
+                self.__last_txn_id = res.body['lastTransactionID']
+            else:
+                raise APIResponseError(
+                    'unexpected response:' + os.linesep + pformat(res.body)
+                )
+            t_new = [t.dict() for t in res.body.get('transactions') or list()]
+        if t_new:
+            self.print_log(t_new if self.__print_json else _LazyYaml(t_new))
             self.txn_list = self.txn_list + t_new
             if self.__txn_log_path:
                 self._write_data(json.dumps(t_new), path=self.__txn_log_path)
+            if self.__journal:
+                self.__journal.write_transactions(t_new)
 
     def _refresh_inst_dict(self):
         res = self.__api.account.instruments(accountID=self.__account_id)
@@ -169,6 +357,12 @@ class TraderCore(object):
             self.__inst_dict = {
                 c.name: vars(c) for c in res.body['instruments']
             }
+            self.__order_specs = {
+                i: OrderSpec(
+                    instrument=i, inst_entry=self.__inst_dict[i],
+                    position_config=self.cf['position']
+                ) for i in self.instruments if i in self.__inst_dict
+            }
         else:
             raise APIResponseError(
                 'unexpected response:' + os.linesep + pformat(res.body)
@@ -193,51 +387,80 @@ class TraderCore(object):
             )
 
     def _refresh_unit_costs(self):
+        if not (self.__conv_index and self.__conv_index.matches(
+                instruments=self.__inst_dict.keys(),
+                account_currency=self.__account_currency)):
+            self.__conv_index = ConversionIndex(
+                instruments=self.__inst_dict.keys(),
+                account_currency=self.__account_currency,
+                targets=set(self.instruments)
+            )
+        bpvs = self.__conv_index.bp_values(
+            prices=[
+                self.price_dict.get(i, {'ask': np.nan})['ask']
+                for i in self.__conv_index.instruments
+            ]
+        )
         self.unit_costs = {
-            i: self._calculate_bp_value(instrument=i) * float(e['marginRate'])
-            for i, e in self.__inst_dict.items() if i in self.instruments
+            i: v * self.__order_specs[i].margin_rate
+            for i, v in zip(self.__conv_index.targets, bpvs)
         }
-
-    def _calculate_bp_value(self, instrument):
-        cur_pair = instrument.split('_')
-        if cur_pair[0] == self.__account_currency:
-            bpv = 1 / self.price_dict[instrument]['ask']
-        elif cur_pair[1] == self.__account_currency:
-            bpv = self.price_dict[instrument]['ask']
-        else:
-            bpv = None
-            for i in self.__inst_dict.keys():
-                if bpv:
-                    break
-                elif i == cur_pair[0] + '_' + self.__account_currency:
-                    bpv = self.price_dict[i]['ask']
-                elif i == self.__account_currency + '_' + cur_pair[0]:
-                    bpv = 1 / self.price_dict[i]['ask']
-                elif i == cur_pair[1] + '_' + self.__account_currency:
-                    bpv = (
-                        self.price_dict[instrument]['ask']
-                        * self.price_dict[i]['ask']
-                    )
-                elif i == self.__account_currency + '_' + cur_pair[1]:
-                    bpv = (
-                        self.price_dict[instrument]['ask']
-                        / self.price_dict[i]['ask']
-                    )
-            assert bpv, f'bp value calculatiton failed:\t{instrument}'
-        return bpv
+        if self.__paper:
+            self.__paper.update(
+                prices={
+                    i: self.price_dict[i] for i in self.__conv_index.targets
+                    if i in self.price_dict
+                },
+                bp_values=dict(zip(self.__conv_index.targets, bpvs)),
+                margin_rates={
+                    i: self.__order_specs[i].margin_rate
+                    for i in self.__conv_index.targets
+                }
+            )
 
     def design_and_place_order(self, instrument, act):
         pos = self.pos_dict.get(instrument)
-        if pos and act and (act == 'closing' or act != pos['side']):
-            self.__logger.info('Close a position:\t{}'.format(pos['side']))
+        steps = [
+            *(
+                [('close',)]
+                if pos and act and (act == 'closing' or act != pos['side'])
+                else list()
+            ),
+            *([('open', act)] if act in ['long', 'short'] else list())
+        ]
+        if self.__executor:
+            self.__executor.check()
+            # an empty step list cancels an order pending from an older turn
+            self.__executor.submit(
+                instrument=instrument, steps=steps,
+                version=self.__order_versions.get(instrument, 0)
+            )
+        else:
+            for s in steps:
+                self._execute_order_step(*s, instrument=instrument)
+
+    def _execute_order_step(self, step, side=None, instrument=None):
+        if step == 'close':
+            with self.__lock:
+                pos = self.pos_dict.get(instrument)
+            if not pos:
+                self.__logger.info('No position to close:\t%s', instrument)
+                return
+            self.__logger.info('Close a position:\t%s', pos['side'])
             self._place_order(closing=True, instrument=instrument)
-            self._refresh_txn_list()
-        if act in ['long', 'short']:
-            limits = self._design_order_limits(instrument=instrument, side=act)
-            self.__logger.debug(f'limits:\t{limits}')
-            units = self._design_order_units(instrument=instrument, side=act)
-            self.__logger.debug(f'units:\t{units}')
-            self.__logger.info(f'Open a order:\t{act}')
+            with self.__lock:
+                self._refresh_txn_list()
+        else:
+            with self.__lock:
+                limits = self._design_order_limits(
+                    instrument=instrument, side=side
+                )
+                self.__logger.debug('limits:\t%s', limits)
+                units = self._design_order_units(
+                    instrument=instrument, side=side
+                )
+                self.__logger.debug('units:\t%s', units)
+            self.__logger.info('Open a order:\t%s', side)
             self._place_order(
                 order={
                     'type': 'MARKET', 'instrument': instrument, 'units': units,
@@ -246,59 +469,20 @@ class TraderCore(object):
             )
 
     def _design_order_limits(self, instrument, side):
-        ie = self.__inst_dict[instrument]
-        r = self.price_dict[instrument][{'long': 'ask', 'short': 'bid'}[side]]
-        ts_range = [
-            float(ie['minimumTrailingStopDistance']),
-            float(ie['maximumTrailingStopDistance'])
-        ]
-        ts_dist_ratio = int(
-            r * self.cf['position']['limit_price_ratio']['trailing_stop'] /
-            ts_range[0]
+        return self.__order_specs[instrument].limits(
+            price=self.price_dict[instrument][
+                {'long': 'ask', 'short': 'bid'}[side]
+            ],
+            side=side
         )
-        if ts_dist_ratio <= 1:
-            trailing_stop = ie['minimumTrailingStopDistance']
-        else:
-            ts_dist = np.float16(ts_range[0] * ts_dist_ratio)
-            if ts_dist >= ts_range[1]:
-                trailing_stop = ie['maximumTrailingStopDistance']
-            else:
-                trailing_stop = str(ts_dist)
-        tp = {
-            k: str(
-                np.float16(
-                    r + r * v * {
-                        'take_profit': {'long': 1, 'short': -1}[side],
-                        'stop_loss': {'long': -1, 'short': 1}[side]
-                    }[k]
-                )
-            ) for k, v in self.cf['position']['limit_price_ratio'].items()
-            if k in ['take_profit', 'stop_loss']
-        }
-        tif = {'timeInForce': 'GTC'}
-        return {
-            'takeProfitOnFill': {'price': tp['take_profit'], **tif},
-            'stopLossOnFill': {'price': tp['stop_loss'], **tif},
-            'trailingStopLossOnFill': {'distance': trailing_stop, **tif}
-        }
 
     def _design_order_units(self, instrument, side):
-        max_size = int(self.__inst_dict[instrument]['maximumOrderUnits'])
-        avail_size = max(
-            ceil(
-                (
-                    self.margin_avail - self.balance *
-                    self.cf['position']['margin_nav_ratio']['preserve']
-                ) / self.unit_costs[instrument]
-            ), 0
+        spec = self.__order_specs[instrument]
+        sizes = spec.sizes(
+            balance=self.balance, margin_avail=self.margin_avail,
+            unit_cost=self.unit_costs[instrument]
         )
-        self.__logger.debug(f'avail_size:\t{avail_size}')
-        sizes = {
-            k: ceil(self.balance * v / self.unit_costs[instrument])
-            for k, v in self.cf['position']['margin_nav_ratio'].items()
-            if k in ['unit', 'init']
-        }
-        self.__logger.debug(f'sizes:\t{sizes}')
+        self.__logger.debug('sizes:\t%s', sizes)
         bet_size = self.__bs.calculate_size_by_pl(
             unit_size=sizes['unit'],
             inst_pl_txns=[
@@ -309,51 +493,56 @@ class TraderCore(object):
             ],
             init_size=sizes['init']
         )
-        self.__logger.debug(f'bet_size:\t{bet_size}')
-        return str(
-            int(min(bet_size, avail_size, max_size)) *
-            {'long': 1, 'short': -1}[side]
-        )
-
-    @staticmethod
-    def _sleep(last, sec=0.5):
-        rest = sec - (datetime.now() - last).total_seconds()
-        if rest > 0:
-            time.sleep(rest)
+        self.__logger.debug('bet_size:\t%s', bet_size)
+        return spec.units(size=min(bet_size, sizes['avail']), side=side)
 
     def print_log(self, data):
+        if self.__print_json:
+            data = _LazyJson(data)
         if self.__quiet:
-            self.__logger.info(data)
+            self.__logger.info('%s', data)
         else:
             print(data, flush=True)
 
-    def print_state_line(self, df_rate, add_str):
+    def print_state_line(self, df_rate, add_str, **kwargs):
+        if self.__quiet and not self.__logger.isEnabledFor(logging.INFO):
+            return
         i = df_rate['instrument'].iloc[-1]
+        bid, ask = df_rate[['bid', 'ask']].iloc[-1]
         net_pl = sum([
             float(t['pl']) for t in self.txn_list
             if t.get('instrument') == i and t.get('pl')
         ])
-        self.print_log(
-            '|{0:^11}|{1:^29}|{2:^15}|'.format(
-                i,
-                '{0:>3}:{1:>21}'.format(
-                    'B/A',
-                    np.array2string(
-                        df_rate[['bid', 'ask']].iloc[-1].values,
-                        formatter={'float_kind': lambda f: f'{f:8g}'}
-                    )
-                ),
-                'PL:{:>8}'.format(f'{net_pl:.1g}')
-            ) + (add_str or '')
-        )
+        if self.__print_json:
+            self.print_log({
+                'time': df_rate.index[-1], 'instrument': i, 'bid': bid,
+                'ask': ask, 'pl': net_pl, **kwargs
+            })
+        else:
+            self.print_log(
+                '|{0:^11}|{1:^29}|{2:^15}|'.format(
+                    i, '{0:>3}:{1:>21}'.format('B/A', f'[{bid:8g} {ask:8g}]'),
+                    'PL:{:>8}'.format(f'{net_pl:.1g}')
+                ) + (add_str or '')
+            )
 
     def _write_data(self, data, path, mode='a', append_linesep=True):
         with open(path, mode) as f:
             f.write(str(data) + (os.linesep if append_linesep else ''))
 
     def write_turn_log(self, df_rate, **kwargs):
+        with self.latency.span('write_log'):
+            self._write_turn_log(df_rate=df_rate, **kwargs)
+
+    def _write_turn_log(self, df_rate, **kwargs):
         i = df_rate['instrument'].iloc[-1]
         df_r = df_rate.drop(columns=['instrument'])
+        if self.__journal:
+            self.__journal.write_rates(instrument=i, df_rate=df_r)
+            if kwargs:
+                self.__journal.write_signal(
+                    instrument=i, timestamp=df_r.index[-1], **kwargs
+                )
         self._write_log_df(name=f'rate.{i}', df=df_r)
         if kwargs:
             self._write_log_df(
@@ -362,9 +551,9 @@ class TraderCore(object):
 
     def _write_log_df(self, name, df):
         if self.__log_dir_path and df.size:
-            self.__logger.debug(f'{name} df:{os.linesep}{df}')
+            self.__logger.debug('%s df:%s%s', name, os.linesep, df)
             p = str(Path(self.__log_dir_path).joinpath(f'{name}.tsv'))
-            self.__logger.info(f'Write TSV log:\t{p}')
+            self.__logger.info('Write TSV log:\t%s', p)
             self._write_df(df=df, path=p)
 
     def _write_df(self, df, path, mode='a'):
@@ -373,21 +562,161 @@ class TraderCore(object):
             header=(not Path(path).is_file())
         )
 
+    def save_checkpoint(self):
+        self.__last_checkpoint = time.monotonic()
+        if self.__checkpoint_path:
+            meta, arrays = self._export_state()
+            write_checkpoint(
+                path=self.__checkpoint_path, meta=meta, arrays=arrays
+            )
+
+    def save_checkpoint_periodically(self):
+        if (self.__checkpoint_path and (
+                time.monotonic() - self.__last_checkpoint
+                > self.__checkpoint_sec)):
+            self.save_checkpoint()
+
+    def load_checkpoint(self, max_age_sec=3600):
+        if self.__checkpoint_path and Path(self.__checkpoint_path).is_file():
+            meta, arrays = read_checkpoint(path=self.__checkpoint_path)
+            age_sec = time.time() - meta['saved_at']
+            if age_sec > max_age_sec:
+                self.__logger.warning(f'Checkpoint expired:\t{age_sec} sec')
+            else:
+                self._import_state(meta=meta, arrays=arrays)
+                self.__logger.info(f'Warm restart:\t{age_sec} sec')
+
+    def _export_state(self):
+        txns = [
+            t for t in self.txn_list
+            if t.get('instrument') and t.get('pl') and t.get('units')
+        ]
+        return (
+            {
+                'saved_at': time.time(), 'last_txn_id': self.__last_txn_id,
+                'pos_dict': {
+                    i: {**d, 'dt': d['dt'].isoformat()}
+                    for i, d in self.pos_dict.items()
+                }
+            },
+            {
+                'txn.id': np.array([int(t['id']) for t in txns], dtype='<i8'),
+                'txn.instrument': np.array(
+                    [t['instrument'] for t in txns], dtype='S16'
+                ),
+                **{
+                    f'txn.{k}': np.array(
+                        [float(t[k]) for t in txns], dtype='<f8'
+                    ) for k in ['units', 'pl']
+                }
+            }
+        )
+
+    def _import_state(self, meta, arrays):
+        self.__last_txn_id = meta['last_txn_id']
+        self.pos_dict = {
+            i: {**d, 'dt': datetime.fromisoformat(d['dt'])}
+            for i, d in meta['pos_dict'].items()
+        }
+        self.txn_list = [
+            {
+                'id': str(n), 'instrument': i.decode(), 'units': str(u),
+                'pl': str(p)
+            } for n, i, u, p in zip(
+                arrays['txn.id'], arrays['txn.instrument'],
+                arrays['txn.units'], arrays['txn.pl']
+            )
+        ]
+
+    def shutdown(self):
+        self.profiler.stop()
+        if self.__executor:
+            self.__executor.shutdown()
+        for r in [self.recorder, self.player]:
+            if r:
+                r.close()
+        self.save_checkpoint()
+        if self.__quiet:
+            self.latency.dump()
+        else:
+            self.latency.print_summary()
+        if self.__journal:
+            self.__journal.close()
+        self.metrics.shutdown()
+
     def fetch_candle_df(self, instrument, granularity='S5', count=5000):
+        return self.fetch_candle_frame(
+            instrument=instrument, granularity=granularity, count=count
+        ).to_df().assign(instrument=instrument)
+
+    def fetch_candle_frame(self, instrument, granularity='S5', count=5000):
+        if self.__candle_archive:
+            return self._fetch_archived_candle_frame(
+                instrument=instrument, granularity=granularity,
+                count=int(count)
+            )
+        else:
+            return self._fetch_candle_frame(
+                instrument=instrument, granularity=granularity,
+                count=int(count)
+            )
+
+    def _fetch_archived_candle_frame(self, instrument, granularity, count):
+        ca = self.__candle_archive
+        rec = ca.read(instrument=instrument, granularity=granularity)
+        g_ns = granularity2offset(granularity).value
+        n_new = (
+            (int(self._now().timestamp() * 1e9) - int(rec['time'][-1]))
+            // g_ns - 1
+            if rec.size else count
+        )
+        if rec.size >= count and n_new < 1:
+            result = 'hit'
+        elif rec.size >= count and n_new < 5000:
+            result = 'partial'
+            ca.append(
+                instrument=instrument, granularity=granularity,
+                records=self._fetch_candle_frame(
+                    instrument=instrument, granularity=granularity,
+                    fromTime=pd.Timestamp(
+                        int(rec['time'][-1]), tz='UTC'
+                    ).strftime('%Y-%m-%dT%H:%M:%S.%f000Z'),
+                    count=int(n_new + 2)
+                ).to_records()
+            )
+            rec = ca.read(instrument=instrument, granularity=granularity)
+        else:
+            result = 'miss'
+        self.metrics.inc(
+            'cache_requests_total', cache='candle', instrument=instrument,
+            result=result
+        )
+        if result == 'miss':
+            frame = self._fetch_candle_frame(
+                instrument=instrument, granularity=granularity, count=count
+            )
+            ca.append(
+                instrument=instrument, granularity=granularity,
+                records=frame.to_records()
+            )
+            return frame
+        else:
+            return CandleFrame.from_records(
+                records=rec[-count:], instrument=instrument,
+                granularity=granularity, dtype=self.feature_dtype
+            )
+
+    def _fetch_candle_frame(self, instrument, granularity, **kwargs):
         res = self.__api.instrument.candles(
             instrument=instrument, price='BA', granularity=granularity,
-            count=int(count)
+            **kwargs
         )
         # log_response(res, logger=self.__logger)
         if 'candles' in res.body:
-            return pd.DataFrame([
-                {
-                    'time': c.time, 'bid': c.bid.c, 'ask': c.ask.c,
-                    'volume': c.volume
-                } for c in res.body['candles'] if c.complete
-            ]).assign(
-                time=lambda d: pd.to_datetime(d['time']), instrument=instrument
-            ).set_index('time', drop=True)
+            return CandleFrame.from_v20(
+                candles=res.body['candles'], instrument=instrument,
+                granularity=granularity, dtype=self.feature_dtype
+            )
         else:
             raise APIResponseError(
                 'unexpected response:' + os.linesep + pformat(res.body)
@@ -417,6 +746,11 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         super().__init__(**kwargs)
         self.__logger = logging.getLogger(__name__)
         self.__ignore_api_error = ignore_api_error
+        if self.recorder:
+            self.recorder.write(
+                'meta', model=model, standalone=standalone,
+                ignore_api_error=ignore_api_error
+            )
         self.__n_cache = self.cf['feature']['cache']
         self.__use_tick = (
             'TICK' in self.cf['feature']['granularities'] and not standalone
@@ -424,40 +758,164 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         self.__granularities = [
             a for a in self.cf['feature']['granularities'] if a != 'TICK'
         ]
-        self.__cache_dfs = {i: pd.DataFrame() for i in self.instruments}
+        self.__cache_frames = {
+            i: CandleFrame(
+                time=[], bid=[], ask=[], volume=[], instrument=i,
+                granularity='TICK', dtype=self.feature_dtype
+            ) for i in self.instruments
+        }
+        self.__sig_cache = dict()
+        self.__standalone = standalone
         if model == 'ewma':
-            self.__ai = Ewma(config_dict=self.cf)
+            from .ewma import Ewma
+            self.__ai = Ewma(config_dict=self.cf, latency=self.latency)
         elif model == 'kalman':
-            self.__ai = Kalman(config_dict=self.cf)
+            from .kalman import Kalman
+            self.__ai = Kalman(config_dict=self.cf, latency=self.latency)
+        elif ',' in model:
+            from .ensemble import Ensemble
+            self.__ai = Ensemble(
+                config_dict=self.cf, models=model.split(','),
+                latency=self.latency
+            )
         else:
             raise ValueError(f'invalid model name:\t{model}')
         self.__volatility_states = dict()
         self.__granularity_lock = dict()
+        scf = self.cf.get('scheduler')
+        self.scheduler = (
+            ActivityScheduler(
+                instruments=self.instruments,
+                min_period_sec=scf.get('min_period_sec', 0),
+                max_period_sec=scf.get('max_period_sec', 60),
+                tick_rate=scf.get('tick_rate', 0.2),
+                band_margin=scf.get('band_margin', 0.5)
+            ) if scf else None
+        )
+        self.__activity = dict()
+        self.load_checkpoint()
 
     def invoke(self):
         self.print_log('!!! OPEN DEALS !!!')
         signal.signal(signal.SIGINT, signal.SIG_DFL)
-        while self.check_health():
-            try:
-                self._update_volatility_states()
-                for i in self.instruments:
+        self.profiler.install()
+        try:
+            while self.check_health():
+                self._trade_once()
+                if self.scheduler:
+                    time.sleep(
+                        self.scheduler.wait_sec(now=self._now().timestamp())
+                    )
+        finally:
+            self.shutdown()
+
+    def _trade_once(self):
+        try:
+            insts = (
+                self.scheduler.due(now=self._now().timestamp())
+                if self.scheduler else self.instruments
+            )
+            if not insts:
+                return
+            with self.latency.span('update_volatility_states'):
+                self._update_volatility_states(instruments=insts)
+            self._detect_signals(instruments=insts)
+            for i in insts:
+                with self.latency.span('refresh_oanda_dicts', instrument=i):
                     self.refresh_oanda_dicts()
+                with self.latency.span('make_decision', instrument=i):
                     self.make_decision(instrument=i)
-            except (V20ConnectionError, V20Timeout, APIResponseError) as e:
-                if self.__ignore_api_error:
-                    self.__logger.error(e)
-                else:
-                    raise e
+                if self.scheduler:
+                    self._observe_activity(instrument=i)
+            self.latency.dump_periodically()
+            self.save_checkpoint_periodically()
+        except (V20ConnectionError, V20Timeout, APIResponseError) as e:
+            if self.__ignore_api_error:
+                self.__logger.error(e)
+            else:
+                raise e
+        finally:
+            self.profiler.tick()
+            if self.recorder:
+                self.recorder.flush()
+
+    def replay(self):
+        hist = LatencyHistogram()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                self._trade_once()
+                hist.add(time.perf_counter() - t0)
+        except RecordingExhausted as e:
+            self.__logger.info(e)
+        finally:
+            self.shutdown()
+        return {
+            'turns': hist.count,
+            **{
+                f'{k}s': self.player.checks[k] for k in self.player.checks
+            },
+            **{
+                f'{k}_mismatches': v for k, v in self.player.mismatches.items()
+            },
+            **{
+                f'turn_{k}': v for k, v in hist.summary().items()
+                if k != 'count'
+            }
+        }
+
+    def _observe_activity(self, instrument):
+        # the last signal is kept for turns without new ticks, while the
+        # position is read on every turn
+        a = self.__activity.setdefault(instrument, dict())
+        self.scheduler.observe(
+            instrument=instrument, now=self._now().timestamp(),
+            tick_times=a.pop('tick_times', None),
+            sleeping=a.get('sleeping', False),
+            position=bool(self.pos_dict.get(instrument)), sig=a.get('sig')
+        )
+
+    def _export_state(self):
+        meta, arrays = super()._export_state()
+        for i, c in self.__cache_frames.items():
+            if len(c):
+                for k in ['time', 'bid', 'ask', 'volume']:
+                    arrays[f'tick.{i}.{k}'] = getattr(c, k)
+        meta['granularity_lock'] = self.__granularity_lock
+        return meta, arrays
+
+    def _import_state(self, meta, arrays):
+        super()._import_state(meta=meta, arrays=arrays)
+        self.__granularity_lock = {
+            i: g for i, g in meta['granularity_lock'].items()
+            if i in self.instruments
+            and g in self.cf['feature']['granularities']
+        }
+        for i in self.instruments:
+            if f'tick.{i}.time' in arrays:
+                self.__cache_frames[i] = CandleFrame(
+                    **{
+                        k: arrays[f'tick.{i}.{k}']
+                        for k in ['time', 'bid', 'ask', 'volume']
+                    },
+                    instrument=i, granularity='TICK', dtype=self.feature_dtype
+                ).tail(n=self.__n_cache)
+                self.__logger.info(
+                    'Restored cache length:\t{0}, {1}'.format(
+                        i, len(self.__cache_frames[i])
+                    )
+                )
 
     @abstractmethod
     def check_health(self):
         return True
 
-    def _update_volatility_states(self):
+    def _update_volatility_states(self, instruments=None):
+        insts = (instruments or self.instruments)
         if not self.cf['volatility']['sleeping']:
-            self.__volatility_states = {i: True for i in self.instruments}
+            self.__volatility_states.update({i: True for i in insts})
         else:
-            self.__volatility_states = {
+            self.__volatility_states.update({
                 i: self.fetch_candle_df(
                     instrument=i,
                     granularity=self.cf['volatility']['granularity'],
@@ -473,19 +931,25 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
                         v.iloc[-1]
                         > v.quantile(self.cf['volatility']['sleeping'])
                     )
-                ) for i in set(self.instruments)
-            }
+                ) for i in set(insts)
+            })
 
     @abstractmethod
     def make_decision(self, instrument):
         pass
 
     def update_caches(self, df_rate):
-        self.__logger.info(f'Rate:{os.linesep}{df_rate}')
+        self.__logger.info('Rate:%s%s', os.linesep, df_rate)
         i = df_rate['instrument'].iloc[-1]
-        df_c = self.__cache_dfs[i].append(df_rate).tail(n=self.__n_cache)
-        self.__logger.info('Cache length:\t{}'.format(len(df_c)))
-        self.__cache_dfs[i] = df_c
+        c = self.__cache_frames[i].append(
+            CandleFrame.from_df(
+                df=df_rate, instrument=i, dtype=self.feature_dtype
+            ),
+            max_len=self.__n_cache
+        )
+        self.__logger.info('Cache length:\t%d', len(c))
+        self.__cache_frames[i] = c
+        self.metrics.set('cache_length', len(c), instrument=i)
 
     def determine_sig_state(self, df_rate):
         i = df_rate['instrument'].iloc[-1]
@@ -495,36 +959,34 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
                 abs(pos['units'] * self.unit_costs[i] * 100 / self.balance), 1
             ) if pos else 0
         )
-        history_dict = self._fetch_history_dict(instrument=i)
-        if not history_dict:
-            sig = {
-                'sig_act': None, 'granularity': None, 'sig_log_str': (' ' * 40)
-            }
+        contrary = self._is_contrary(instrument=i)
+        cached = self.__sig_cache.pop(i, None)
+        if cached and cached[0] == contrary:
+            sig = cached[1]
         else:
-            if self.cf['position']['side'] == 'auto':
-                inst_pls = [
-                    t['pl'] for t in self.txn_list
-                    if t.get('instrument') == i and t.get('pl')
-                ]
-                contrary = bool(inst_pls and float(inst_pls[-1]) < 0)
+            with self.latency.span('fetch_history_dict', instrument=i):
+                history_dict = self._fetch_history_dict(instrument=i)
+            if not history_dict:
+                sig = {
+                    'sig_act': None, 'granularity': None,
+                    'sig_log_str': (' ' * 40)
+                }
             else:
-                contrary = (self.cf['position']['side'] == 'contrarian')
-            sig = self.__ai.detect_signal(
-                history_dict=(
-                    {
-                        k: v for k, v in history_dict.items()
-                        if k == self.__granularity_lock[i]
-                    } if self.__granularity_lock.get(i) else history_dict
-                ),
-                pos=pos, contrary=contrary
-            )
+                with self.latency.span('detect_signal', instrument=i):
+                    sig = self.__ai.detect_signal(
+                        history_dict=self._lock_granularity(
+                            instrument=i, history_dict=history_dict
+                        ),
+                        pos=pos, contrary=contrary
+                    )
+        if sig['granularity']:
             if self.cf['feature']['granularity_lock']:
                 self.__granularity_lock[i] = (
                     sig['granularity']
                     if pos or sig['sig_act'] in {'long', 'short'} else None
                 )
             if pos and sig['sig_act'] and sig['sig_act'] == pos['side']:
-                self.pos_dict[i]['dt'] = datetime.now()
+                self.pos_dict[i]['dt'] = self._now()
         if not sig['granularity']:
             act = None
             state = 'LOADING'
@@ -538,7 +1000,7 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
             act = 'closing'
             state = 'CLOSING'
         elif (pos and not sig['sig_act']
-              and ((datetime.now() - pos['dt']).total_seconds()
+              and ((self._now() - pos['dt']).total_seconds()
                    > self.cf['position']['ttl_sec'])):
             act = 'closing'
             state = 'POSITION EXPIRED'
@@ -570,6 +1032,15 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         else:
             act = sig['sig_act']
             state = '-> {}'.format(sig['sig_act'].upper())
+        if act:
+            self.signal_times[i] = time.perf_counter()
+        if self.scheduler:
+            self.__activity[i] = {
+                'tick_times': df_rate.index,
+                'sleeping': not self.__volatility_states[i], 'sig': sig
+            }
+        self.metrics.set_state('state', state.split('% ')[-1], instrument=i)
+        self._trace('decision', instrument=i, act=act, state=state)
         return {
             'act': act, 'state': state,
             'log_str': (
@@ -581,19 +1052,67 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
             **sig
         }
 
+    def _is_contrary(self, instrument):
+        if self.cf['position']['side'] == 'auto':
+            inst_pls = [
+                t['pl'] for t in self.txn_list
+                if t.get('instrument') == instrument and t.get('pl')
+            ]
+            return bool(inst_pls and float(inst_pls[-1]) < 0)
+        else:
+            return (self.cf['position']['side'] == 'contrarian')
+
+    def _lock_granularity(self, instrument, history_dict):
+        return (
+            {
+                k: v for k, v in history_dict.items()
+                if k == self.__granularity_lock[instrument]
+            } if self.__granularity_lock.get(instrument) else history_dict
+        )
+
+    def _detect_signals(self, instruments=None):
+        self.__sig_cache = dict()
+        # the streaming traders decide only on instruments with new ticks,
+        # so signals are pre-computed in a batch only by polling traders
+        if self.__standalone and hasattr(self.__ai, 'detect_signals'):
+            history_by_instrument = dict()
+            for i in (instruments or self.instruments):
+                with self.latency.span('fetch_history_dict', instrument=i):
+                    history_dict = self._fetch_history_dict(instrument=i)
+                if history_dict:
+                    history_by_instrument[i] = self._lock_granularity(
+                        instrument=i, history_dict=history_dict
+                    )
+            if history_by_instrument:
+                contrary_dict = {
+                    i: self._is_contrary(instrument=i)
+                    for i in history_by_instrument
+                }
+                with self.latency.span('detect_signals'):
+                    sigs = self.__ai.detect_signals(
+                        history_by_instrument=history_by_instrument,
+                        contrary_dict=contrary_dict
+                    )
+                self.__sig_cache = {
+                    i: (contrary_dict[i], sig) for i, sig in sigs.items()
+                }
+
     def _fetch_history_dict(self, instrument):
-        df_c = self.__cache_dfs[instrument]
+        c = self.__cache_frames[instrument]
+        if self.__use_tick:
+            self.metrics.inc(
+                'cache_requests_total', cache='tick', instrument=instrument,
+                result=('hit' if len(c) == self.__n_cache else 'miss')
+            )
         return {
             **(
-                {'TICK': df_c.assign(volume=1)}
-                if self.__use_tick and len(df_c) == self.__n_cache else dict()
+                {'TICK': c.with_volume(1)}
+                if self.__use_tick and len(c) == self.__n_cache else dict()
             ),
             **{
-                g: self.fetch_candle_df(
+                g: self.fetch_candle_frame(
                     instrument=instrument, granularity=g, count=self.__n_cache
-                ).rename(
-                    columns={'closeAsk': 'ask', 'closeBid': 'bid'}
-                )[['ask', 'bid', 'volume']] for g in self.__granularities
+                ) for g in self.__granularities
             }
         }
 
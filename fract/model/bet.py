@@ -2,7 +2,7 @@
 
 import logging
 
-import pandas as pd
+import numpy as np
 
 
 class BettingSystem(object):
@@ -27,22 +27,21 @@ class BettingSystem(object):
             float(t['units']) for t in inst_pl_txns if float(t['units']) != 0
         ]
         last_size = abs(int(size_list[-1] if size_list else 0))
-        self.__logger.debug(f'last_size:\t{last_size}')
-        pl = pd.Series([
-            t['pl'] for t in inst_pl_txns
-        ]).astype(float).pipe(lambda a: a[a != 0])
+        self.__logger.debug('last_size:\t%s', last_size)
+        pl = np.array([t['pl'] for t in inst_pl_txns], dtype=float)
+        pl = pl[pl != 0]
         if pl.size == 0:
             return last_size or init_size or unit_size
         else:
             won_last = (
-                None if (pl.size > 1 and pl.iloc[-1] > 0 and pl[-2:].sum() < 0)
-                else (pl.iloc[-1] > 0)
+                None if (pl.size > 1 and pl[-1] > 0 and pl[-2:].sum() < 0)
+                else (pl[-1] > 0)
             )
-            self.__logger.debug(f'won_last:\t{won_last}')
+            self.__logger.debug('won_last:\t%s', won_last)
             return self._calculate_size(
                 unit_size=unit_size, init_size=init_size,
                 last_size=last_size, won_last=won_last,
-                all_time_high=(pl.cumsum().idxmax() == pl.index[-1])
+                all_time_high=(np.argmax(pl.cumsum()) == pl.size - 1)
             )
 
     def _calculate_size(self, unit_size, init_size=None, last_size=None,
@@ -65,7 +64,7 @@ class BettingSystem(object):
             else:
                 return (last_size - unit_size)
         elif self.strategy == "Oscar's grind":
-            self.__logger.debug(f'all_time_high:\t{all_time_high}')
+            self.__logger.debug('all_time_high:\t%s', all_time_high)
             if all_time_high:
                 return init_size or unit_size
             elif won_last:
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ..util.candle import granularity2str
+from ..util.latency import LatencyRecorder
+from .sieve import LRFeatureSieve
+
+_directions = {'long': 1, 'short': -1}
+
+
+class Ensemble(object):
+    def __init__(self, config_dict, models, latency=None):
+        self.__logger = logging.getLogger(__name__)
+        self.__latency = (latency or LatencyRecorder(enabled=False))
+        self.__members = dict()
+        for m in models:
+            if m == 'ewma':
+                from .ewma import Ewma
+                self.__members[m] = Ewma(
+                    config_dict=config_dict, latency=self.__latency
+                )
+            elif m == 'kalman':
+                from .kalman import Kalman
+                self.__members[m] = Kalman(
+                    config_dict=config_dict, latency=self.__latency
+                )
+            else:
+                raise ValueError(f'invalid model name:\t{m}')
+        if len(self.__members) < 2:
+            raise ValueError(f'invalid ensemble models:\t{models}')
+        ecf = config_dict['model'].get('ensemble') or dict()
+        method = ecf.get('method', 'vote')
+        if method == 'vote':
+            self.__weights = np.ones(len(self.__members))
+        elif method == 'weight':
+            self.__weights = np.array([
+                float((ecf.get('weights') or dict()).get(m, 1))
+                for m in self.__members
+            ])
+        else:
+            raise ValueError(f'invalid ensemble method:\t{method}')
+        self.__weights = self.__weights / self.__weights.sum()
+        self.__threshold = float(ecf.get('threshold', 0.5))
+        self.__lrfs = LRFeatureSieve(
+            type=config_dict['feature']['type'], drop_zero=False
+        )
+        self.__logger.info(
+            'Ensemble:\t{}'.format(
+                dict(zip(self.__members, self.__weights.round(3)))
+            )
+        )
+
+    def _map_members(self, func):
+        # members run inline: their work is short numpy calls holding the
+        # GIL, so a thread pool would add overhead and threads to clean up
+        sigs = dict()
+        for k, m in self.__members.items():
+            with self.__latency.span(f'model_{k}'):
+                sigs[k] = func(m)
+        return sigs
+
+    def detect_signal(self, history_dict, pos=None, contrary=False):
+        with self.__latency.span('feature'):
+            best_f = self.__lrfs.extract_best_feature(
+                history_dict=history_dict
+            )
+        sigs = self._map_members(
+            func=lambda m: m.evaluate(
+                series=best_f['series'], granularity=best_f['granularity'],
+                contrary=contrary
+            )
+        )
+        return self._combine(
+            granularity=best_f['granularity'], sig_dict=sigs
+        )
+
+    def detect_signals(self, history_by_instrument, contrary_dict=None):
+        with self.__latency.span('feature'):
+            matrix_dict = self.__lrfs.extract_best_features(
+                history_by_instrument=history_by_instrument
+            )
+        jobs = [
+            (g, np.array(d['instruments'])[d['best']], d['matrix'][d['best']])
+            for g, d in matrix_dict.items() if d['best'].any()
+        ]
+        member_sigs = self._map_members(
+            func=lambda m: [
+                m.evaluate_matrix(
+                    matrix=x, granularity=g,
+                    contraries=[
+                        (contrary_dict or dict()).get(i, False) for i in insts
+                    ]
+                ) for g, insts, x in jobs
+            ]
+        )
+        sigs = dict()
+        for n, (g, insts, _) in enumerate(jobs):
+            for r, i in enumerate(insts):
+                sigs[i] = self._combine(
+                    granularity=g,
+                    sig_dict={k: v[n][r] for k, v in member_sigs.items()}
+                )
+        return {i: sigs[i] for i in history_by_instrument}
+
+    def _combine(self, granularity, sig_dict):
+        votes = np.array([
+            _directions.get(s['sig_act'], 0) for s in sig_dict.values()
+        ])
+        score = float(self.__weights @ votes)
+        if score > self.__threshold:
+            sig_act = 'long'
+        elif score < -self.__threshold:
+            sig_act = 'short'
+        else:
+            sig_act = None
+        sig_log_str = '{:^40}|'.format(
+            '{0:>3}[{1:>3}]:{2:>9}{3:>18}'.format(
+                self.__lrfs.code,
+                granularity2str(granularity=granularity),
+                f'{score:+.2f}',
+                ' '.join([
+                    '{0}{1}'.format(
+                        k[0].upper(), {1: '+', -1: '-', 0: '0'}[v]
+                    ) for k, v in zip(sig_dict, votes)
+                ])
+            )
+        )
+        return {
+            **{
+                k: v for s in sig_dict.values() for k, v in s.items()
+                if k not in {'sig_act', 'granularity', 'sig_log_str'}
+            },
+            'sig_act': sig_act, 'granularity': granularity,
+            'sig_log_str': sig_log_str, 'sig_score': score
+        }
+
+    def signal_frame(self, series):
+        frames = self._map_members(func=lambda m: m.signal_frame(series))
+        score = pd.DataFrame(
+            {k: f['sig_dir'] for k, f in frames.items()}
+        ).fillna(0).to_numpy(dtype=float) @ self.__weights
+        return pd.DataFrame(
+            {
+                'sig_dir': np.where(
+                    np.abs(score) > self.__threshold, np.sign(score), 0
+                ).astype(np.int8),
+                'sig_score': score
+            },
+            index=series.index
+        )
@@ -3,13 +3,17 @@
 import logging
 
 import numpy as np
+import pandas as pd
 
+from ..util.candle import granularity2str
+from ..util.latency import LatencyRecorder
 from .sieve import LRFeatureSieve
 
 
 class Ewma(object):
-    def __init__(self, config_dict):
+    def __init__(self, config_dict, latency=None):
         self.__logger = logging.getLogger(__name__)
+        self.__latency = (latency or LatencyRecorder(enabled=False))
         self.__alpha = config_dict['model']['ewma']['alpha']
         self.__sigma_band = config_dict['model']['ewma']['sigma_band']
         self.__lrfs = LRFeatureSieve(
@@ -17,38 +21,114 @@ class Ewma(object):
         )
 
     def detect_signal(self, history_dict, pos=None, contrary=False):
-        best_f = self.__lrfs.extract_best_feature(history_dict=history_dict)
-        sig_dict = self._ewm_stats(series=best_f['series'])
-        sig_side = (
-            'short' if sig_dict['ewma'] * [1, -1][int(contrary)] < 0
-            else 'long'
+        with self.__latency.span('feature'):
+            best_f = self.__lrfs.extract_best_feature(
+                history_dict=history_dict
+            )
+        return self.evaluate(
+            series=best_f['series'], granularity=best_f['granularity'],
+            contrary=contrary
+        )
+
+    def evaluate(self, series, granularity, contrary=False):
+        sig_dict = self._ewm_stats(series=series)
+        return self._signal(
+            granularity=granularity, ewma=sig_dict['ewma'],
+            ewmbb=sig_dict['ewmbb'], contrary=contrary
         )
-        if sig_dict['ewmbb'][1] < 0 or sig_dict['ewmbb'][0] > 0:
+
+    def detect_signals(self, history_by_instrument, contrary_dict=None):
+        with self.__latency.span('feature'):
+            matrix_dict = self.__lrfs.extract_best_features(
+                history_by_instrument=history_by_instrument
+            )
+        sigs = dict()
+        for g, d in matrix_dict.items():
+            if d['best'].any():
+                insts = np.array(d['instruments'])[d['best']]
+                sigs.update(
+                    zip(
+                        insts,
+                        self.evaluate_matrix(
+                            matrix=d['matrix'][d['best']], granularity=g,
+                            contraries=[
+                                (contrary_dict or dict()).get(i, False)
+                                for i in insts
+                            ]
+                        )
+                    )
+                )
+        return {i: sigs[i] for i in history_by_instrument}
+
+    def evaluate_matrix(self, matrix, granularity, contraries):
+        ewma, ewmstd = self._ewm_matrix_stats(matrix=matrix)
+        return [
+            self._signal(
+                granularity=granularity, ewma=m,
+                ewmbb=(np.array([-1, 1]) * s * self.__sigma_band + m),
+                contrary=c
+            ) for m, s, c in zip(ewma, ewmstd, contraries)
+        ]
+
+    def _signal(self, granularity, ewma, ewmbb, contrary=False):
+        sig_side = 'short' if ewma * [1, -1][int(contrary)] < 0 else 'long'
+        if ewmbb[1] < 0 or ewmbb[0] > 0:
             sig_act = sig_side
         else:
             sig_act = None
         sig_log_str = '{:^40}|'.format(
             '{0:>3}[{1:>3}]:{2:>9}{3:>18}'.format(
-                self.__lrfs.code, best_f['granularity_str'],
-                '{:.1g}'.format(sig_dict['ewma']),
+                self.__lrfs.code,
+                granularity2str(granularity=granularity),
+                '{:.1g}'.format(ewma),
                 np.array2string(
-                    sig_dict['ewmbb'],
-                    formatter={'float_kind': lambda f: f'{f:.1g}'}
+                    ewmbb, formatter={'float_kind': lambda f: f'{f:.1g}'}
                 )
             )
         )
         return {
-            'sig_act': sig_act, 'granularity': best_f['granularity'],
-            'sig_log_str': sig_log_str, 'sig_ewma': sig_dict['ewma'],
-            'sig_ewmbbl': sig_dict['ewmbb'][0],
-            'sig_ewmbbu': sig_dict['ewmbb'][1]
+            'sig_act': sig_act, 'granularity': granularity,
+            'sig_log_str': sig_log_str, 'sig_ewma': ewma,
+            'sig_ewmbbl': ewmbb[0], 'sig_ewmbbu': ewmbb[1]
         }
 
     def _ewm_stats(self, series):
         ewm = series.ewm(alpha=self.__alpha)
         ewma = ewm.mean().iloc[-1]
-        self.__logger.debug(f'ewma:\t{ewma}')
+        self.__logger.debug('ewma:\t%s', ewma)
         ewm_bollinger_band = (
             np.array([-1, 1]) * ewm.std().iloc[-1] * self.__sigma_band
         ) + ewma
         return {'ewma': ewma, 'ewmbb': ewm_bollinger_band}
+
+    def _ewm_matrix_stats(self, matrix):
+        valid = ~np.isnan(matrix)
+        w = np.where(
+            valid,
+            np.power(1 - self.__alpha, np.arange(matrix.shape[1])[::-1]), 0
+        )
+        x = np.where(valid, matrix, 0)
+        sum_w = w.sum(axis=1)
+        ewma = (w * x).sum(axis=1) / sum_w
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ewmvar = (
+                (w * np.square(x - ewma[:, None])).sum(axis=1) * sum_w
+                / (np.square(sum_w) - np.square(w).sum(axis=1))
+            )
+        self.__logger.debug('ewma:\t%s', ewma)
+        return ewma, np.sqrt(ewmvar)
+
+    def signal_frame(self, series):
+        ewm = series.ewm(alpha=self.__alpha)
+        ewma = ewm.mean()
+        band = ewm.std() * self.__sigma_band
+        return pd.DataFrame(
+            {
+                'sig_dir': np.where(
+                    (ewma + band < 0) | (ewma - band > 0), np.sign(ewma), 0
+                ).astype(np.int8),
+                'sig_ewma': ewma, 'sig_ewmbbl': (ewma - band),
+                'sig_ewmbbu': (ewma + band)
+            },
+            index=series.index
+        )
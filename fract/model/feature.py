@@ -3,6 +3,9 @@
 import logging
 
 import numpy as np
+import pandas as pd
+
+from ..util.candle import CandleFrame
 
 
 class LogReturnFeature(object):
@@ -19,13 +22,105 @@ class LogReturnFeature(object):
             raise ValueError(f'invalid feature type:\t{type}')
 
     def series(self, df_rate):
-        if self.code == 'LRV':
+        if isinstance(df_rate, CandleFrame):
+            return self.frame_series(frame=df_rate)
+        elif self.code == 'LRV':
             return self.log_return_velocity(df_rate=df_rate)
         elif self.code == 'LRA':
             return self.log_return_acceleration(df_rate=df_rate)
         else:
             return self.log_return(df_rate=df_rate)
 
+    def frame_series(self, frame):
+        dtype = frame.bid.dtype
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_diff = np.diff(
+                np.log((frame.ask + frame.bid) / 2), prepend=np.nan
+            )
+            delta_sec = np.diff(
+                frame.time.astype(np.float64), prepend=np.nan
+            ).astype(dtype) / 1e9
+            inv_spread = np.reciprocal(np.log(frame.ask) - np.log(frame.bid))
+            lr = log_diff * (
+                (inv_spread / np.nanmean(inv_spread))
+                * (frame.volume / frame.volume.mean())
+            ).astype(dtype)
+            index = (
+                np.flatnonzero(lr) if self.__drop_zero
+                else np.arange(lr.size)
+            )
+            if self.code == 'LR':
+                name, values = 'log_return', lr[index]
+            else:
+                lrv = lr[index] / delta_sec[index]
+                if self.code == 'LRV':
+                    name, values = 'lrv', lrv
+                else:
+                    name = 'lra'
+                    values = np.diff(lrv, prepend=np.nan) / delta_sec[index]
+        self.__logger.info('%s (tail):\t%s', self.code, values[-5:])
+        return pd.Series(values.astype(dtype), index=index, name=name)
+
+    def frame_matrix(self, frames):
+        fs = [
+            (f if isinstance(f, CandleFrame) else CandleFrame.from_df(df=f))
+            for f in frames
+        ]
+        dtype = np.result_type(*[f.bid.dtype for f in fs])
+        width = max([len(f) for f in fs] + [0])
+        cols = {
+            k: np.full((len(fs), width), np.nan, dtype=t)
+            for k, t in [
+                ('time', np.float64), ('bid', dtype), ('ask', dtype),
+                ('volume', np.float64)
+            ]
+        }
+        for r, f in enumerate(fs):
+            for k, a in cols.items():
+                a[r, (width - len(f)):] = getattr(f, k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_diff = np.diff(
+                np.log((cols['ask'] + cols['bid']) / 2), axis=1,
+                prepend=np.nan
+            )
+            delta_sec = np.diff(
+                cols['time'], axis=1, prepend=np.nan
+            ).astype(dtype) / 1e9
+            inv_spread = np.reciprocal(
+                np.log(cols['ask']) - np.log(cols['bid'])
+            )
+            lr = log_diff * (
+                (inv_spread / np.nanmean(inv_spread, axis=1, keepdims=True))
+                * (
+                    cols['volume']
+                    / np.nanmean(cols['volume'], axis=1, keepdims=True)
+                )
+            ).astype(dtype)
+            if self.__drop_zero:
+                lr, delta_sec = self._compact_right(
+                    lr, delta_sec, keep=(lr != 0)
+                )
+            if self.code == 'LR':
+                values = lr
+            else:
+                lrv = lr / delta_sec
+                if self.code == 'LRV':
+                    values = lrv
+                else:
+                    values = (
+                        np.diff(lrv, axis=1, prepend=np.nan) / delta_sec
+                    )
+        return values.astype(dtype)
+
+    @staticmethod
+    def _compact_right(*arrays, keep):
+        order = np.argsort(keep, axis=1, kind='stable')
+        kept = np.take_along_axis(keep, order, axis=1)
+        return tuple(
+            np.where(kept, np.take_along_axis(a, order, axis=1), np.nan)
+            for a in arrays
+        )
+
     def log_return(self, df_rate, return_df=False):
         df_lr = df_rate.reset_index().assign(
             log_diff=lambda d: np.log(d[['ask', 'bid']].mean(axis=1)).diff(),
@@ -39,7 +134,7 @@ class LogReturnFeature(object):
             )
         )
         self.__logger.info(
-            'Log return (tail):\t{}'.format(df_lr['log_return'].tail().values)
+            'Log return (tail):\t%s', df_lr['log_return'].tail().values
         )
         return (df_lr if return_df else df_lr['log_return'])
 
@@ -61,9 +156,7 @@ class LogReturnFeature(object):
             lrv=lambda d: d['log_return'] / d['delta_sec']
         )
         self.__logger.info(
-            'Log return verocity (tail):\t{}'.format(
-                df_lrv['lrv'].tail().values
-            )
+            'Log return verocity (tail):\t%s', df_lrv['lrv'].tail().values
         )
         return (df_lrv if return_df else df_lrv['lrv'])
 
@@ -74,8 +167,6 @@ class LogReturnFeature(object):
             lra=lambda d: d['lrv'].diff() / d['delta_sec']
         )
         self.__logger.info(
-            'Log return acceleration (tail):\t{}'.format(
-                df_lra['lra'].tail().values
-            )
+            'Log return acceleration (tail):\t%s', df_lra['lra'].tail().values
         )
         return (df_lra if return_df else df_lra['lra'])
@@ -3,37 +3,58 @@
 import logging
 
 import numpy as np
+import pandas as pd
 from scipy.stats import norm
 
+from ..util.candle import granularity2str
 from ..util.kalmanfilter import KalmanFilter, KalmanFilterOptimizer
+from ..util.latency import LatencyRecorder
 from .sieve import LRFeatureSieve
 
 
 class Kalman(object):
-    def __init__(self, config_dict, x0=0, v0=1e-8):
+    def __init__(self, config_dict, x0=0, v0=1e-8, latency=None):
         self.__logger = logging.getLogger(__name__)
+        self.__latency = (latency or LatencyRecorder(enabled=False))
         self.__x0 = x0
         self.__v0 = v0
         self.__pmv_ratio = config_dict['model']['kalman']['pmv_ratio']
         self.__ci_level = 1 - config_dict['model']['kalman']['alpha']
+        self.__steady_state = bool(
+            config_dict['model']['kalman'].get('steady_state')
+        )
+        self.__window = int(config_dict['feature']['cache'])
         self.__lrfs = LRFeatureSieve(
             type=config_dict['feature']['type'], drop_zero=True
         )
 
     def detect_signal(self, history_dict, pos=None, contrary=False):
-        best_f = self.__lrfs.extract_best_feature(history_dict=history_dict)
+        with self.__latency.span('feature'):
+            best_f = self.__lrfs.extract_best_feature(
+                history_dict=history_dict
+            )
+        return self.evaluate(
+            series=best_f['series'], granularity=best_f['granularity'],
+            contrary=contrary
+        )
+
+    def evaluate(self, series, granularity, contrary=False):
+        y = series[series != 0]
         kfo = KalmanFilterOptimizer(
-            y=best_f['series'], x0=self.__x0, v0=self.__v0,
-            pmv_ratio=self.__pmv_ratio
+            y=y, x0=self.__x0, v0=self.__v0, pmv_ratio=self.__pmv_ratio,
+            steady_state=self.__steady_state
         )
         q, r = kfo.optimize()
-        kf = KalmanFilter(x0=self.__x0, v0=self.__v0, q=q, r=r)
-        kf_res = kf.fit(y=best_f['series']).iloc[-1].to_dict()
-        self.__logger.debug(f'kf_res:\t{kf_res}')
+        kf = KalmanFilter(
+            x0=self.__x0, v0=self.__v0, q=q, r=r,
+            steady_state=self.__steady_state
+        )
+        kf_res = kf.fit(y=y).iloc[-1].to_dict()
+        self.__logger.debug('kf_res:\t%s', kf_res)
         gauss_mu = kf_res['x']
         gauss_ci = np.asarray(
             norm.interval(
-                alpha=self.__ci_level, loc=gauss_mu,
+                self.__ci_level, loc=gauss_mu,
                 scale=np.sqrt(kf_res['v'] + q)
             )
         )
@@ -44,7 +65,8 @@ class Kalman(object):
             sig_act = None
         sig_log_str = '{:^40}|'.format(
             '{0:>3}[{1:>3}]:{2:>9}{3:>18}'.format(
-                self.__lrfs.code, best_f['granularity_str'],
+                self.__lrfs.code,
+                granularity2str(granularity=granularity),
                 f'{gauss_mu:.1g}',
                 np.array2string(
                     gauss_ci, formatter={'float_kind': lambda f: f'{f:.1g}'}
@@ -52,7 +74,48 @@ class Kalman(object):
             )
         )
         return {
-            'sig_act': sig_act, 'granularity': best_f['granularity'],
+            'sig_act': sig_act, 'granularity': granularity,
             'sig_log_str': sig_log_str, 'sig_mu': gauss_mu,
             'sig_cil': gauss_ci[0], 'sig_ciu': gauss_ci[1]
         }
+
+    def evaluate_matrix(self, matrix, granularity, contraries):
+        return [
+            self.evaluate(
+                series=pd.Series(m[~np.isnan(m)]), granularity=granularity,
+                contrary=c
+            ) for m, c in zip(matrix, contraries)
+        ]
+
+    def signal_frame(self, series, refit_interval=None):
+        y = series.to_numpy()
+        len_y = len(y)
+        n_refit = int(refit_interval or self.__window)
+        z = norm.ppf((1 + self.__ci_level) / 2)
+        x = np.full(len_y, np.nan)
+        sd = np.full(len_y, np.nan)
+        kf = None
+        for a in range(min(self.__window, len_y), len_y, n_refit):
+            y_w = y[max(a - self.__window, 0):a]
+            q, r = KalmanFilterOptimizer(
+                y=y_w, x0=self.__x0, v0=self.__v0, pmv_ratio=self.__pmv_ratio,
+                steady_state=self.__steady_state
+            ).optimize()
+            if kf is None:
+                kf = KalmanFilter(
+                    x0=self.__x0, v0=self.__v0, q=q, r=r,
+                    steady_state=self.__steady_state
+                )
+                kf.fit(y=y_w)
+            df_kf = kf.fit(y=y[a:(a + n_refit)], q=q, r=r)
+            x[a:(a + len(df_kf))] = df_kf['x']
+            sd[a:(a + len(df_kf))] = np.sqrt(df_kf['v'] + q)
+        return pd.DataFrame(
+            {
+                'sig_dir': np.where(
+                    (x + z * sd < 0) | (x - z * sd > 0), np.sign(x), 0
+                ).astype(np.int8),
+                'sig_mu': x, 'sig_cil': (x - z * sd), 'sig_ciu': (x + z * sd)
+            },
+            index=series.index
+        )
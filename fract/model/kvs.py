@@ -9,25 +9,43 @@ from pprint import pformat
 import pandas as pd
 import redis
 
+from ..util.shmring import TickRingReader
 from .base import BaseTrader
 
 
 class RedisTrader(BaseTrader):
     def __init__(self, model, config_dict, instruments, redis_host='127.0.0.1',
-                 redis_port=6379, redis_db=0, interval_sec=1, timeout_sec=3600,
-                 log_dir_path=None, ignore_api_error=False, quiet=False,
-                 dry_run=False):
+                 redis_port=6379, redis_db=0, shm_name=None, interval_sec=1,
+                 timeout_sec=3600, log_dir_path=None, journal_path=None,
+                 checkpoint_path=None, candle_archive_path=None, timing=False,
+                 metrics_port=None, async_order=False, paper=False,
+                 record_path=None, replay_path=None, profile_turns=None,
+                 print_json=False, fake_backend=None, ignore_api_error=False,
+                 quiet=False, dry_run=False):
         super().__init__(
             model=model, standalone=False, ignore_api_error=ignore_api_error,
             config_dict=config_dict, instruments=instruments,
-            log_dir_path=log_dir_path, quiet=quiet, dry_run=dry_run
+            log_dir_path=log_dir_path, journal_path=journal_path,
+            checkpoint_path=checkpoint_path,
+            candle_archive_path=candle_archive_path, timing=timing,
+            metrics_port=metrics_port, async_order=async_order, paper=paper,
+            record_path=record_path, replay_path=replay_path,
+            profile_turns=profile_turns, print_json=print_json,
+            fake_backend=fake_backend, quiet=quiet, dry_run=dry_run
         )
         self.__logger = logging.getLogger(__name__)
         self.__interval_sec = float(interval_sec)
         self.__timeout_sec = float(timeout_sec) if timeout_sec else None
-        self.__redis_pool = redis.ConnectionPool(
-            host=redis_host, port=int(redis_port), db=int(redis_db)
-        )
+        if shm_name:
+            self.__ring = TickRingReader(
+                instruments=self.instruments, name=shm_name
+            )
+            self.__redis_pool = None
+        else:
+            self.__ring = None
+            self.__redis_pool = redis.ConnectionPool(
+                host=redis_host, port=int(redis_port), db=int(redis_db)
+            )
         self.__is_active = True
         self.__latest_update_time = None
         self.__logger.debug('vars(self):\t' + pformat(vars(self)))
@@ -36,47 +54,66 @@ class RedisTrader(BaseTrader):
         if not self.__latest_update_time:
             return self.__is_active
         elif not self.__is_active:
-            self.__redis_pool.disconnect()
+            self._disconnect()
             return self.__is_active
         else:
             td = datetime.now() - self.__latest_update_time
             if self.__timeout_sec and td.total_seconds() > self.__timeout_sec:
                 self.__logger.warning(f'Timeout:\t{self.__timeout_sec} sec')
                 self.__is_active = False
-                self.__redis_pool.disconnect()
+                self._disconnect()
             else:
                 time.sleep(self.__interval_sec)
             return self.__is_active
 
+    def _disconnect(self):
+        if self.__ring:
+            self.__ring.close()
+        else:
+            self.__redis_pool.disconnect()
+
     def make_decision(self, instrument):
         df_r = self._fetch_rate_df(instrument=instrument)
         if df_r.size:
             self.update_caches(df_rate=df_r)
             st = self.determine_sig_state(df_rate=df_r)
-            self.print_state_line(df_rate=df_r, add_str=st['log_str'])
             self.design_and_place_order(instrument=instrument, act=st['act'])
-            self.write_turn_log(
-                df_rate=df_r,
-                **{k: v for k, v in st.items() if not k.endswith('log_str')}
-            )
+            sig = {k: v for k, v in st.items() if not k.endswith('log_str')}
+            self.print_state_line(df_rate=df_r, add_str=st['log_str'], **sig)
+            self.write_turn_log(df_rate=df_r, **sig)
             self.__latest_update_time = datetime.now()
         else:
             self.__logger.debug('no updated rate')
 
     def _fetch_rate_df(self, instrument):
-        redis_c = redis.StrictRedis(connection_pool=self.__redis_pool)
-        cached_rates = [
-            json.loads(s) for s in redis_c.lrange(instrument, 0, -1)
-        ]
-        if len(cached_rates) > 0:
+        if self.__ring and not self.player:
+            return self._fetch_ring_rate_df(instrument=instrument)
+        elif self.player:
+            cached_rates = self.player.redis_rates(instrument=instrument)
+        else:
+            redis_c = redis.StrictRedis(connection_pool=self.__redis_pool)
+            cached_rates = [
+                json.loads(s) for s in redis_c.lrange(instrument, 0, -1)
+            ]
             for _ in cached_rates:
                 redis_c.lpop(instrument)
+        if self.recorder:
+            self.recorder.write(
+                'redis', instrument=instrument, rates=cached_rates
+            )
+        self.metrics.set(
+            'redis_backlog', len(cached_rates), instrument=instrument
+        )
+        if len(cached_rates) > 0:
+            self.metrics.inc(
+                'ticks_total', len(cached_rates), instrument=instrument
+            )
             if [r for r in cached_rates if not r['tradeable']]:
                 self.__logger.warning(f'cached_rates:\t{cached_rates}')
                 self.__is_active = False
                 return pd.DataFrame()
             else:
-                self.__logger.debug(f'cached_rates:\t{cached_rates}')
+                self.__logger.debug('cached_rates:\t%s', cached_rates)
                 return pd.DataFrame([
                     {
                         'time': r['time'], 'bid': r['closeoutBid'],
@@ -88,3 +125,32 @@ class RedisTrader(BaseTrader):
                 ).set_index('time')
         else:
             return pd.DataFrame()
+
+    def _fetch_ring_rate_df(self, instrument):
+        ticks = self.__ring.read(instrument=instrument)
+        times = pd.to_datetime(ticks['time'], utc=True)
+        if self.recorder:
+            self.recorder.write(
+                'redis', instrument=instrument,
+                rates=[
+                    {
+                        'time': t.isoformat(), 'closeoutBid': float(b),
+                        'closeoutAsk': float(a), 'tradeable': bool(f)
+                    } for t, b, a, f in zip(
+                        times, ticks['bid'], ticks['ask'], ticks['tradeable']
+                    )
+                ]
+            )
+        self.metrics.set('redis_backlog', len(ticks), instrument=instrument)
+        if not len(ticks):
+            return pd.DataFrame()
+        self.metrics.inc('ticks_total', len(ticks), instrument=instrument)
+        if not ticks['tradeable'].all():
+            self.__logger.warning('untradeable ticks:\t%s', ticks)
+            self.__is_active = False
+            return pd.DataFrame()
+        else:
+            return pd.DataFrame(
+                {'bid': ticks['bid'], 'ask': ticks['ask']},
+                index=pd.Index(times, name='time')
+            ).assign(instrument=instrument)
@@ -3,9 +3,11 @@
 import logging
 import warnings
 
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
+from scipy.stats import chi2
 
+from ..util.candle import granularity2str
 from .feature import LogReturnFeature
 
 
@@ -21,30 +23,74 @@ class LRFeatureSieve(LogReturnFeature):
         if len(history_dict) == 1:
             granularity = list(history_dict.keys())[0]
         elif method == 'Ljung-Box':
+            from statsmodels.stats.diagnostic import acorr_ljungbox
             with warnings.catch_warnings():
                 warnings.simplefilter('ignore', FutureWarning)
                 df_g = pd.DataFrame([
                     {
                         'granularity': g,
-                        'pvalue': sm.stats.diagnostic.acorr_ljungbox(x=s)[1][0]
+                        'pvalue': acorr_ljungbox(
+                            x=s, lags=1, return_df=False
+                        )[1][0]
                     } for g, s in feature_dict.items()
                 ])
             best_g = df_g.pipe(lambda d: d.iloc[d['pvalue'].idxmin()])
             granularity = best_g['granularity']
-            self.__logger.debug('p-value:\t{}'.format(best_g['pvalue']))
+            self.__logger.debug('p-value:\t%s', best_g['pvalue'])
         else:
             raise ValueError(f'invalid method name:\t{method}')
         return {
             'series': feature_dict[granularity], 'granularity': granularity,
-            'granularity_str': self._granularity2str(granularity=granularity)
+            'granularity_str': granularity2str(granularity=granularity)
+        }
+
+    def extract_best_features(self, history_by_instrument,
+                              method='Ljung-Box'):
+        if method != 'Ljung-Box':
+            raise ValueError(f'invalid method name:\t{method}')
+        matrix_dict = dict()
+        for g in dict.fromkeys(
+                g for h in history_by_instrument.values() for g in h):
+            insts = [
+                i for i, h in history_by_instrument.items() if g in h
+            ]
+            m = self.frame_matrix(
+                frames=[history_by_instrument[i][g] for i in insts]
+            )
+            m = self._compact_right(m, keep=~np.isnan(m))[0]
+            matrix_dict[g] = {
+                'instruments': insts, 'matrix': m,
+                'pvalue': self._ljung_box_pvalues(matrix=m)
+            }
+        best_dict = dict()
+        for i, h in history_by_instrument.items():
+            gs = list(h)
+            p = np.array([
+                matrix_dict[g]['pvalue'][
+                    matrix_dict[g]['instruments'].index(i)
+                ] for g in gs
+            ])
+            best_dict[i] = gs[
+                int(np.nanargmin(p))
+                if len(gs) > 1 and not np.isnan(p).all() else 0
+            ]
+            if len(gs) > 1:
+                self.__logger.debug('p-value:\t%s, %s', i, np.nanmin(p))
+        return {
+            g: {
+                **d,
+                'best': np.array([best_dict[i] == g for i in d['instruments']])
+            } for g, d in matrix_dict.items()
         }
 
     @staticmethod
-    def _granularity2str(granularity='S5'):
-        return (
-            'TCK' if granularity == 'TICK'
-            else '{0:0>2}{1:1}'.format(
-                int(granularity[1:] if len(granularity) > 1 else 1),
-                granularity[0]
+    def _ljung_box_pvalues(matrix):
+        n = np.count_nonzero(~np.isnan(matrix), axis=1)
+        d = matrix - np.nanmean(matrix, axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = (
+                np.nansum(d[:, 1:] * d[:, :-1], axis=1)
+                / np.nansum(np.square(d), axis=1)
             )
-        )
+            q = n * (n + 2) * np.square(r) / (n - 1)
+        return chi2.sf(q, df=1)
@@ -10,12 +10,22 @@ from .base import BaseTrader
 
 class StandaloneTrader(BaseTrader):
     def __init__(self, model, config_dict, instruments, interval_sec=1,
-                 timeout_sec=3600, log_dir_path=None, ignore_api_error=False,
+                 timeout_sec=3600, log_dir_path=None, journal_path=None,
+                 checkpoint_path=None, candle_archive_path=None, timing=False,
+                 metrics_port=None, async_order=False, paper=False,
+                 record_path=None, replay_path=None, profile_turns=None,
+                 print_json=False, fake_backend=None, ignore_api_error=False,
                  quiet=False, dry_run=False):
         super().__init__(
             model=model, standalone=True, ignore_api_error=ignore_api_error,
             config_dict=config_dict, instruments=instruments,
-            log_dir_path=log_dir_path, quiet=quiet, dry_run=dry_run
+            log_dir_path=log_dir_path, journal_path=journal_path,
+            checkpoint_path=checkpoint_path,
+            candle_archive_path=candle_archive_path, timing=timing,
+            metrics_port=metrics_port, async_order=async_order, paper=paper,
+            record_path=record_path, replay_path=replay_path,
+            profile_turns=profile_turns, print_json=print_json,
+            fake_backend=fake_backend, quiet=quiet, dry_run=dry_run
         )
         self.__logger = logging.getLogger(__name__)
         self.__interval_sec = float(interval_sec)
@@ -38,10 +48,8 @@ class StandaloneTrader(BaseTrader):
     def make_decision(self, instrument):
         df_r = self.fetch_latest_price_df(instrument=instrument)
         st = self.determine_sig_state(df_rate=df_r)
-        self.print_state_line(df_rate=df_r, add_str=st['log_str'])
         self.design_and_place_order(instrument=instrument, act=st['act'])
-        self.write_turn_log(
-            df_rate=df_r,
-            **{k: v for k, v in st.items() if not k.endswith('log_str')}
-        )
+        sig = {k: v for k, v in st.items() if not k.endswith('log_str')}
+        self.print_state_line(df_rate=df_r, add_str=st['log_str'], **sig)
+        self.write_turn_log(df_rate=df_r, **sig)
         self.__latest_update_time = datetime.now()
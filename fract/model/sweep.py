@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .backtest import Backtester
+
+_shared_inputs = dict()
+
+
+class ParameterSweeper(object):
+    def __init__(self, config_dict, spec_dict, model='ewma', granularity='S5',
+                 processes=None):
+        self.__logger = logging.getLogger(__name__)
+        self.cf = config_dict
+        self.__params = spec_dict['params']
+        self.__method = spec_dict.get('method', 'grid')
+        self.__n_iter = int(spec_dict.get('n_iter', 100))
+        self.__seed = spec_dict.get('seed')
+        self.__model = model
+        self.__granularity = granularity
+        self.__processes = int(processes or os.cpu_count())
+        for k in self.__params.keys():
+            self._fetch_nested_value(d=self.cf, key=k)
+
+    def generate_params(self):
+        keys = list(self.__params.keys())
+        if self.__method == 'grid':
+            return [
+                dict(zip(keys, v))
+                for v in product(*[self.__params[k] for k in keys])
+            ]
+        elif self.__method == 'random':
+            rng = np.random.default_rng(self.__seed)
+            return [
+                {k: self._sample(rng=rng, spec=self.__params[k]) for k in keys}
+                for _ in range(self.__n_iter)
+            ]
+        else:
+            raise ValueError(f'invalid search method:\t{self.__method}')
+
+    @staticmethod
+    def _sample(rng, spec):
+        if isinstance(spec, list):
+            return spec[rng.integers(len(spec))]
+        elif spec.get('log'):
+            return float(
+                np.exp(rng.uniform(np.log(spec['min']), np.log(spec['max'])))
+            )
+        else:
+            return float(rng.uniform(spec['min'], spec['max']))
+
+    def create_config(self, params):
+        cf = deepcopy(self.cf)
+        for k, v in params.items():
+            *parents, leaf = k.split('.')
+            d = cf
+            for p in parents:
+                d = d[p]
+            d[leaf] = v
+        return cf
+
+    @staticmethod
+    def _fetch_nested_value(d, key):
+        v = d
+        for k in key.split('.'):
+            if not isinstance(v, dict) or k not in v:
+                raise KeyError(f'invalid config key:\t{key}')
+            v = v[k]
+        return v
+
+    def run(self, df_rates):
+        param_list = self.generate_params()
+        self.__logger.info(f'Parameter sets:\t{len(param_list)}')
+        cfs = [self.create_config(params=p) for p in param_list]
+        shms = list()
+        try:
+            layout = dict()
+            for i, df_rate in df_rates.items():
+                layout[i] = {
+                    'candle': {
+                        'time': self._share(
+                            shms, df_rate.index.tz_convert('UTC').asi8
+                        ),
+                        **{
+                            c: self._share(shms, df_rate[c].to_numpy(float))
+                            for c in ['bid', 'ask', 'volume']
+                        }
+                    },
+                    'feature': dict()
+                }
+                for f in sorted({cf['feature']['type'] for cf in cfs}):
+                    cf_f = [c for c in cfs if c['feature']['type'] == f][0]
+                    s = Backtester(
+                        config_dict=cf_f, model=self.__model,
+                        granularity=self.__granularity
+                    ).compute_feature(df_rate=df_rate)
+                    self.__logger.info(f'Feature computed:\t{i}, {f}')
+                    layout[i]['feature'][f] = {
+                        'index': self._share(shms, s.index.to_numpy()),
+                        'value': self._share(shms, s.to_numpy(float))
+                    }
+            with ProcessPoolExecutor(
+                    max_workers=self.__processes,
+                    initializer=_attach_shared_inputs, initargs=(layout,)
+            ) as executor:
+                futures = {
+                    (n, i): executor.submit(
+                        _run_backtest, config_dict=cf, model=self.__model,
+                        granularity=self.__granularity, instrument=i
+                    ) for (n, cf), i
+                    in product(enumerate(cfs), df_rates.keys())
+                }
+                summaries = {k: f.result() for k, f in futures.items()}
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+        return pd.DataFrame([
+            {
+                **p,
+                **{
+                    k: agg([
+                        summaries[(n, i)][k] for i in df_rates.keys()
+                    ]) for k, agg in [
+                        ('n_trade', sum), ('n_win', sum), ('pl', sum),
+                        ('max_drawdown', max), ('max_drawdown_ratio', max)
+                    ]
+                }
+            } for n, p in enumerate(param_list)
+        ]).sort_values(
+            ['pl', 'max_drawdown'], ascending=[False, True]
+        ).pipe(
+            lambda d: d.set_axis(pd.RangeIndex(1, len(d) + 1, name='rank'))
+        )
+
+    @staticmethod
+    def _share(shms, array):
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(array.nbytes, 1)
+        )
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        shms.append(shm)
+        return (shm.name, array.shape, array.dtype.str)
+
+
+def _attach_shared_inputs(layout):
+    def _attach(name, shape, dtype):
+        shm = shared_memory.SharedMemory(name=name)
+        _shared_inputs.setdefault('shms', list()).append(shm)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    for i, d in layout.items():
+        c = {k: _attach(*v) for k, v in d['candle'].items()}
+        _shared_inputs[i] = {
+            'df_rate': pd.DataFrame(
+                {k: c[k] for k in ['bid', 'ask', 'volume']},
+                index=pd.DatetimeIndex(c['time'], tz='UTC', name='time')
+            ),
+            'feature': {
+                f: pd.Series(_attach(*v['value']), index=_attach(*v['index']))
+                for f, v in d['feature'].items()
+            }
+        }
+
+
+def _run_backtest(config_dict, model, granularity, instrument):
+    inputs = _shared_inputs[instrument]
+    return Backtester(
+        config_dict=config_dict, model=model, granularity=granularity
+    ).run(
+        df_rate=inputs['df_rate'],
+        feature=inputs['feature'][config_dict['feature']['type']]
+    )['summary']
@@ -0,0 +1,40 @@
+CREATE TABLE IF NOT EXISTS rate (
+  instrument TEXT NOT NULL,
+  time TEXT NOT NULL,
+  bid REAL,
+  ask REAL
+);
+
+CREATE TABLE IF NOT EXISTS signal (
+  instrument TEXT NOT NULL,
+  time TEXT NOT NULL,
+  act TEXT,
+  state TEXT,
+  sig_act TEXT,
+  granularity TEXT,
+  detail TEXT
+);
+
+CREATE TABLE IF NOT EXISTS order_log (
+  instrument TEXT,
+  time TEXT NOT NULL,
+  func TEXT NOT NULL,
+  status INTEGER,
+  body TEXT
+);
+
+CREATE TABLE IF NOT EXISTS txn (
+  id INTEGER PRIMARY KEY,
+  instrument TEXT,
+  time TEXT NOT NULL,
+  type TEXT,
+  units REAL,
+  pl REAL,
+  body TEXT
+);
+
+CREATE INDEX IF NOT EXISTS rate_instrument_time ON rate (instrument, time);
+CREATE INDEX IF NOT EXISTS signal_instrument_time ON signal (instrument, time);
+CREATE INDEX IF NOT EXISTS order_log_instrument_time
+  ON order_log (instrument, time);
+CREATE INDEX IF NOT EXISTS txn_instrument_time ON txn (instrument, time);
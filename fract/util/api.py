@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+
+import v20
+from oandacli.util.config import create_api as create_oanda_api
+
+
+def create_api(config, stream=False, **kwargs):
+    oc = config['oanda']
+    if oc.get('hostname'):
+        return v20.Context(
+            hostname=oc['hostname'], port=int(oc.get('port', 443)),
+            ssl=bool(oc.get('ssl', True)), token=oc['token'], **kwargs
+        )
+    else:
+        return create_oanda_api(config=config, stream=stream, **kwargs)
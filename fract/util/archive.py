@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import fcntl
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .candle import CANDLE_DTYPE, CandleFrame
+
+
+class CandleArchive(object):
+    def __init__(self, dir_path):
+        self.__logger = logging.getLogger(__name__)
+        self.dir_path = Path(dir_path).resolve()
+        os.makedirs(self.dir_path, exist_ok=True)
+
+    def path(self, instrument, granularity):
+        return self.dir_path.joinpath(f'candle.{granularity}.{instrument}.bin')
+
+    def read(self, instrument, granularity):
+        return read_candle_archive(
+            path=self.path(instrument=instrument, granularity=granularity)
+        )
+
+    def append(self, instrument, granularity, records):
+        p = self.path(instrument=instrument, granularity=granularity)
+        with open(p, 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                n_rec = os.fstat(f.fileno()).st_size // CANDLE_DTYPE.itemsize
+                f.truncate(n_rec * CANDLE_DTYPE.itemsize)
+                last_time = (
+                    np.fromfile(
+                        p, dtype=CANDLE_DTYPE, count=1,
+                        offset=((n_rec - 1) * CANDLE_DTYPE.itemsize)
+                    )['time'][0] if n_rec else None
+                )
+                new = (
+                    records[records['time'] > last_time]
+                    if last_time is not None else records
+                )
+                if new.size:
+                    f.write(np.ascontiguousarray(new).tobytes())
+                    f.flush()
+                    self.__logger.debug(
+                        f'Append {new.size} candles:\t{p.name}'
+                    )
+                return new.size
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_df(self, instrument, granularity, count=None):
+        return candle_records2df(
+            records=self.read(instrument=instrument, granularity=granularity),
+            count=count
+        )
+
+
+def read_candle_archive(path):
+    p = Path(path)
+    n_rec = (
+        p.stat().st_size // CANDLE_DTYPE.itemsize if p.is_file() else 0
+    )
+    if n_rec:
+        return np.memmap(p, dtype=CANDLE_DTYPE, mode='r', shape=(n_rec,))
+    else:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+
+def candle_records2df(records, count=None):
+    return CandleFrame.from_records(
+        records=(records[-int(count):] if count else records)
+    ).to_df()
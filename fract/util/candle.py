@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+import logging
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CANDLE_DTYPE = np.dtype(
+    [('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('volume', '<i8')]
+)
+
+
+def read_candle_df(data_path, instrument=None, granularity=None):
+    logger = logging.getLogger(__name__)
+    path = Path(data_path).resolve()
+    bin_path = path.joinpath(f'candle.{granularity}.{instrument}.bin')
+    if bin_path.is_file():
+        from .archive import read_candle_archive
+        logger.info(f'Read a candle archive:\t{bin_path}')
+        return CandleFrame.from_records(
+            records=read_candle_archive(path=bin_path)
+        ).to_df()
+    elif path.is_dir():
+        csv_paths = sorted(
+            path.glob(
+                'candle.{0}.{1}.*.csv'.format(
+                    (granularity or '*'), (instrument or '*')
+                )
+            )
+        )
+        if not csv_paths:
+            raise FileNotFoundError(f'no candle CSV:\t{path}')
+        logger.info(f'Read {len(csv_paths)} CSV files:\t{path}')
+        df = pd.concat([pd.read_csv(p) for p in csv_paths], sort=False)
+    elif _is_sqlite(path=path):
+        logger.info(f'Read an SQLite3 database:\t{path}')
+        with sqlite3.connect(str(path)) as con:
+            df = pd.read_sql_query(
+                'SELECT * FROM candle'
+                + (' WHERE instrument = ?;' if instrument else ';'),
+                con, params=([instrument] if instrument else None)
+            )
+    else:
+        logger.info(f'Read a CSV file:\t{path}')
+        df = pd.read_csv(path)
+    if instrument and 'instrument' in df.columns:
+        df = df[df['instrument'] == instrument]
+    if not df.size:
+        raise ValueError(f'no candle:\t{instrument}')
+    return df.rename(
+        columns={'closeBid': 'bid', 'closeAsk': 'ask'}
+    ).assign(
+        time=lambda d: pd.to_datetime(d['time'], utc=True)
+    ).drop_duplicates(
+        subset=['time'], keep='last'
+    ).sort_values('time').set_index('time')[['bid', 'ask', 'volume']]
+
+
+def _is_sqlite(path):
+    with open(path, 'rb') as f:
+        return f.read(16) == b'SQLite format 3\x00'
+
+
+def granularity2offset(granularity):
+    if granularity == 'D':
+        return pd.Timedelta(days=1)
+    else:
+        return pd.Timedelta(
+            **{
+                {'S': 'seconds', 'M': 'minutes', 'H': 'hours'}[
+                    granularity[0]
+                ]: int(granularity[1:])
+            }
+        )
+
+
+def granularity2str(granularity='S5'):
+    return (
+        'TCK' if granularity == 'TICK'
+        else '{0:0>2}{1:1}'.format(
+            int(granularity[1:] if len(granularity) > 1 else 1),
+            granularity[0]
+        )
+    )
+
+
+class CandleFrame(object):
+    __slots__ = ('instrument', 'granularity', 'time', 'bid', 'ask', 'volume')
+
+    def __init__(self, time, bid, ask, volume, instrument=None,
+                 granularity=None, dtype=np.float64):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.time = np.asarray(time, dtype=np.int64)
+        self.bid = np.asarray(bid, dtype=dtype)
+        self.ask = np.asarray(ask, dtype=dtype)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def from_v20(cls, candles, instrument=None, granularity=None,
+                 dtype=np.float64):
+        cs = [c for c in candles if c.complete]
+        n = len(cs)
+        return cls(
+            time=pd.to_datetime([c.time for c in cs]).asi8,
+            bid=np.fromiter((c.bid.c for c in cs), dtype=dtype, count=n),
+            ask=np.fromiter((c.ask.c for c in cs), dtype=dtype, count=n),
+            volume=np.fromiter((c.volume for c in cs), dtype=int, count=n),
+            instrument=instrument, granularity=granularity, dtype=dtype
+        )
+
+    @classmethod
+    def from_records(cls, records, instrument=None, granularity=None,
+                     dtype=np.float64):
+        return cls(
+            time=records['time'], bid=records['bid'], ask=records['ask'],
+            volume=records['volume'], instrument=instrument,
+            granularity=granularity, dtype=dtype
+        )
+
+    @classmethod
+    def from_df(cls, df, instrument=None, granularity=None,
+                dtype=np.float64):
+        return cls(
+            time=df.index.asi8, bid=df['bid'].to_numpy(dtype=dtype),
+            ask=df['ask'].to_numpy(dtype=dtype),
+            volume=(
+                df['volume'].to_numpy(dtype=np.int64)
+                if 'volume' in df.columns else np.ones(len(df), dtype=int)
+            ),
+            instrument=instrument, granularity=granularity, dtype=dtype
+        )
+
+    def __len__(self):
+        return self.time.size
+
+    @property
+    def nbytes(self):
+        return sum(
+            getattr(self, k).nbytes for k in ['time', 'bid', 'ask', 'volume']
+        )
+
+    def _slice(self, key):
+        return CandleFrame(
+            time=self.time[key], bid=self.bid[key], ask=self.ask[key],
+            volume=self.volume[key], instrument=self.instrument,
+            granularity=self.granularity, dtype=self.bid.dtype
+        )
+
+    def tail(self, n):
+        return self._slice(slice(-int(n), None) if n else slice(0, 0))
+
+    def append(self, other, max_len=None):
+        a = max(len(self) + len(other) - int(max_len), 0) if max_len else 0
+        return CandleFrame(
+            **{
+                k: np.concatenate([getattr(self, k), getattr(other, k)])[a:]
+                for k in ['time', 'bid', 'ask', 'volume']
+            },
+            instrument=(self.instrument or other.instrument),
+            granularity=(self.granularity or other.granularity),
+            dtype=self.bid.dtype
+        )
+
+    def with_volume(self, volume):
+        return CandleFrame(
+            time=self.time, bid=self.bid, ask=self.ask,
+            volume=np.broadcast_to(volume, self.time.shape),
+            instrument=self.instrument, granularity=self.granularity,
+            dtype=self.bid.dtype
+        )
+
+    def to_records(self):
+        rec = np.empty(len(self), dtype=CANDLE_DTYPE)
+        for k in CANDLE_DTYPE.names:
+            rec[k] = getattr(self, k)
+        return rec
+
+    def to_df(self):
+        return pd.DataFrame(
+            {'bid': self.bid, 'ask': self.ask, 'volume': self.volume},
+            index=pd.DatetimeIndex(
+                self.time.astype('datetime64[ns]'), name='time'
+            ).tz_localize('UTC')
+        )
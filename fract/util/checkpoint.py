@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b'FRACTCKP'
+VERSION = 1
+_prefix = struct.Struct('<8sII')
+_align = 64
+
+
+def write_checkpoint(path, meta, arrays):
+    logger = logging.getLogger(__name__)
+    dest = Path(path).resolve()
+    arrs = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    layout = list()
+    offset = 0
+    for k, a in arrs.items():
+        layout.append({
+            'name': k, 'dtype': a.dtype.str, 'shape': list(a.shape),
+            'offset': offset
+        })
+        offset += -(-a.nbytes // _align) * _align
+    header = json.dumps({'meta': meta, 'arrays': layout}).encode()
+    data_start = -(-(_prefix.size + len(header)) // _align) * _align
+    tmp = dest.parent.joinpath(f'.{dest.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_prefix.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for d, a in zip(layout, arrs.values()):
+            f.seek(data_start + d['offset'])
+            f.write(a.tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, dest)
+    logger.info(f'Write a checkpoint:\t{dest}')
+
+
+def read_checkpoint(path):
+    logger = logging.getLogger(__name__)
+    src = Path(path).resolve()
+    with open(src, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, len_h = (
+        _prefix.unpack_from(mm, 0) if len(mm) >= _prefix.size
+        else (None, None, None)
+    )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'invalid checkpoint:\t{src}')
+    header = json.loads(mm[_prefix.size:(_prefix.size + len_h)])
+    data_start = -(-(_prefix.size + len_h) // _align) * _align
+    arrays = {
+        d['name']: np.frombuffer(
+            mm, dtype=d['dtype'], count=int(np.prod(d['shape'])),
+            offset=(data_start + d['offset'])
+        ).reshape(d['shape']) for d in header['arrays']
+    }
+    logger.info(f'Read a checkpoint:\t{src}')
+    return header['meta'], arrays
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+import logging
+
+import numpy as np
+
+
+class ConversionIndex(object):
+    def __init__(self, instruments, account_currency, targets=None):
+        self.__logger = logging.getLogger(__name__)
+        self.instruments = list(instruments)
+        self.account_currency = account_currency
+        self.targets = [
+            i for i in self.instruments if targets is None or i in targets
+        ]
+        self.__col = {i: n for n, i in enumerate(self.instruments)}
+        self.exponents = np.array(
+            [self._bp_exponents(instrument=i) for i in self.targets],
+            dtype=float
+        ).reshape(len(self.targets), len(self.instruments))
+
+    def matches(self, instruments, account_currency):
+        return (
+            account_currency == self.account_currency
+            and list(instruments) == self.instruments
+        )
+
+    def bp_values(self, prices):
+        log_p = np.log(np.asarray(prices, dtype=float))
+        missing = np.isnan(log_p)
+        bpv = np.exp(self.exponents @ np.where(missing, 0, log_p))
+        bpv[(self.exponents[:, missing] != 0).any(axis=1)] = np.nan
+        return bpv
+
+    def _unit(self, instrument, sign=1):
+        e = np.zeros(len(self.instruments))
+        e[self.__col[instrument]] = sign
+        return e
+
+    def _bp_exponents(self, instrument):
+        base, quote = instrument.split('_')
+        acc = self.account_currency
+        if base == acc:
+            return self._unit(instrument=instrument, sign=-1)
+        elif quote == acc:
+            return self._unit(instrument=instrument)
+        else:
+            for i in self.instruments:
+                if i == f'{base}_{acc}':
+                    return self._unit(instrument=i)
+                elif i == f'{acc}_{base}':
+                    return self._unit(instrument=i, sign=-1)
+                elif i == f'{quote}_{acc}':
+                    return self._unit(instrument=instrument) + self._unit(i)
+                elif i == f'{acc}_{quote}':
+                    return (
+                        self._unit(instrument=instrument)
+                        - self._unit(instrument=i)
+                    )
+            v_base = self._currency_value(currency=base)
+            if v_base is not None:
+                return v_base
+            v_quote = self._currency_value(currency=quote)
+            if v_quote is not None:
+                return self._unit(instrument=instrument) + v_quote
+            else:
+                raise ValueError(f'bp value calculation failed:\t{instrument}')
+
+    def _currency_value(self, currency):
+        acc = self.account_currency
+        direct = {
+            c: (
+                self._unit(instrument=f'{c}_{acc}')
+                if f'{c}_{acc}' in self.__col
+                else self._unit(instrument=f'{acc}_{c}', sign=-1)
+            ) for c in {c for i in self.instruments for c in i.split('_')}
+            if {f'{c}_{acc}', f'{acc}_{c}'} & set(self.__col)
+        }
+        if currency in direct:
+            return direct[currency]
+        else:
+            for i in self.instruments:
+                pair = i.split('_')
+                if pair[0] == currency and pair[1] in direct:
+                    self.__logger.debug(f'two-hop conversion:\t{i}')
+                    return self._unit(instrument=i) + direct[pair[1]]
+                elif pair[1] == currency and pair[0] in direct:
+                    self.__logger.debug(f'two-hop conversion:\t{i}')
+                    return direct[pair[0]] - self._unit(instrument=i)
+            return None
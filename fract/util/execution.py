@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class OrderExecutor(object):
+    def __init__(self, execute, max_age_sec=10, metrics=None):
+        self.__logger = logging.getLogger(__name__)
+        self.__execute = execute
+        self.__max_age_sec = float(max_age_sec)
+        self.__metrics = metrics
+        self.__heap = list()
+        self.__pending = dict()
+        self.__versions = dict()
+        self.__in_flight = None
+        self.__error = None
+        self.__seq = itertools.count()
+        self.__cond = threading.Condition()
+        self.__stopped = False
+        self.__thread = threading.Thread(
+            target=self._run, name='order-executor', daemon=True
+        )
+        self.__thread.start()
+
+    def versions(self):
+        with self.__cond:
+            return self.__versions.copy()
+
+    def submit(self, instrument, steps, version):
+        with self.__cond:
+            if self.__pending.pop(instrument, None):
+                self._count(result='superseded')
+            if steps and version != self.__versions.get(instrument, 0):
+                self.__logger.info(f'Drop a stale order:\t{instrument}')
+                self._count(result='stale')
+            elif steps:
+                self._push(
+                    job={
+                        'instrument': instrument, 'steps': list(steps),
+                        'version': version, 'time': time.monotonic()
+                    }
+                )
+            self._set_length()
+
+    def _push(self, job):
+        self.__pending[job['instrument']] = job
+        heapq.heappush(
+            self.__heap, (
+                int(job['steps'][0][0] != 'close'), next(self.__seq), job
+            )
+        )
+        self.__cond.notify_all()
+
+    def _pop(self):
+        with self.__cond:
+            while True:
+                if self.__stopped:
+                    return None
+                elif self.__heap:
+                    job = heapq.heappop(self.__heap)[-1]
+                    i = job['instrument']
+                    if self.__pending.get(i) is not job:
+                        continue
+                    del self.__pending[i]
+                    self._set_length()
+                    if time.monotonic() - job['time'] > self.__max_age_sec:
+                        self.__logger.warning(f'Drop an expired order:\t{i}')
+                        self._count(result='expired')
+                    elif job['version'] != self.__versions.get(i, 0):
+                        self.__logger.info(f'Drop a stale order:\t{i}')
+                        self._count(result='stale')
+                    else:
+                        self.__in_flight = i
+                        return job
+                else:
+                    self.__cond.wait()
+
+    def _run(self):
+        while True:
+            job = self._pop()
+            if job is None:
+                break
+            i = job['instrument']
+            step, rest = job['steps'][0], job['steps'][1:]
+            try:
+                self.__execute(*step, instrument=i)
+            except Exception as e:
+                self.__logger.error(f'Order failed:\t{i}, {step[0]}')
+                self._count(result='failed')
+                rest = list()
+                with self.__cond:
+                    self.__error = self.__error or e
+            else:
+                self._count(result='executed')
+            with self.__cond:
+                self.__in_flight = None
+                self.__versions[i] = self.__versions.get(i, 0) + 1
+                if rest and i not in self.__pending:
+                    self._push(
+                        job={
+                            **job, 'steps': rest,
+                            'version': self.__versions[i]
+                        }
+                    )
+                self._set_length()
+                self.__cond.notify_all()
+
+    def check(self):
+        with self.__cond:
+            e, self.__error = self.__error, None
+        if e:
+            raise e
+
+    def join(self, timeout=None):
+        deadline = (time.monotonic() + timeout) if timeout else None
+        with self.__cond:
+            while self.__pending or self.__in_flight:
+                wait = (deadline - time.monotonic()) if deadline else None
+                if wait is not None and wait <= 0:
+                    return False
+                self.__cond.wait(timeout=wait)
+        return True
+
+    def shutdown(self, timeout=30):
+        self.join(timeout=timeout)
+        with self.__cond:
+            if self.__pending:
+                self.__logger.warning(
+                    'Drop pending orders:\t{}'.format(list(self.__pending))
+                )
+            self.__stopped = True
+            self.__cond.notify_all()
+        self.__thread.join(timeout=timeout)
+
+    def _count(self, result):
+        if self.__metrics:
+            self.__metrics.inc('orders_total', result=result)
+
+    def _set_length(self):
+        if self.__metrics:
+            self.__metrics.set('order_queue_length', len(self.__pending))
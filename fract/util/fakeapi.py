@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from v20.response import Response
+
+from .ratelimit import TokenBucket
+from .synthetic import CURRENCY_VALUES, display_precision
+
+INSTRUMENTS = [
+    'AUD_CAD', 'AUD_CHF', 'AUD_HKD', 'AUD_JPY', 'AUD_NZD', 'AUD_SGD',
+    'AUD_USD', 'CAD_CHF', 'CAD_HKD', 'CAD_JPY', 'CAD_SGD', 'CHF_HKD',
+    'CHF_JPY', 'CHF_ZAR', 'EUR_AUD', 'EUR_CAD', 'EUR_CHF', 'EUR_CZK',
+    'EUR_DKK', 'EUR_GBP', 'EUR_HKD', 'EUR_HUF', 'EUR_JPY', 'EUR_NOK',
+    'EUR_NZD', 'EUR_PLN', 'EUR_SEK', 'EUR_SGD', 'EUR_TRY', 'EUR_USD',
+    'EUR_ZAR', 'GBP_AUD', 'GBP_CAD', 'GBP_CHF', 'GBP_HKD', 'GBP_JPY',
+    'GBP_NZD', 'GBP_PLN', 'GBP_SGD', 'GBP_USD', 'GBP_ZAR', 'HKD_JPY',
+    'NZD_CAD', 'NZD_CHF', 'NZD_HKD', 'NZD_JPY', 'NZD_SGD', 'NZD_USD',
+    'SGD_CHF', 'SGD_HKD', 'SGD_JPY', 'TRY_JPY', 'USD_CAD', 'USD_CHF',
+    'USD_CNH', 'USD_CZK', 'USD_DKK', 'USD_HKD', 'USD_HUF', 'USD_INR',
+    'USD_JPY', 'USD_MXN', 'USD_NOK', 'USD_PLN', 'USD_SAR', 'USD_SEK',
+    'USD_SGD', 'USD_THB', 'USD_TRY', 'USD_ZAR', 'ZAR_JPY'
+]
+
+
+def format_time(timestamp):
+    return timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f000Z')
+
+
+class FakeV20Account(object):
+    def __init__(self, account_id, market, currency='USD', balance=100000,
+                 margin_rate=0.04):
+        self.account_id = account_id
+        self.market = market
+        self.currency = currency
+        self.balance = float(balance)
+        self.margin_rate = float(margin_rate)
+        self.positions = dict()
+        self.txns = list()
+        self.__lock = threading.Lock()
+
+    def last_txn_id(self):
+        return str(len(self.txns))
+
+    def _add_txn(self, **kwargs):
+        t = {
+            'id': str(len(self.txns) + 1), 'accountID': self.account_id,
+            'time': format_time(self.market.now()), **kwargs
+        }
+        self.txns.append(t)
+        return t
+
+    def _to_account_currency(self, amount, currency):
+        return amount * CURRENCY_VALUES[currency] / CURRENCY_VALUES[
+            self.currency
+        ]
+
+    def fill(self, instrument, units, reason='MARKET_ORDER'):
+        with self.__lock:
+            p = self.market.price(instrument=instrument)
+            price = p['ask'] if units > 0 else p['bid']
+            order = self._add_txn(
+                type='MARKET_ORDER', instrument=instrument, units=str(units),
+                timeInForce='FOK', positionFill='DEFAULT', reason=reason
+            )
+            pos = self.positions.get(
+                instrument, {'units': 0, 'price': 0.0, 'trade_id': None}
+            )
+            closed = (
+                min(abs(units), abs(pos['units']))
+                if pos['units'] * units < 0 else 0
+            )
+            pl = self._to_account_currency(
+                closed * (price - pos['price']) * np.sign(pos['units']),
+                currency=instrument.split('_')[1]
+            )
+            self.balance += pl
+            new_units = pos['units'] + units
+            if new_units == 0:
+                self.positions.pop(instrument, None)
+            else:
+                if pos['units'] * new_units <= 0:
+                    pos = {'units': 0, 'price': price, 'trade_id': None}
+                elif abs(new_units) > abs(pos['units']):
+                    pos['price'] = (
+                        pos['price'] * abs(pos['units'])
+                        + price * (abs(new_units) - abs(pos['units']))
+                    ) / abs(new_units)
+                pos['units'] = new_units
+                pos['trade_id'] = pos['trade_id'] or str(len(self.txns) + 1)
+                self.positions[instrument] = pos
+            fill = self._add_txn(
+                type='ORDER_FILL', orderID=order['id'], instrument=instrument,
+                units=str(units), price=str(price), pl=f'{pl:.4f}',
+                financing='0.0000', commission='0.0000',
+                accountBalance=f'{self.balance:.4f}', reason=reason
+            )
+        return order, fill
+
+    def close(self, instrument, long_units='ALL', short_units='ALL'):
+        pos = self.positions.get(instrument)
+        if not pos or not (
+                (pos['units'] > 0 and long_units != 'NONE')
+                or (pos['units'] < 0 and short_units != 'NONE')):
+            return None
+        else:
+            return self.fill(
+                instrument=instrument, units=-pos['units'],
+                reason='MARKET_ORDER_POSITION_CLOSEOUT'
+            )
+
+    def unrealized_pl(self):
+        return sum([
+            self._to_account_currency(
+                (
+                    (p['bid'] if d['units'] > 0 else p['ask']) - d['price']
+                ) * d['units'],
+                currency=i.split('_')[1]
+            ) for i, d, p in [
+                (i, d, self.market.price(instrument=i))
+                for i, d in self.positions.items()
+            ]
+        ])
+
+    def margin_used(self):
+        return sum([
+            self._to_account_currency(
+                abs(d['units']) * d['price'] * self.margin_rate,
+                currency=i.split('_')[1]
+            ) for i, d in self.positions.items()
+        ])
+
+    def account_dict(self):
+        nav = self.balance + self.unrealized_pl()
+        margin_used = self.margin_used()
+        return {
+            'id': self.account_id, 'currency': self.currency,
+            'balance': f'{self.balance:.4f}', 'NAV': f'{nav:.4f}',
+            'unrealizedPL': f'{nav - self.balance:.4f}',
+            'marginRate': str(self.margin_rate),
+            'marginUsed': f'{margin_used:.4f}',
+            'marginAvailable': f'{max(nav - margin_used, 0):.4f}',
+            'openPositionCount': len(self.positions),
+            'lastTransactionID': self.last_txn_id(),
+            'positions': [
+                {
+                    'instrument': i,
+                    **{
+                        s: {
+                            'units': str(d['units'] if m * d['units'] > 0
+                                         else 0),
+                            **(
+                                {
+                                    'averagePrice': str(d['price']),
+                                    'tradeIDs': [d['trade_id']]
+                                } if m * d['units'] > 0 else dict()
+                            )
+                        } for s, m in [('long', 1), ('short', -1)]
+                    }
+                } for i, d in self.positions.items()
+            ]
+        }
+
+
+class FakeV20Backend(object):
+    def __init__(self, account, instruments=None):
+        self.__logger = logging.getLogger(__name__)
+        self.account = account
+        self.market = account.market
+        self.instruments = (instruments or self.market.instruments)
+        a = r'/v3/accounts/(?P<account_id>[^/]+)'
+        self.__routes = [
+            ('GET', re.compile(r'/v3/accounts$'), self._accounts),
+            ('GET', re.compile(a + r'$'), self._account),
+            ('GET', re.compile(a + r'/summary$'), self._account),
+            ('GET', re.compile(a + r'/instruments$'), self._instruments),
+            ('GET', re.compile(a + r'/transactions$'), self._txn_pages),
+            (
+                'GET', re.compile(a + r'/transactions/sinceid$'),
+                self._txns_since
+            ),
+            ('GET', re.compile(a + r'/pricing$'), self._pricing),
+            ('GET', re.compile(a + r'/pricing/stream$'), self._stream),
+            (
+                'GET',
+                re.compile(r'/v3/instruments/(?P<instrument>[^/]+)/candles$'),
+                self._candles
+            ),
+            ('POST', re.compile(a + r'/orders$'), self._create_order),
+            (
+                'PUT',
+                re.compile(a + r'/positions/(?P<instrument>[^/]+)/close$'),
+                self._close_position
+            )
+        ]
+
+    def handle(self, method, path, params=None, body=None):
+        for m, pattern, func in self.__routes:
+            match = pattern.match(path)
+            if m == method and match:
+                kwargs = match.groupdict()
+                if kwargs.get('account_id') not in {
+                        None, self.account.account_id}:
+                    return 404, self._error('Account does not exist')
+                else:
+                    return func(
+                        params=(params or dict()), body=(body or dict()),
+                        **{
+                            k: v for k, v in kwargs.items()
+                            if k != 'account_id'
+                        }
+                    )
+        return 404, self._error(f'No route:\t{method} {path}')
+
+    def wrap_api(self, api):
+        def _request(req):
+            status, data = self.handle(
+                method=req.method, path=req.path, params=dict(req.params),
+                body=(json.loads(req.body) if req.body else dict())
+            )
+            res = Response(
+                req, req.method, req.path, status, HTTPStatus(status).phrase,
+                {'content-type': 'application/json'}
+            )
+            res.set_raw_body(json.dumps(data))
+            return res
+
+        api.request = _request
+        return api
+
+    @staticmethod
+    def _error(message):
+        return {'errorMessage': message}
+
+    def _accounts(self, params, body):
+        return 200, {
+            'accounts': [{'id': self.account.account_id, 'tags': list()}]
+        }
+
+    def _account(self, params, body):
+        return 200, {
+            'account': self.account.account_dict(),
+            'lastTransactionID': self.account.last_txn_id()
+        }
+
+    def _instruments(self, params, body):
+        return 200, {
+            'instruments': [
+                self._instrument_dict(instrument=i) for i in self.instruments
+            ],
+            'lastTransactionID': self.account.last_txn_id()
+        }
+
+    def _instrument_dict(self, instrument):
+        p = self.market.price(instrument=instrument)
+        precision = display_precision(price=p['ask'])
+        tick = 10 ** -precision
+        return {
+            'name': instrument, 'type': 'CURRENCY',
+            'displayName': instrument.replace('_', '/'),
+            'pipLocation': -(precision - 1), 'displayPrecision': precision,
+            'tradeUnitsPrecision': 0, 'minimumTradeSize': '1',
+            'maximumTrailingStopDistance': f'{tick * 100000:.{precision}f}',
+            'minimumTrailingStopDistance': f'{tick * 50:.{precision}f}',
+            'maximumPositionSize': '0', 'maximumOrderUnits': '100000000',
+            'marginRate': str(self.account.margin_rate)
+        }
+
+    def _txn_pages(self, params, body):
+        last_id = self.account.last_txn_id()
+        return 200, {
+            'from': format_time(self.market.now()),
+            'to': format_time(self.market.now()), 'pageSize': 100,
+            'count': int(last_id), 'pages': list(),
+            'lastTransactionID': last_id
+        }
+
+    def _txns_since(self, params, body):
+        since = int(params.get('id', 0))
+        return 200, {
+            'transactions': self.account.txns[since:],
+            'lastTransactionID': self.account.last_txn_id()
+        }
+
+    def _price_dict(self, instrument):
+        p = self.market.price(instrument=instrument)
+        return {
+            'type': 'PRICE', 'instrument': instrument,
+            'time': format_time(p['time']), 'tradeable': True,
+            'status': 'tradeable',
+            'bids': [{'price': str(p['bid']), 'liquidity': 10000000}],
+            'asks': [{'price': str(p['ask']), 'liquidity': 10000000}],
+            'closeoutBid': str(p['bid']), 'closeoutAsk': str(p['ask'])
+        }
+
+    def _pricing(self, params, body):
+        return 200, {
+            'prices': [
+                self._price_dict(instrument=i)
+                for i in params.get('instruments', '').split(',') if i
+            ],
+            'time': format_time(self.market.now())
+        }
+
+    def _stream(self, params, body, interval_sec=0.25, heartbeat_sec=5):
+        insts = [i for i in params.get('instruments', '').split(',') if i]
+
+        def _generate():
+            last_hb = time.time()
+            while True:
+                for i in insts:
+                    yield self._price_dict(instrument=i)
+                if time.time() - last_hb > heartbeat_sec:
+                    last_hb = time.time()
+                    yield {
+                        'type': 'HEARTBEAT',
+                        'time': format_time(self.market.now())
+                    }
+                time.sleep(interval_sec)
+
+        return 200, _generate()
+
+    def _candles(self, params, body, instrument):
+        granularity = params.get('granularity', 'S5')
+        df = self.market.candle_df(
+            instrument=instrument, granularity=granularity,
+            count=int(params.get('count', 500))
+        )
+        return 200, {
+            'instrument': instrument, 'granularity': granularity,
+            'candles': [
+                {
+                    'time': format_time(t), 'volume': int(v), 'complete': True,
+                    'bid': {k: str(b) for k in 'ohlc'},
+                    'ask': {k: str(a) for k in 'ohlc'}
+                } for t, b, a, v in zip(
+                    df.index, df['bid'], df['ask'], df['volume']
+                )
+            ]
+        }
+
+    def _create_order(self, params, body):
+        o = body.get('order', dict())
+        order, fill = self.account.fill(
+            instrument=o['instrument'], units=int(float(o['units']))
+        )
+        return 201, {
+            'orderCreateTransaction': order, 'orderFillTransaction': fill,
+            'relatedTransactionIDs': [order['id'], fill['id']],
+            'lastTransactionID': self.account.last_txn_id()
+        }
+
+    def _close_position(self, params, body, instrument):
+        txns = self.account.close(
+            instrument=instrument,
+            long_units=body.get('longUnits', 'ALL'),
+            short_units=body.get('shortUnits', 'ALL')
+        )
+        if not txns:
+            return 400, self._error('The Position requested does not exist')
+        else:
+            side = (
+                'long' if float(txns[1]['units']) < 0 else 'short'
+            )
+            return 200, {
+                f'{side}OrderCreateTransaction': txns[0],
+                f'{side}OrderFillTransaction': txns[1],
+                'relatedTransactionIDs': [t['id'] for t in txns],
+                'lastTransactionID': self.account.last_txn_id()
+            }
+
+
+class FakeV20Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, backend, host='127.0.0.1', port=8080, latency_sec=0,
+                 rate_limit=None):
+        super().__init__((host, int(port)), _FakeV20RequestHandler)
+        self.backend = backend
+        self.latency_sec = float(latency_sec or 0)
+        self.__bucket = (
+            TokenBucket(rate=rate_limit) if rate_limit else None
+        )
+
+    def is_rate_limited(self):
+        return bool(self.__bucket and not self.__bucket.try_acquire())
+
+
+class _FakeV20RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def do_GET(self):  # noqa: N802
+        self._respond('GET')
+
+    def do_POST(self):  # noqa: N802
+        self._respond('POST')
+
+    def do_PUT(self):  # noqa: N802
+        self._respond('PUT')
+
+    def _respond(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        if self.server.latency_sec:
+            time.sleep(self.server.latency_sec)
+        if self.server.is_rate_limited():
+            status, data = 429, {'errorMessage': 'Rate limit exceeded'}
+        else:
+            status, data = self.server.backend.handle(
+                method=method, path=url.path,
+                params={k: v[-1] for k, v in parse_qs(url.query).items()},
+                body=(json.loads(raw_body) if raw_body else dict())
+            )
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if isinstance(data, dict):
+            payload = json.dumps(data).encode()
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for d in data:
+                    line = (json.dumps(d) + '\n').encode()
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
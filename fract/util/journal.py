@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+class TradeJournal(object):
+    def __init__(self, path, batch_size=1000, flush_sec=10):
+        self.__logger = logging.getLogger(__name__)
+        self.path = str(Path(path).resolve())
+        self.__batch_size = int(batch_size)
+        self.__flush_sec = float(flush_sec)
+        self.__con = sqlite3.connect(self.path, check_same_thread=False)
+        self.__lock = threading.RLock()
+        self.__con.execute('PRAGMA journal_mode=WAL;')
+        self.__con.execute('PRAGMA synchronous=NORMAL;')
+        schema_sql = Path(__file__).parent.parent.joinpath(
+            'static/create_journal_tables.sql'
+        )
+        with open(schema_sql, 'r') as f:
+            self.__con.executescript(f.read())
+        self.__insert_sqls = {
+            'rate': 'INSERT INTO rate VALUES (?, ?, ?, ?);',
+            'signal': 'INSERT INTO signal VALUES (?, ?, ?, ?, ?, ?, ?);',
+            'order_log': 'INSERT INTO order_log VALUES (?, ?, ?, ?, ?);',
+            'txn': 'INSERT OR IGNORE INTO txn VALUES (?, ?, ?, ?, ?, ?, ?);'
+        }
+        self.__buffers = {k: list() for k in self.__insert_sqls.keys()}
+        self.__last_flush = time.monotonic()
+        self.__logger.info(f'Trade journal:\t{self.path}')
+
+    def write_rates(self, instrument, df_rate):
+        self._append(
+            'rate', [
+                (instrument, t.isoformat(), float(b), float(a)) for t, b, a
+                in zip(df_rate.index, df_rate['bid'], df_rate['ask'])
+            ]
+        )
+
+    def write_signal(self, instrument, timestamp, act=None, state=None,
+                     sig_act=None, granularity=None, **kwargs):
+        self._append(
+            'signal', [(
+                instrument, timestamp.isoformat(), act, state, sig_act,
+                granularity, json.dumps(kwargs, default=float)
+            )]
+        )
+
+    def write_order(self, instrument, timestamp, func, status=None,
+                    body=None):
+        self._append(
+            'order_log', [(
+                instrument, timestamp.isoformat(), func, status,
+                (body if isinstance(body, str) else json.dumps(body))
+            )]
+        )
+
+    def write_transactions(self, txns):
+        self._append(
+            'txn', [
+                (
+                    int(t['id']), t.get('instrument'), t['time'],
+                    t.get('type'),
+                    (float(t['units']) if t.get('units') else None),
+                    (float(t['pl']) if t.get('pl') else None),
+                    json.dumps(t)
+                ) for t in txns
+            ]
+        )
+
+    def _append(self, table, rows):
+        with self.__lock:
+            self.__buffers[table].extend(rows)
+            if (sum([len(v) for v in self.__buffers.values()])
+                    >= self.__batch_size
+                    or (time.monotonic() - self.__last_flush
+                        > self.__flush_sec)):
+                self.flush()
+
+    def flush(self):
+        with self.__lock, self.__con:
+            for k, v in self.__buffers.items():
+                if v:
+                    self.__con.executemany(self.__insert_sqls[k], v)
+                    self.__logger.debug(f'{k} rows inserted:\t{len(v)}')
+                    self.__buffers[k] = list()
+            self.__last_flush = time.monotonic()
+
+    def close(self):
+        with self.__lock:
+            self.flush()
+            self.__con.close()
+
+    def _read_sql_query(self, sql, params=None):
+        with self.__lock:
+            self.flush()
+            return pd.read_sql_query(sql, self.__con, params=params)
+
+    def fetch_pl(self, instrument=None):
+        return self._read_sql_query(
+            'SELECT instrument, COUNT(pl) AS n_pl, SUM(pl) AS pl,'
+            ' SUM(CASE WHEN pl > 0 THEN 1 ELSE 0 END) AS n_win,'
+            ' MIN(time) AS first_time, MAX(time) AS last_time'
+            ' FROM txn WHERE pl IS NOT NULL AND pl != 0'
+            + (' AND instrument = ?' if instrument else '')
+            + ' GROUP BY instrument ORDER BY instrument;',
+            params=([instrument] if instrument else None)
+        ).set_index('instrument')
+
+    def fetch_pl_history(self, instrument):
+        return self._read_sql_query(
+            'SELECT time, id, type, units, pl FROM txn'
+            ' WHERE instrument = ? AND pl IS NOT NULL AND pl != 0'
+            ' ORDER BY time;',
+            params=[instrument]
+        ).assign(
+            time=lambda d: pd.to_datetime(d['time']),
+            cum_pl=lambda d: d['pl'].cumsum()
+        ).set_index('time')
+
+    def fetch_signal_history(self, instrument, since=None, until=None):
+        conditions = ['instrument = ?'] + [
+            f'time {o} ?' for o, t in [('>=', since), ('<=', until)] if t
+        ]
+        return self._read_sql_query(
+            'SELECT time, act, state, sig_act, granularity, detail'
+            ' FROM signal WHERE {} ORDER BY time;'.format(
+                ' AND '.join(conditions)
+            ),
+            params=[
+                instrument,
+                *[pd.Timestamp(t).isoformat() for t in [since, until] if t]
+            ]
+        ).assign(
+            time=lambda d: pd.to_datetime(d['time'])
+        ).set_index('time')
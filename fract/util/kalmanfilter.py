@@ -6,31 +6,34 @@ import os
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize_scalar
+from scipy.signal import lfilter
 
 
 class KalmanFilter(object):
-    def __init__(self, x0=0, v0=1e-8, q=1e-8, r=1e-8, keep_history=False):
+    """Local level Kalman filter.
+
+    With steady_state=True, the filter switches to the fixed steady-state
+    gain once the error variance is within tol (relative) of its limit.
+    With the default tol=1e-9, the loss of KalmanFilterOptimizer stays
+    within a relative error of 1e-8 of the exact recursion, and so do the
+    filtered states relative to their largest magnitude
+    (tests/test_kalmanfilter.py).
+    """
+
+    def __init__(self, x0=0, v0=1e-8, q=1e-8, r=1e-8, keep_history=False,
+                 steady_state=False, tol=1e-9):
         self.x = np.array([x0])                 # estimate of x
         self.v = np.array([v0])                 # error estimate
         self.q = q                              # process variance
         self.r = r                              # measurement variance
         self.y = np.array([np.nan])
         self.__keep_history = keep_history
+        self.__steady_state = steady_state
+        self.__tol = tol                        # relative v error to switch
 
     def fit(self, y, x0=None, v0=None, q=None, r=None):
-        x0_ = x0 or self.x[-1]
-        v0_ = v0 or self.v[-1]
-        q_ = q or self.q
-        r_ = r or self.r
+        new_x, new_v = self.filter(y=y, x0=x0, v0=v0, q=q, r=r)
         len_y = len(y)
-        new_x = np.empty(len_y)
-        new_v = np.empty(len_y)
-        for i, y_n in enumerate(y):
-            x_n_1 = (new_x[i - 1] if i else x0_)
-            v_n_1 = (new_v[i - 1] if i else v0_) + q_
-            k = v_n_1 / (v_n_1 + r_)
-            new_x[i] = x_n_1 + k * (y_n - x_n_1)
-            new_v[i] = (1 - k) * v_n_1
         if self.__keep_history:
             self.x = np.append(self.x, new_x)
             self.v = np.append(self.v, new_v)
@@ -43,35 +46,76 @@ class KalmanFilter(object):
             index=(y.index if hasattr(y, 'index') else range(len_y))
         )
 
+    def filter(self, y, x0=None, v0=None, q=None, r=None):
+        x0_ = x0 or self.x[-1]
+        v0_ = v0 or self.v[-1]
+        q_ = q or self.q
+        r_ = r or self.r
+        y_ = np.asarray(y, dtype=float)
+        len_y = len(y_)
+        new_x = np.empty(len_y)
+        new_v = np.empty(len_y)
+        if self.__steady_state:
+            # fixed point of the Riccati recursion v = (v + q) r / (v + q + r)
+            p = (q_ + np.sqrt(np.square(q_) + 4 * q_ * r_)) / 2
+            k_ss = p / (p + r_)
+            v_ss = p - q_
+            v_tol = self.__tol * v_ss
+        else:
+            v_tol = None
+        x_n, v_n, n = x0_, v0_, 0
+        while n < len_y and (v_tol is None or abs(v_n - v_ss) > v_tol):
+            p_n = v_n + q_
+            k = p_n / (p_n + r_)
+            x_n = x_n + k * (y_[n] - x_n)
+            v_n = (1 - k) * p_n
+            new_x[n] = x_n
+            new_v[n] = v_n
+            n += 1
+        if n < len_y:
+            # after the transient |v - v_ss| <= tol * v_ss keeps shrinking by
+            # (1 - k_ss)^2 per step, so the gain error is below tol * k_ss;
+            # with tol=1e-9 the relative error of the loss stays below 1e-8
+            new_x[n:] = lfilter(
+                [k_ss], [1, k_ss - 1], y_[n:], zi=[(1 - k_ss) * x_n]
+            )[0]
+            new_v[n:] = v_ss
+        return new_x, new_v
+
 
 class KalmanFilterOptimizer(object):
-    def __init__(self, y, x0=0, v0=1e-8, pmv_ratio=1, method='Golden'):
+    def __init__(self, y, x0=0, v0=1e-8, pmv_ratio=1, method='Golden',
+                 steady_state=False):
         self.__logger = logging.getLogger(__name__)
         self.y = y
         self.x0 = x0
         self.v0 = v0
         self.__pmv_ratio = pmv_ratio    # process / measurement variance ratio
         self.__method = method          # Brent | Bounded | Golden
+        self.__steady_state = steady_state
 
     def optimize(self):
         res = minimize_scalar(
-            fun=self._loss, args=(self.y, self.x0, self.v0, self.__pmv_ratio),
+            fun=self._loss,
+            args=(
+                self.y, self.x0, self.v0, self.__pmv_ratio,
+                self.__steady_state
+            ),
             method=self.__method
         )
-        self.__logger.debug(f'{os.linesep}{res}')
+        self.__logger.debug('%s%s', os.linesep, res)
         r = np.exp(res.x)
-        self.__logger.debug(f'measurement variance:\t{r}')
+        self.__logger.debug('measurement variance:\t%s', r)
         q = r * self.__pmv_ratio
-        self.__logger.debug(f'process variance:\t{q}')
+        self.__logger.debug('process variance:\t%s', q)
         return q, r
 
     @staticmethod
-    def _loss(a, y, x0, v0, pmv_ratio=1):
+    def _loss(a, y, x0, v0, pmv_ratio=1, steady_state=False):
         r = np.exp(a)
-        return KalmanFilter(
-            x0=x0, v0=v0, q=(r * pmv_ratio), r=r
-        ).fit(y=y).pipe(
-            lambda d: np.sum(
-                np.log(d['v'] + r) + np.square(d['y'] - d['x']) / (d['v'] + r)
-            )
+        x, v = KalmanFilter(
+            x0=x0, v0=v0, q=(r * pmv_ratio), r=r, steady_state=steady_state
+        ).filter(y=y)
+        return np.sum(
+            np.log(v + r) + np.square(np.asarray(y, dtype=float) - x) / (v + r)
         )
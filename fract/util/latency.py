@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_null_span = nullcontext()
+
+
+class LatencyHistogram(object):
+    # log-scale buckets from 1 us to ~1000 s with a 5% relative resolution
+    min_sec = 1e-6
+    growth = 1.05
+    n_bucket = int(np.ceil(np.log(1e9) / np.log(1.05))) + 2
+
+    def __init__(self):
+        self.counts = np.zeros(self.n_bucket, dtype=np.int64)
+        self.count = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+
+    def add(self, sec):
+        self.counts[
+            min(
+                max(int(np.log(sec / self.min_sec) / np.log(self.growth)), -1)
+                + 1,
+                self.n_bucket - 1
+            ) if sec > 0 else 0
+        ] += 1
+        self.count += 1
+        self.total_sec += sec
+        self.max_sec = max(self.max_sec, sec)
+
+    def percentile(self, q):
+        if not self.count:
+            return np.nan
+        else:
+            b = int(
+                np.searchsorted(
+                    np.cumsum(self.counts), np.ceil(self.count * q / 100)
+                )
+            )
+            return min(
+                self.min_sec * self.growth ** b if b else self.min_sec,
+                self.max_sec
+            )
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': (
+                self.total_sec / self.count * 1e3 if self.count else np.nan
+            ),
+            **{
+                f'p{q}_ms': self.percentile(q=q) * 1e3 for q in [50, 95, 99]
+            },
+            'max_ms': self.max_sec * 1e3
+        }
+
+
+class LatencyRecorder(object):
+    def __init__(self, enabled=False, log_dir_path=None, dump_sec=60,
+                 metrics=None):
+        self.__logger = logging.getLogger(__name__)
+        self.enabled = enabled
+        self.__metrics = (metrics if metrics and metrics.enabled else None)
+        self.__active = bool(enabled or self.__metrics)
+        self.__tsv_path = (
+            str(Path(log_dir_path).joinpath('latency.tsv'))
+            if log_dir_path else None
+        )
+        self.__dump_sec = float(dump_sec)
+        self.__last_dump = time.monotonic()
+        self.__hists = dict()
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def span(self, stage, instrument=None):
+        if not self.__active:
+            return _null_span
+        else:
+            return _Span(
+                recorder=self, stage=stage,
+                instrument=(
+                    instrument or getattr(self.__local, 'instrument', None)
+                    or '*'
+                )
+            )
+
+    def _enter(self, instrument):
+        prev = getattr(self.__local, 'instrument', None)
+        self.__local.instrument = instrument
+        return prev
+
+    def _exit(self, stage, instrument, sec, prev):
+        self.__local.instrument = prev
+        self.observe(stage=stage, sec=sec, instrument=instrument)
+
+    def observe(self, stage, sec, instrument=None):
+        i = instrument or getattr(self.__local, 'instrument', None) or '*'
+        if self.enabled:
+            with self.__lock:
+                self.__hists.setdefault(
+                    (i, stage), LatencyHistogram()
+                ).add(sec)
+        if self.__metrics:
+            self.__metrics.observe(
+                'stage_seconds', sec=sec, instrument=i, stage=stage
+            )
+
+    def summary_df(self):
+        with self.__lock:
+            rows = [
+                {'instrument': i, 'stage': s, **h.summary()}
+                for (i, s), h in self.__hists.items()
+            ]
+        return (
+            pd.DataFrame(rows).set_index(['instrument', 'stage']).sort_index()
+            if rows else pd.DataFrame()
+        )
+
+    def dump(self):
+        self.__last_dump = time.monotonic()
+        df = self.summary_df()
+        if self.__tsv_path and df.size:
+            self.__logger.info(f'Write latency histograms:\t{self.__tsv_path}')
+            df.to_csv(self.__tsv_path, sep='\t', float_format='%.3f')
+        return df
+
+    def dump_periodically(self):
+        if (self.enabled and self.__tsv_path
+                and time.monotonic() - self.__last_dump > self.__dump_sec):
+            self.dump()
+
+    def print_summary(self):
+        if self.enabled:
+            df = self.dump()
+            if df.size:
+                with pd.option_context(
+                        'display.max_rows', None, 'display.max_columns', None,
+                        'display.width', None, 'display.precision', 3
+                ):
+                    print(f'Latency (ms):{os.linesep}{df}', flush=True)
+
+
+class _Span(object):
+    __slots__ = ('recorder', 'stage', 'instrument', 't0', 'prev')
+
+    def __init__(self, recorder, stage, instrument):
+        self.recorder = recorder
+        self.stage = stage
+        self.instrument = instrument
+
+    def __enter__(self):
+        self.prev = self.recorder._enter(instrument=self.instrument)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.recorder._exit(
+            stage=self.stage, instrument=self.instrument,
+            sec=(time.perf_counter() - self.t0), prev=self.prev
+        )
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        d = {
+            'time': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname, 'logger': record.name,
+            'message': record.getMessage()
+        }
+        exc_text = record.exc_text or (
+            self.formatException(record.exc_info) if record.exc_info else None
+        )
+        if exc_text:
+            d['exc_info'] = exc_text
+        return json.dumps(d, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # messages are merged in the listener thread, so arguments passed to a
+    # logger must not be mutated after the call
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+def set_log_config(debug=None, info=None, json_lines=False):
+    if debug:
+        lv = logging.DEBUG
+    elif info:
+        lv = logging.INFO
+    else:
+        lv = logging.WARNING
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        JsonLinesFormatter() if json_lines else logging.Formatter(
+            fmt='%(asctime)s %(levelname)-8s %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    )
+    listener = QueueListener(queue.SimpleQueue(), handler)
+    root = logging.getLogger()
+    root.setLevel(lv)
+    root.addHandler(_DeferredQueueHandler(listener.queue))
+    listener.start()
+    atexit.register(listener.stop)
+
+    def _log_synchronously():
+        for h in root.handlers[:]:
+            if isinstance(h, _DeferredQueueHandler):
+                root.removeHandler(h)
+                root.addHandler(handler)
+
+    os.register_at_fork(after_in_child=_log_synchronously)
+    return listener
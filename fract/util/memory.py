@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import gc
+import logging
+import os
+import resource
+import tracemalloc
+
+import pandas as pd
+
+
+def read_rss_mb():
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return rss / 2**20
+
+
+class MemoryMonitor(object):
+    def __init__(self, n_frame=1):
+        self.__logger = logging.getLogger(__name__)
+        self.__n_frame = int(n_frame)
+        self.rows = list()
+        self.__base = None
+        self.__latest = None
+
+    def start(self):
+        tracemalloc.start(self.__n_frame)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def snapshot(self, baseline=False, **kwargs):
+        self.__latest = None
+        gc.collect()
+        row = {
+            **kwargs, 'rss_mb': read_rss_mb(),
+            'traced_mb': tracemalloc.get_traced_memory()[0] / 2**20
+        }
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ])
+        self.__logger.info(f'Memory:\t{row}')
+        self.rows.append(row)
+        if baseline or self.__base is None:
+            self.__base = (snap, row)
+        self.__latest = snap
+        return row
+
+    def summary_df(self):
+        return pd.DataFrame(self.rows)
+
+    def growth(self):
+        if self.__base is None:
+            return {'rss_mb': 0.0, 'traced_mb': 0.0}
+        else:
+            return {
+                k: self.rows[-1][k] - self.__base[1][k]
+                for k in ['rss_mb', 'traced_mb']
+            }
+
+    def top_sites(self, n=10):
+        if self.__base is None:
+            return pd.DataFrame()
+        else:
+            return pd.DataFrame([
+                {
+                    'site': str(s.traceback),
+                    'size_diff_kb': s.size_diff / 2**10,
+                    'count_diff': s.count_diff, 'size_kb': s.size / 2**10
+                } for s in self.__latest.compare_to(
+                    self.__base[0], 'lineno'
+                )[:int(n)]
+            ])
+
+
+class MemoryGrowthError(RuntimeError):
+    pass
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .latency import LatencyHistogram
+
+METRIC_HELP = {
+    'api_requests_total': 'V20 REST requests by endpoint and status',
+    'api_request_seconds': 'V20 REST request latency by endpoint',
+    'stage_seconds': 'Trading loop stage latency by instrument',
+    'ticks_total': 'Ticks ingested from the stream',
+    'redis_backlog': 'Ticks queued in Redis at the latest fetch',
+    'cache_length': 'Rows in the tick cache',
+    'cache_requests_total': 'Cache lookups by result',
+    'state': 'Current trading state by instrument',
+    'orders_total': 'Queued orders by result',
+    'order_queue_length': 'Orders waiting in the execution queue'
+}
+
+
+class MetricsRegistry(object):
+    def __init__(self, enabled=True, prefix='fract'):
+        self.__logger = logging.getLogger(__name__)
+        self.enabled = enabled
+        self.__prefix = prefix
+        self.__counters = dict()
+        self.__gauges = dict()
+        self.__states = dict()
+        self.__hists = dict()
+        self.__help = METRIC_HELP.copy()
+        self.__lock = threading.Lock()
+        self.__server = None
+
+    def describe(self, name, text):
+        self.__help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        if self.enabled:
+            k = (name, self._labels(labels))
+            with self.__lock:
+                self.__counters[k] = self.__counters.get(k, 0) + value
+
+    def set(self, name, value, **labels):
+        if self.enabled:
+            with self.__lock:
+                self.__gauges[(name, self._labels(labels))] = value
+
+    def set_state(self, name, state, **labels):
+        if self.enabled:
+            with self.__lock:
+                self.__states[(name, self._labels(labels))] = state
+
+    def observe(self, name, sec, **labels):
+        if self.enabled:
+            k = (name, self._labels(labels))
+            with self.__lock:
+                self.__hists.setdefault(k, LatencyHistogram()).add(sec)
+
+    @staticmethod
+    def _labels(labels):
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def instrument_api(self, api):
+        if self.enabled:
+            request = api.request
+
+            def _request(req):
+                t0 = time.perf_counter()
+                status = 'error'
+                try:
+                    res = request(req)
+                    status = res.status
+                    return res
+                finally:
+                    labels = {'method': req.method, 'endpoint': req.base_path}
+                    self.inc('api_requests_total', status=status, **labels)
+                    self.observe(
+                        'api_request_seconds',
+                        sec=(time.perf_counter() - t0), **labels
+                    )
+
+            api.request = _request
+        return api
+
+    def render(self):
+        p = self.__prefix
+        lines = list()
+        with self.__lock:
+            for kind, items in [
+                    ('counter', self.__counters), ('gauge', self.__gauges),
+                    (
+                        'gauge', {
+                            (n, labels + (('state', v),)): 1
+                            for (n, labels), v in self.__states.items()
+                        }
+                    )
+            ]:
+                for name in sorted({n for n, _ in items}):
+                    lines.extend(self._header(f'{p}_{name}', name, kind))
+                    for (n, labels), v in sorted(items.items()):
+                        if n == name:
+                            lines.append(
+                                f'{p}_{n}{self._format_labels(labels)} {v}'
+                            )
+            for name in sorted({n for n, _ in self.__hists}):
+                lines.extend(self._header(f'{p}_{name}', name, 'summary'))
+                for (n, labels), h in sorted(self.__hists.items()):
+                    if n == name:
+                        for q in [0.5, 0.95, 0.99]:
+                            lines.append(
+                                '{0}_{1}{2} {3}'.format(
+                                    p, n,
+                                    self._format_labels(
+                                        labels + (('quantile', str(q)),)
+                                    ),
+                                    h.percentile(q=(q * 100))
+                                )
+                            )
+                        lines.append(
+                            f'{p}_{n}_sum{self._format_labels(labels)}'
+                            + f' {h.total_sec}'
+                        )
+                        lines.append(
+                            f'{p}_{n}_count{self._format_labels(labels)}'
+                            + f' {h.count}'
+                        )
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, full_name, name, kind):
+        return (
+            [f'# HELP {full_name} {self.__help[name]}']
+            if name in self.__help else list()
+        ) + [f'# TYPE {full_name} {kind}']
+
+    @staticmethod
+    def _format_labels(labels):
+        return (
+            '{' + ','.join(
+                '{0}="{1}"'.format(
+                    k,
+                    v.replace('\\', '\\\\').replace('"', '\\"').replace(
+                        '\n', '\\n'
+                    )
+                ) for k, v in labels
+            ) + '}'
+        ) if labels else ''
+
+    def serve(self, host='127.0.0.1', port=9090):
+        self.__server = ThreadingHTTPServer(
+            (host, int(port)), _MetricsRequestHandler
+        )
+        self.__server.daemon_threads = True
+        self.__server.registry = self
+        threading.Thread(
+            target=self.__server.serve_forever, name='metrics', daemon=True
+        ).start()
+        self.__logger.info(f'Serve metrics:\thttp://{host}:{port}/metrics')
+
+    def shutdown(self):
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def do_GET(self):  # noqa: N802
+        if self.path.split('?')[0] in {'/', '/metrics'}:
+            payload = self.server.registry.render().encode()
+            self.send_response(200)
+            self.send_header(
+                'Content-Type', 'text/plain; version=0.0.4; charset=utf-8'
+            )
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self.send_error(404)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+from math import ceil
+
+_sides = {'long': 1, 'short': -1}
+
+
+class OrderSpec(object):
+    __slots__ = (
+        'instrument', 'precision', 'ts_min', 'ts_max', 'max_units',
+        'margin_rate', 'tp_ratio', 'sl_ratio', 'ts_ratio', 'unit_ratio',
+        'init_ratio', 'preserve_ratio', 'price_format'
+    )
+
+    def __init__(self, instrument, inst_entry, position_config):
+        self.instrument = instrument
+        self.precision = int(inst_entry['displayPrecision'])
+        self.ts_min = float(inst_entry['minimumTrailingStopDistance'])
+        self.ts_max = float(inst_entry['maximumTrailingStopDistance'])
+        self.max_units = int(float(inst_entry['maximumOrderUnits']))
+        self.margin_rate = float(inst_entry['marginRate'])
+        lpr = position_config['limit_price_ratio']
+        self.tp_ratio = float(lpr['take_profit'])
+        self.sl_ratio = float(lpr['stop_loss'])
+        self.ts_ratio = float(lpr['trailing_stop'])
+        mnr = position_config['margin_nav_ratio']
+        self.unit_ratio = float(mnr['unit'])
+        self.init_ratio = float(mnr['init'])
+        self.preserve_ratio = float(mnr['preserve'])
+        self.price_format = f'{{:.{self.precision}f}}'.format
+
+    def limits(self, price, side):
+        sign = _sides[side]
+        ts_dist = min(
+            self.ts_min * max(int(price * self.ts_ratio / self.ts_min), 1),
+            self.ts_max
+        )
+        return {
+            'takeProfitOnFill': {
+                'price': self.price_format(price * (1 + sign * self.tp_ratio)),
+                'timeInForce': 'GTC'
+            },
+            'stopLossOnFill': {
+                'price': self.price_format(price * (1 - sign * self.sl_ratio)),
+                'timeInForce': 'GTC'
+            },
+            'trailingStopLossOnFill': {
+                'distance': self.price_format(ts_dist), 'timeInForce': 'GTC'
+            }
+        }
+
+    def sizes(self, balance, margin_avail, unit_cost):
+        return {
+            'unit': ceil(balance * self.unit_ratio / unit_cost),
+            'init': ceil(balance * self.init_ratio / unit_cost),
+            'avail': max(
+                ceil(
+                    (margin_avail - balance * self.preserve_ratio) / unit_cost
+                ), 0
+            )
+        }
+
+    def units(self, size, side):
+        return str(int(min(size, self.max_units)) * _sides[side])
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+class PaperBroker(object):
+    def __init__(self):
+        self.__logger = logging.getLogger(__name__)
+        self.currency = None
+        self.balance = None
+        self.positions = dict()
+        self.txns = list()
+        self.__last_txn_id = 0
+        self.__prices = dict()
+        self.__bp_values = dict()
+        self.__margin_rates = dict()
+        self.__lock = threading.RLock()
+
+    @property
+    def is_open(self):
+        return self.balance is not None
+
+    def open_account(self, balance, currency, last_txn_id=None):
+        with self.__lock:
+            self.balance = float(balance)
+            self.currency = currency
+            self.__last_txn_id = int(last_txn_id or 0)
+        self.__logger.info(f'Paper account:\t{balance} {currency}')
+
+    def update(self, prices, bp_values, margin_rates):
+        with self.__lock:
+            self.__prices.update({
+                i: {'bid': float(d['bid']), 'ask': float(d['ask'])}
+                for i, d in prices.items()
+            })
+            self.__bp_values.update(bp_values)
+            self.__margin_rates.update(margin_rates)
+            for i in list(self.positions):
+                if i in prices:
+                    self._check_triggers(instrument=i)
+
+    def _check_triggers(self, instrument):
+        pos = self.positions[instrument]
+        sign = np.sign(pos['units'])
+        p = self.__prices[instrument]
+        price = (p['bid'] if sign > 0 else p['ask'])
+        if pos.get('ts_distance'):
+            pos['ts_price'] = (
+                max(pos.get('ts_price', price), price) if sign > 0
+                else min(pos.get('ts_price', price), price)
+            )
+        if pos.get('tp') and (price - pos['tp']) * sign >= 0:
+            reason = 'TAKE_PROFIT_ORDER'
+        elif pos.get('sl') and (price - pos['sl']) * sign <= 0:
+            reason = 'STOP_LOSS_ORDER'
+        elif pos.get('ts_distance') and (
+                (pos['ts_price'] - price) * sign >= pos['ts_distance']):
+            reason = 'TRAILING_STOP_LOSS_ORDER'
+        else:
+            reason = None
+        if reason:
+            self.__logger.info(f'Paper {reason}:\t{instrument}')
+            self._fill(
+                instrument=instrument, units=-pos['units'], reason=reason
+            )
+
+    def _add_txn(self, **kwargs):
+        self.__last_txn_id += 1
+        t = {
+            'id': str(self.__last_txn_id),
+            'time': datetime.now(timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%S.%f000Z'
+            ),
+            **kwargs
+        }
+        self.txns.append(t)
+        return t
+
+    def _account_values(self, instrument):
+        base, quote = instrument.split('_')
+        p = self.__prices[instrument]
+        mid = (p['bid'] + p['ask']) / 2
+        if quote == self.currency:
+            return mid, 1.0
+        elif base == self.currency:
+            return 1.0, 1 / mid
+        else:
+            # the conversion index gives a cross its base currency value
+            bpv = self.__bp_values[instrument]
+            return bpv, bpv / mid
+
+    def _fill(self, instrument, units, reason='MARKET_ORDER', limits=None):
+        p = self.__prices[instrument]
+        price = (p['ask'] if units > 0 else p['bid'])
+        pos = self.positions.get(instrument, {'units': 0, 'price': 0.0})
+        closed = (
+            min(abs(units), abs(pos['units']))
+            if pos['units'] * units < 0 else 0
+        )
+        pl = (
+            closed * (price - pos['price']) * np.sign(pos['units'])
+            * self._account_values(instrument=instrument)[1]
+        )
+        self.balance += pl
+        new_units = pos['units'] + units
+        if new_units == 0:
+            self.positions.pop(instrument, None)
+        else:
+            if pos['units'] * new_units <= 0:
+                pos = {'units': 0, 'price': price}
+            elif abs(new_units) > abs(pos['units']):
+                pos['price'] = (
+                    pos['price'] * abs(pos['units'])
+                    + price * (abs(new_units) - abs(pos['units']))
+                ) / abs(new_units)
+            pos['units'] = new_units
+            pos.update(limits or dict())
+            self.positions[instrument] = pos
+        return self._add_txn(
+            type='ORDER_FILL', instrument=instrument, units=str(units),
+            price=str(price), pl=f'{pl:.4f}', financing='0.0000',
+            commission='0.0000', accountBalance=f'{self.balance:.4f}',
+            reason=reason
+        )
+
+    def create_order(self, order):
+        with self.__lock:
+            i = order['instrument']
+            if i not in self.__prices or i not in self.__bp_values:
+                return 400, {'errorMessage': f'No price:\t{i}'}
+            units = int(float(order['units']))
+            create = self._add_txn(
+                type='MARKET_ORDER', instrument=i, units=str(units),
+                timeInForce=order.get('timeInForce', 'FOK'),
+                positionFill=order.get('positionFill', 'DEFAULT'),
+                reason='CLIENT_ORDER'
+            )
+            limits = {
+                k: float(order[f][v]) for k, f, v in [
+                    ('tp', 'takeProfitOnFill', 'price'),
+                    ('sl', 'stopLossOnFill', 'price'),
+                    ('ts_distance', 'trailingStopLossOnFill', 'distance')
+                ] if order.get(f)
+            }
+            fill = self._fill(
+                instrument=i, units=units, reason='MARKET_ORDER',
+                limits=limits
+            )
+            return 201, {
+                'orderCreateTransaction': create,
+                'orderFillTransaction': fill,
+                'relatedTransactionIDs': [create['id'], fill['id']],
+                'lastTransactionID': str(self.__last_txn_id)
+            }
+
+    def close_position(self, instrument, long_units='ALL', short_units='ALL'):
+        with self.__lock:
+            pos = self.positions.get(instrument)
+            if not pos or not (
+                    (pos['units'] > 0 and long_units != 'NONE')
+                    or (pos['units'] < 0 and short_units != 'NONE')):
+                return 400, {
+                    'errorMessage': 'The Position requested does not exist'
+                }
+            side = ('long' if pos['units'] > 0 else 'short')
+            create = self._add_txn(
+                type='MARKET_ORDER', instrument=instrument,
+                units=str(-pos['units']), timeInForce='FOK',
+                positionFill='REDUCE_ONLY', reason='POSITION_CLOSEOUT'
+            )
+            fill = self._fill(
+                instrument=instrument, units=-pos['units'],
+                reason='MARKET_ORDER_POSITION_CLOSEOUT'
+            )
+            return 200, {
+                f'{side}OrderCreateTransaction': create,
+                f'{side}OrderFillTransaction': fill,
+                'relatedTransactionIDs': [create['id'], fill['id']],
+                'lastTransactionID': str(self.__last_txn_id)
+            }
+
+    def account_dict(self):
+        with self.__lock:
+            upl = sum([
+                (
+                    (p['bid'] if d['units'] > 0 else p['ask']) - d['price']
+                ) * d['units'] * self._account_values(instrument=i)[1]
+                for i, d, p in [
+                    (i, d, self.__prices[i])
+                    for i, d in self.positions.items()
+                ]
+            ])
+            margin_used = sum([
+                abs(d['units']) * self._account_values(instrument=i)[0]
+                * self.__margin_rates.get(i, 0)
+                for i, d in self.positions.items()
+            ])
+            nav = self.balance + upl
+            return {
+                'currency': self.currency, 'balance': self.balance,
+                'NAV': nav, 'unrealizedPL': upl, 'marginUsed': margin_used,
+                'marginAvailable': max(nav - margin_used, 0),
+                'positions': {
+                    i: {
+                        'side': ('long' if d['units'] > 0 else 'short'),
+                        'units': d['units']
+                    } for i, d in self.positions.items()
+                }
+            }
+
+    def transactions_since(self, txn_id=None):
+        with self.__lock:
+            since = int(txn_id or 0)
+            return (
+                [t for t in self.txns if int(t['id']) > since],
+                str(self.__last_txn_id)
+            )
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+_timers = {
+    'cpu': (signal.ITIMER_PROF, signal.SIGPROF),
+    'wall': (signal.ITIMER_REAL, signal.SIGALRM)
+}
+
+
+class SamplingProfiler(object):
+    def __init__(self, log_dir_path=None, turns=100, interval_sec=0.005,
+                 clock='wall'):
+        self.__logger = logging.getLogger(__name__)
+        self.dir_path = Path(log_dir_path or '.').resolve()
+        self.turns = int(turns)
+        self.__interval_sec = float(interval_sec)
+        if clock not in _timers:
+            raise ValueError(f'invalid clock:\t{clock}')
+        self.__timer, self.__signum = _timers[clock]
+        self.__stacks = Counter()
+        self.__turns_left = 0
+        self.__started = None
+        self.__prev_handler = None
+
+    @property
+    def active(self):
+        return self.__started is not None
+
+    def install(self, signum=signal.SIGUSR1):
+        signal.signal(signum, lambda s, f: self.start())
+
+    def start(self, turns=None):
+        if self.active:
+            self.__logger.info('Profiling is already running')
+        else:
+            self.__turns_left = int(turns or self.turns)
+            self.__logger.warning(
+                f'Start profiling:\t{self.__turns_left} turns'
+            )
+            self.__stacks = Counter()
+            self.__started = time.monotonic()
+            self.__prev_handler = signal.signal(self.__signum, self._sample)
+            signal.setitimer(
+                self.__timer, self.__interval_sec, self.__interval_sec
+            )
+
+    def _sample(self, signum, frame):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, f in sys._current_frames().items():
+            stack = list()
+            while f is not None:
+                stack.append(
+                    '{0}:{1}'.format(
+                        os.path.basename(f.f_code.co_filename),
+                        f.f_code.co_name
+                    )
+                )
+                f = f.f_back
+            self.__stacks[
+                ';'.join([names.get(ident, str(ident)), *stack[::-1]])
+            ] += 1
+
+    def tick(self):
+        if self.active:
+            self.__turns_left -= 1
+            if self.__turns_left <= 0:
+                self.stop()
+
+    def stop(self):
+        if not self.active:
+            return None
+        signal.setitimer(self.__timer, 0)
+        signal.signal(self.__signum, self.__prev_handler or signal.SIG_DFL)
+        elapsed = time.monotonic() - self.__started
+        self.__started = None
+        os.makedirs(self.dir_path, exist_ok=True)
+        path = self.dir_path.joinpath(
+            'profile.{}.collapsed'.format(
+                datetime.now().strftime('%Y%m%dT%H%M%S')
+            )
+        )
+        with open(path, 'w') as f:
+            for s, n in sorted(self.__stacks.items()):
+                f.write(f'{s} {n}{os.linesep}')
+        self.__logger.warning(
+            'Write a profile:\t{0} ({1} samples in {2:.1f} sec)'.format(
+                path, sum(self.__stacks.values()), elapsed
+            )
+        )
+        return str(path)
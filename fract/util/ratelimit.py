@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import logging
+import threading
+import time
+
+from v20 import V20ConnectionError, V20Timeout
+
+
+class TokenBucket(object):
+    def __init__(self, rate=100, capacity=None, max_backoff_sec=32):
+        self.__logger = logging.getLogger(__name__)
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(self.rate, 1))
+        self.__max_backoff_sec = float(max_backoff_sec)
+        self.__tokens = self.capacity
+        self.__updated = time.monotonic()
+        self.__blocked_until = 0.0
+        self.__n_backoff = 0
+        self.__cond = threading.Condition()
+
+    def _refill(self, now):
+        self.__tokens = min(
+            self.capacity,
+            self.__tokens + (now - self.__updated) * self.rate
+        )
+        self.__updated = now
+
+    def try_acquire(self, n=1):
+        with self.__cond:
+            now = time.monotonic()
+            self._refill(now=now)
+            if now >= self.__blocked_until and self.__tokens >= n:
+                self.__tokens -= n
+                return True
+            else:
+                return False
+
+    def acquire(self, n=1):
+        with self.__cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now=now)
+                if now < self.__blocked_until:
+                    wait = self.__blocked_until - now
+                elif self.__tokens >= n:
+                    self.__tokens -= n
+                    return
+                else:
+                    wait = (n - self.__tokens) / self.rate
+                self.__cond.wait(timeout=wait)
+
+    def back_off(self, sec=None):
+        with self.__cond:
+            self.__n_backoff += 1
+            wait = min(
+                float(sec) if sec else 2 ** (self.__n_backoff - 1),
+                self.__max_backoff_sec
+            )
+            self.__logger.warning(f'Back off:\t{wait} sec')
+            self.__blocked_until = max(
+                self.__blocked_until, time.monotonic() + wait
+            )
+            self.__tokens = 0.0
+            self.__cond.notify_all()
+
+    def reset_backoff(self):
+        if self.__n_backoff:
+            with self.__cond:
+                self.__n_backoff = 0
+
+    def wrap_api(self, api, max_retries=5):
+        request = api.request
+
+        def _request(req):
+            for n in range(max_retries + 1):
+                self.acquire()
+                try:
+                    res = request(req)
+                except (V20ConnectionError, V20Timeout):
+                    self.back_off()
+                    raise
+                if res.status == 429 and n < max_retries:
+                    self.back_off(sec=_retry_after(res))
+                else:
+                    self.reset_backoff()
+                    return res
+
+        api.request = _request
+        return api
+
+
+def _retry_after(res):
+    try:
+        return float(
+            {k.lower(): v for k, v in res.headers.items()}.get('retry-after')
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from requests.structures import CaseInsensitiveDict
+from v20 import V20ConnectionError, V20Timeout
+from v20.response import Response
+
+_api_errors = {e.__name__: e for e in [V20ConnectionError, V20Timeout]}
+
+
+class RecordingExhausted(EOFError):
+    pass
+
+
+class ReplayMismatchError(RuntimeError):
+    pass
+
+
+class SessionRecorder(object):
+    def __init__(self, path):
+        self.__logger = logging.getLogger(__name__)
+        self.path = str(Path(path).resolve())
+        self.__file = gzip.open(self.path, 'wt')
+        self.__lock = threading.Lock()
+        self.__logger.info(f'Record a session:\t{self.path}')
+
+    def write(self, kind, **data):
+        line = json.dumps({'kind': kind, **data}, default=str)
+        with self.__lock:
+            self.__file.write(line + os.linesep)
+
+    def flush(self):
+        with self.__lock:
+            self.__file.flush()
+
+    def close(self):
+        with self.__lock:
+            self.__file.close()
+
+    def now(self):
+        t = datetime.now()
+        self.write('clock', t=t.isoformat())
+        return t
+
+    def wrap_api(self, api):
+        request = api.request
+
+        def _request(req):
+            try:
+                res = request(req)
+            except (V20ConnectionError, V20Timeout) as e:
+                self.write(
+                    'api', method=req.method, request_path=req.path,
+                    error=type(e).__name__, args=list(e.args)
+                )
+                raise
+            self.write(
+                'api', method=req.method, request_path=req.path,
+                path=res.path, status=res.status, reason=res.reason,
+                headers=dict(res.headers), raw_body=res.raw_body
+            )
+            return res
+
+        api.request = _request
+        return api
+
+
+class SessionPlayer(object):
+    def __init__(self, path):
+        self.__logger = logging.getLogger(__name__)
+        self.path = str(Path(path).resolve())
+        self.__file = gzip.open(self.path, 'rt')
+        self.__queues = dict()
+        self.checks = {'decision': 0, 'order': 0}
+        self.mismatches = {'decision': 0, 'order': 0}
+        self.meta = dict()
+        while True:
+            r = self._read()
+            if r and r['kind'] == 'meta':
+                self.meta.update({k: v for k, v in r.items() if k != 'kind'})
+            else:
+                if r:
+                    self._enqueue(record=r)
+                break
+        self.__logger.info(f'Replay a session:\t{self.path}')
+
+    def _read(self):
+        try:
+            line = self.__file.readline()
+            return (json.loads(line) if line else None)
+        except (EOFError, ValueError):
+            self.__logger.warning(f'Truncated recording:\t{self.path}')
+            return None
+
+    @staticmethod
+    def _key(record):
+        if record['kind'] == 'api':
+            return ('api', record['method'], record['request_path'])
+        elif record['kind'] == 'redis':
+            return ('redis', record['instrument'])
+        else:
+            return (record['kind'],)
+
+    def _enqueue(self, record):
+        self.__queues.setdefault(self._key(record), deque()).append(record)
+
+    def _next(self, key):
+        q = self.__queues.get(key)
+        while not q:
+            r = self._read()
+            if r is None:
+                raise RecordingExhausted(f'no more records:\t{key}')
+            self._enqueue(record=r)
+            q = self.__queues.get(key)
+        return q.popleft()
+
+    def now(self):
+        return datetime.fromisoformat(self._next(('clock',))['t'])
+
+    def redis_rates(self, instrument):
+        return self._next(('redis', instrument))['rates']
+
+    def check(self, kind, **data):
+        expected = {
+            k: v for k, v in self._next((kind,)).items() if k != 'kind'
+        }
+        actual = json.loads(json.dumps(data, default=str))
+        self.checks[kind] += 1
+        if actual != expected:
+            self.mismatches[kind] += 1
+            self.__logger.warning(
+                f'{kind} mismatch:\t{expected} (recorded) != {actual}'
+            )
+
+    def wrap_api(self, api):
+        def _request(req):
+            r = self._next(('api', req.method, req.path))
+            if r.get('error'):
+                raise _api_errors[r['error']](*r['args'])
+            res = Response(
+                req, r['method'], r['path'], r['status'], r['reason'],
+                CaseInsensitiveDict(r['headers'])
+            )
+            res.set_raw_body(r['raw_body'])
+            return res
+
+        api.request = _request
+        return api
+
+    def close(self):
+        self.__file.close()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import logging
+import math
+
+_band_keys = [('sig_ewmbbl', 'sig_ewmbbu'), ('sig_cil', 'sig_ciu')]
+
+
+def band_distance(sig):
+    ds = [
+        min(abs(sig[lo]), abs(sig[up])) / (sig[up] - sig[lo])
+        for lo, up in _band_keys
+        if sig.get(lo) is not None and sig.get(up) is not None
+        and sig[up] > sig[lo]
+    ]
+    return min(ds) if ds else None
+
+
+class ActivityScheduler(object):
+    def __init__(self, instruments, min_period_sec=0, max_period_sec=60,
+                 tick_rate=0.2, band_margin=0.5, halflife_sec=60):
+        self.__logger = logging.getLogger(__name__)
+        self.instruments = list(instruments)
+        self.min_period_sec = float(min_period_sec)
+        self.max_period_sec = float(max_period_sec)
+        if self.max_period_sec < self.min_period_sec:
+            raise ValueError(f'invalid max_period_sec:\t{max_period_sec}')
+        self.__tick_rate = float(tick_rate)
+        self.__band_margin = float(band_margin)
+        self.__halflife_sec = float(halflife_sec)
+        self.due_times = {i: 0.0 for i in self.instruments}
+        self.priorities = {i: 1.0 for i in self.instruments}
+        self.__rates = {i: 0.0 for i in self.instruments}
+        self.__last_times = {i: None for i in self.instruments}
+        self.__last_ticks = dict()
+
+    def due(self, now):
+        return sorted(
+            [i for i in self.instruments if self.due_times[i] <= now],
+            key=lambda i: -self.priorities[i]
+        )
+
+    def wait_sec(self, now):
+        return max(min(self.due_times.values()) - now, 0)
+
+    def observe(self, instrument, now, tick_times=None, sleeping=False,
+                position=False, sig=None):
+        last_tick = self.__last_ticks.get(instrument)
+        if tick_times is None or not len(tick_times):
+            n_tick = 0
+        else:
+            n_tick = (
+                len(tick_times) if last_tick is None
+                else int((tick_times > last_tick).sum())
+            )
+            self.__last_ticks[instrument] = max(tick_times)
+        last = self.__last_times[instrument]
+        if last is not None and now > last:
+            decay = 0.5 ** ((now - last) / self.__halflife_sec)
+            self.__rates[instrument] = (
+                self.__rates[instrument] * decay
+                + n_tick * (1 - decay) / (now - last)
+            )
+        self.__last_times[instrument] = now
+        activity = min(self.__rates[instrument] / self.__tick_rate, 1)
+        dist = (band_distance(sig) if sig else None)
+        nearness = (
+            0 if dist is None else math.exp(-dist / self.__band_margin)
+        )
+        priority = (
+            1.0 if position
+            else max(activity, nearness) * (0.25 if sleeping else 1)
+        )
+        period = self.min_period_sec + (
+            (self.max_period_sec - self.min_period_sec) * (1 - priority) ** 2
+        )
+        self.priorities[instrument] = priority
+        self.due_times[instrument] = now + period
+        self.__logger.debug(
+            'Schedule:\t%s (priority: %.3f, period: %.1f sec)',
+            instrument, priority, period
+        )
+        return period
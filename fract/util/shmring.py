@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+import logging
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('tradeable', '?')
+], align=True)
+_HEADER_SIZE = 64
+_record = struct.Struct('<qdd?7x')
+_seq = struct.Struct('<Q')
+_created = set()
+
+
+def _segment_name(name, instrument):
+    return f'{name}_{instrument}'
+
+
+def _open_segment(seg_name):
+    shm = shared_memory.SharedMemory(name=seg_name)
+    # the writer owns the segment, so a reader must not unlink it at exit
+    if seg_name not in _created:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _ring_views(buf):
+    # header: sequence, capacity, and a generation token of the writer
+    header = np.ndarray(shape=(3,), dtype='<u8', buffer=buf)
+    records = np.ndarray(
+        shape=(int(header[1]),), dtype=TICK_DTYPE, buffer=buf,
+        offset=_HEADER_SIZE
+    )
+    return header, records
+
+
+class TickRingWriter(object):
+    def __init__(self, instruments, name='fract', capacity=4096):
+        self.__logger = logging.getLogger(__name__)
+        self.__capacity = int(capacity)
+        self.__segments = dict()
+        self.__seqs = dict()
+        for i in instruments:
+            seg_name = _segment_name(name=name, instrument=i)
+            try:
+                shared_memory.SharedMemory(name=seg_name).unlink()
+                self.__logger.info(f'Unlink a stale ring:\t{seg_name}')
+            except FileNotFoundError:
+                pass
+            shm = shared_memory.SharedMemory(
+                name=seg_name, create=True,
+                size=(_HEADER_SIZE + TICK_DTYPE.itemsize * int(capacity))
+            )
+            np.ndarray(shape=(3,), dtype='<u8', buffer=shm.buf)[:] = [
+                0, int(capacity),
+                int.from_bytes(os.urandom(8), 'little') | 1
+            ]
+            _created.add(seg_name)
+            self.__segments[i] = shm
+            self.__seqs[i] = 0
+        self.__logger.info(f'Tick rings:\t{list(self.__segments)}')
+
+    def write(self, instrument, time_ns, bid, ask, tradeable=True):
+        buf = self.__segments[instrument].buf
+        seq = self.__seqs[instrument]
+        _record.pack_into(
+            buf, _HEADER_SIZE + _record.size * (seq % self.__capacity),
+            time_ns, bid, ask, tradeable
+        )
+        # the sequence is published after the record so readers never see
+        # a slot that is still being written
+        self.__seqs[instrument] = seq + 1
+        _seq.pack_into(buf, 0, seq + 1)
+
+    def close(self, unlink=True):
+        for shm in self.__segments.values():
+            shm.close()
+            if unlink:
+                shm.unlink()
+                _created.discard(shm.name)
+        self.__segments = dict()
+
+
+class TickRingReader(object):
+    def __init__(self, instruments, name='fract', check_sec=1):
+        self.__logger = logging.getLogger(__name__)
+        self.__name = name
+        self.__check_sec = float(check_sec)
+        self.__segments = {i: None for i in instruments}
+        self.__rings = dict()
+        self.__checked = dict()
+        self.cursors = dict()
+        self.dropped = {i: 0 for i in instruments}
+
+    def _attach(self, instrument, cursor=None):
+        seg_name = _segment_name(name=self.__name, instrument=instrument)
+        try:
+            shm = _open_segment(seg_name=seg_name)
+        except FileNotFoundError:
+            self.__logger.debug('No tick ring yet:\t%s', seg_name)
+            return False
+        self.__segments[instrument] = shm
+        self.__rings[instrument] = _ring_views(buf=shm.buf)
+        self.cursors[instrument] = (
+            int(self.__rings[instrument][0][0]) if cursor is None else cursor
+        )
+        self.__checked[instrument] = time.monotonic()
+        self.__logger.info(f'Attach a tick ring:\t{seg_name}')
+        return True
+
+    def _detach(self, instrument):
+        self.__rings.pop(instrument, None)
+        shm = self.__segments[instrument]
+        if shm:
+            shm.close()
+        self.__segments[instrument] = None
+
+    def _is_replaced(self, instrument):
+        # a restarted writer unlinks the old segment and creates a new one,
+        # which is only visible by opening the name again
+        header = self.__rings[instrument][0]
+        now = time.monotonic()
+        if (int(header[0]) != self.cursors[instrument]
+                or now - self.__checked[instrument] < self.__check_sec):
+            return False
+        self.__checked[instrument] = now
+        try:
+            shm = _open_segment(
+                seg_name=_segment_name(name=self.__name, instrument=instrument)
+            )
+        except FileNotFoundError:
+            return False
+        generation = _ring_views(buf=shm.buf)[0][2]
+        shm.close()
+        return int(generation) != int(header[2])
+
+    def read(self, instrument):
+        if instrument not in self.__rings and not self._attach(instrument):
+            return np.empty(0, dtype=TICK_DTYPE)
+        elif self._is_replaced(instrument):
+            self.__logger.warning(f'Re-attach a replaced ring:\t{instrument}')
+            self._detach(instrument)
+            if not self._attach(instrument, cursor=0):
+                return np.empty(0, dtype=TICK_DTYPE)
+        header, records = self.__rings[instrument]
+        capacity = len(records)
+        cursor = self.cursors[instrument]
+        seq = int(header[0])
+        # the slot after the latest one may be under rewrite at any time,
+        # so at most capacity - 1 records are safe to copy
+        if seq - cursor >= capacity:
+            self.dropped[instrument] += seq - cursor - capacity + 1
+            cursor = seq - capacity + 1
+        idx = np.arange(cursor, seq) % capacity
+        ticks = records[idx]
+        overrun = int(header[0]) + 1 - capacity - cursor
+        if overrun > 0:
+            self.dropped[instrument] += overrun
+            ticks = ticks[overrun:]
+        self.cursors[instrument] = seq
+        return ticks
+
+    def close(self):
+        for i in self.__segments:
+            self._detach(instrument=i)
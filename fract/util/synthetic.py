@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+import logging
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .candle import granularity2offset
+
+# approximate values in USD used to derive synthetic cross rates
+CURRENCY_VALUES = {
+    'AUD': 0.7, 'CAD': 0.75, 'CHF': 1.05, 'CNH': 0.14, 'CZK': 0.044,
+    'DKK': 0.147, 'EUR': 1.1, 'GBP': 1.3, 'HKD': 0.128, 'HUF': 0.0028,
+    'INR': 0.012, 'JPY': 0.009, 'MXN': 0.05, 'NOK': 0.1, 'NZD': 0.65,
+    'PLN': 0.25, 'SAR': 0.27, 'SEK': 0.1, 'SGD': 0.74, 'THB': 0.03,
+    'TRY': 0.05, 'USD': 1.0, 'ZAR': 0.055
+}
+
+
+def currency_price(instrument):
+    base, quote = instrument.split('_')
+    return CURRENCY_VALUES[base] / CURRENCY_VALUES[quote]
+
+
+def display_precision(price):
+    return max(5 - max(int(np.floor(np.log10(price))), 0), 1)
+
+
+def seed_for(*keys):
+    return zlib.crc32('|'.join(map(str, keys)).encode())
+
+
+def generate_candle_df(count=5000, granularity='S5', price=1.1,
+                       volatility=1e-4, spread_ratio=1e-4, end_time=None,
+                       seed=None):
+    rng = np.random.default_rng(seed)
+    offset = granularity2offset(granularity)
+    cum_lr = np.cumsum(
+        rng.normal(
+            0, volatility * np.sqrt(offset.total_seconds() / 5), int(count)
+        )
+    )
+    mid = price * np.exp(cum_lr - cum_lr[-1])
+    half_spread = mid * spread_ratio * rng.uniform(0.25, 0.75, mid.size)
+    end = pd.Timestamp(end_time or pd.Timestamp.now(tz='UTC')).floor(offset)
+    return pd.DataFrame(
+        {
+            'bid': mid - half_spread, 'ask': mid + half_spread,
+            'volume': rng.integers(1, 100, mid.size)
+        },
+        index=pd.date_range(
+            end=end, periods=mid.size, freq=offset, name='time'
+        )
+    )
+
+
+def generate_tick_df(count=5000, price=1.1, volatility=2e-5,
+                     spread_ratio=1e-4, mean_interval_sec=0.5, end_time=None,
+                     seed=None):
+    rng = np.random.default_rng(seed)
+    delta_sec = rng.exponential(mean_interval_sec, int(count))
+    cum_lr = np.cumsum(rng.normal(0, volatility, int(count)))
+    mid = price * np.exp(cum_lr - cum_lr[-1])
+    half_spread = mid * spread_ratio * rng.uniform(0.25, 0.75, mid.size)
+    end = pd.Timestamp(end_time or pd.Timestamp.now(tz='UTC'))
+    return pd.DataFrame(
+        {'bid': mid - half_spread, 'ask': mid + half_spread},
+        index=pd.DatetimeIndex(
+            end - pd.to_timedelta(
+                np.cumsum(delta_sec[::-1])[::-1] - delta_sec[-1], unit='s'
+            ),
+            name='time'
+        )
+    )
+
+
+class SimulatedClock(object):
+    def __init__(self, start=None, step_sec=5):
+        self.t = float(time.time() if start is None else start)
+        self.step_sec = float(step_sec)
+
+    def __call__(self):
+        return self.t
+
+    def advance(self):
+        self.t += self.step_sec
+        return self.t
+
+
+class SyntheticMarket(object):
+    def __init__(self, instruments, df_rates=None, seed=0, volatility=1e-4,
+                 spread_ratio=1e-4, speed=1, clock=None):
+        self.__logger = logging.getLogger(__name__)
+        self.clock = (clock or time.time)
+        self.instruments = list(instruments)
+        self.__df_rates = df_rates or dict()
+        self.__seed = seed
+        self.__volatility = volatility
+        self.__spread_ratio = spread_ratio
+        self.__speed = float(speed)
+        self.__rngs = {
+            i: np.random.default_rng(seed_for(seed, i))
+            for i in self.instruments
+        }
+        self.__mids = {
+            i: (
+                self.__df_rates[i][['bid', 'ask']].iloc[0].mean()
+                if i in self.__df_rates else currency_price(i)
+            ) for i in self.instruments
+        }
+        self.__t0 = self.clock()
+        self.__last_step = {i: 0 for i in self.instruments}
+        self.__lock = threading.Lock()
+
+    def now(self):
+        return pd.Timestamp(
+            self.__t0 + (self.clock() - self.__t0) * self.__speed,
+            unit='s', tz='UTC'
+        )
+
+    def _step(self):
+        return int((self.clock() - self.__t0) * self.__speed / 5)
+
+    def price(self, instrument):
+        with self.__lock:
+            step = self._step()
+            if instrument in self.__df_rates:
+                df = self.__df_rates[instrument]
+                bid, ask = df[['bid', 'ask']].iloc[step % len(df)]
+            else:
+                n_new = step - self.__last_step[instrument]
+                if n_new > 0:
+                    self.__mids[instrument] *= np.exp(
+                        self.__rngs[instrument].normal(
+                            0, self.__volatility * np.sqrt(n_new)
+                        )
+                    )
+                    self.__last_step[instrument] = step
+                mid = self.__mids[instrument]
+                precision = display_precision(price=mid)
+                bid = round(mid * (1 - self.__spread_ratio / 2), precision)
+                ask = round(mid * (1 + self.__spread_ratio / 2), precision)
+        return {'time': self.now(), 'bid': bid, 'ask': ask}
+
+    def candle_df(self, instrument, granularity='S5', count=500):
+        p = self.price(instrument=instrument)
+        if instrument in self.__df_rates:
+            df = self.__df_rates[instrument]
+            return df.iloc[:((self._step() % len(df)) + 1)].resample(
+                granularity2offset(granularity)
+            ).agg(
+                {'bid': 'last', 'ask': 'last', 'volume': 'sum'}
+            ).dropna().tail(int(count))
+        else:
+            return generate_candle_df(
+                count=count, granularity=granularity,
+                price=(p['bid'] + p['ask']) / 2,
+                volatility=self.__volatility,
+                spread_ratio=self.__spread_ratio, end_time=p['time'],
+                seed=seed_for(self.__seed, instrument, granularity)
+            )
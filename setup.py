@@ -16,7 +16,7 @@ setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     url='https://github.com/dceoy/fract',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     include_package_data=True,
     install_requires=[
         'docopt', 'numpy', 'oanda-cli', 'pandas', 'pyyaml', 'redis',
@@ -33,5 +33,5 @@ setup(
         'Programming Language :: Python :: 3',
         'Topic :: Office/Business :: Financial :: Investment'
     ],
-    python_requires='>=3.6'
+    python_requires='>=3.8'
 )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+import fract
+from fract.model.standalone import StandaloneTrader
+from fract.util.archive import CandleArchive
+from fract.util.candle import CANDLE_DTYPE
+from fract.util.fakeapi import FakeV20Account, FakeV20Backend
+from fract.util.synthetic import SimulatedClock, SyntheticMarket
+
+
+def _records(times):
+    rec = np.zeros(len(times), dtype=CANDLE_DTYPE)
+    rec['time'] = times
+    rec['bid'] = 1.0
+    rec['ask'] = 1.1
+    rec['volume'] = 1
+    return rec
+
+
+def test_append_skips_candles_already_archived(tmp_path):
+    ca = CandleArchive(dir_path=tmp_path)
+    assert ca.append(
+        instrument='EUR_USD', granularity='M1', records=_records([1, 2, 3])
+    ) == 3
+    assert ca.append(
+        instrument='EUR_USD', granularity='M1',
+        records=_records([2, 3, 4, 5])
+    ) == 2
+    assert ca.append(
+        instrument='EUR_USD', granularity='M1', records=_records([5])
+    ) == 0
+    assert ca.read(instrument='EUR_USD', granularity='M1')[
+        'time'
+    ].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_append_truncates_a_torn_trailing_record(tmp_path):
+    ca = CandleArchive(dir_path=tmp_path)
+    ca.append(instrument='EUR_USD', granularity='M1', records=_records([1]))
+    path = ca.path(instrument='EUR_USD', granularity='M1')
+    with open(path, 'ab') as f:
+        f.write(_records([2]).tobytes()[:10])
+    assert ca.read(instrument='EUR_USD', granularity='M1')[
+        'time'
+    ].tolist() == [1]
+    ca.append(instrument='EUR_USD', granularity='M1', records=_records([3]))
+    assert path.stat().st_size == 2 * CANDLE_DTYPE.itemsize
+    assert ca.read(instrument='EUR_USD', granularity='M1')[
+        'time'
+    ].tolist() == [1, 3]
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock(start=1.6e9, step_sec=60)
+
+
+@pytest.fixture
+def trader(tmp_path, clock):
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        cf = yaml.safe_load(f)
+    cf['feature']['granularities'] = ['M1']
+    t = StandaloneTrader(
+        model='ewma', config_dict=cf, instruments=['EUR_USD'],
+        interval_sec=0, timeout_sec=None,
+        candle_archive_path=str(tmp_path.joinpath('archive')),
+        fake_backend=FakeV20Backend(
+            account=FakeV20Account(
+                account_id=cf['oanda']['account_id'],
+                market=SyntheticMarket(
+                    instruments=['EUR_USD'],
+                    clock=clock
+                )
+            )
+        ),
+        quiet=True, dry_run=True
+    )
+    t.metrics.enabled = True
+    yield t
+    t.shutdown()
+
+
+def _candle_results(trader):
+    return {
+        line.split('result="')[1].split('"')[0]: int(line.split()[-1])
+        for line in trader.metrics.render().splitlines()
+        if line.startswith('fract_cache_requests_total')
+        and 'cache="candle"' in line
+    }
+
+
+def test_archived_candles_hit_partial_and_miss(trader, clock):
+    frame = trader.fetch_candle_frame(
+        instrument='EUR_USD', granularity='M1', count=100
+    )
+    assert len(frame) == 100
+    assert _candle_results(trader) == {'miss': 1}
+    assert len(
+        trader.fetch_candle_frame(
+            instrument='EUR_USD', granularity='M1', count=100
+        )
+    ) == 100
+    assert _candle_results(trader) == {'miss': 1, 'hit': 1}
+    for _ in range(3):
+        clock.advance()
+    frame = trader.fetch_candle_frame(
+        instrument='EUR_USD', granularity='M1', count=100
+    )
+    assert _candle_results(trader) == {'miss': 1, 'hit': 1, 'partial': 1}
+    assert len(frame) == 100
+    assert np.diff(frame.time).tolist() == [60 * 10**9] * 99
+    assert frame.time[-1] == int(clock() // 60 * 60 * 10**9)
+    trader.fetch_candle_frame(
+        instrument='EUR_USD', granularity='M1', count=200
+    )
+    assert _candle_results(trader)['miss'] == 2
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+import fract
+from fract.model.backtest import Backtester
+
+
+@pytest.fixture
+def cf():
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        return yaml.safe_load(f)
+
+
+def _bars(mid, sig_dir, step_sec=1):
+    mid = np.asarray(mid, dtype=float)
+    return {
+        'sig_dir': np.asarray(sig_dir, dtype=np.int8), 'bid': mid,
+        'ask': mid, 't_sec': np.arange(mid.size, dtype=float) * step_sec,
+        'awake': np.ones(mid.size, dtype=bool),
+        'over_spread': np.zeros(mid.size, dtype=bool)
+    }
+
+
+@pytest.mark.parametrize(
+    'mid, sig_dir, side, step_sec, exit_index, exit_price, reason', [
+        (
+            [100, 100.5, 101.2, 100], [1, 1, 1, 1], 1, 1,
+            2, 101, 'TAKE_PROFIT'
+        ),
+        ([100, 99.5, 98.8, 100], [1, 1, 1, 1], 1, 1, 2, 99, 'STOP_LOSS'),
+        ([100, 100.5, 101.2, 100], [-1, -1, -1, -1], -1, 1,
+         2, 101, 'STOP_LOSS'),
+        ([100, 99.5, 98.9, 100], [-1, -1, -1, -1], -1, 1,
+         2, 99, 'TAKE_PROFIT'),
+        (
+            [100, 100.9, 100.8, 100.7, 100.6, 100.5, 99.85, 99.5],
+            [1] * 8, 1, 1, 6, 100.9 - 1, 'TRAILING_STOP_LOSS'
+        ),
+        ([100] * 6, [1, 0, 0, 0, 0, 0], 1, 100, 4, 100, 'POSITION EXPIRED'),
+        ([100] * 6, [1, 1, 1, -1, 1, 1], 1, 1, 3, 100, 'REVERSING'),
+        ([100] * 6, [1] * 6, 1, 1, 5, 100, 'END')
+    ]
+)
+def test_find_exit(cf, mid, sig_dir, side, step_sec, exit_index, exit_price,
+                   reason):
+    backtester = Backtester(config_dict=cf, chunk_size=2)
+    bars = _bars(mid=mid, sig_dir=sig_dir, step_sec=step_sec)
+    j, price, r = backtester._find_exit(
+        bars=bars, entry_index=0, side=side, mult=1,
+        limits=backtester._design_limits(price=100, side=side)
+    )
+    assert (j, r) == (exit_index, reason)
+    assert price == pytest.approx(exit_price)
+
+
+def test_find_exit_closes_on_an_opposite_signal_while_asleep(cf):
+    backtester = Backtester(config_dict=cf)
+    bars = _bars(mid=[100] * 4, sig_dir=[1, 1, -1, -1])
+    bars['awake'][2:] = False
+    assert backtester._find_exit(
+        bars=bars, entry_index=0, side=1, mult=1,
+        limits=backtester._design_limits(price=100, side=1)
+    ) == (2, 100, 'CLOSING')
+
+
+@pytest.mark.parametrize(
+    'position_side, side, exit_price, reason', [
+        ('follower', 1, 101, 'TAKE_PROFIT'),
+        ('contrarian', -1, 101, 'STOP_LOSS')
+    ]
+)
+def test_simulate(cf, position_side, side, exit_price, reason):
+    cf['position']['side'] = position_side
+    backtester = Backtester(config_dict=cf)
+    bars = _bars(
+        mid=[100, 100, 100.5, 101.5, 101.5, 101.5],
+        sig_dir=[0, 1, 1, 0, 0, 0]
+    )
+    trades = backtester._simulate(bars=bars)
+    assert len(trades) == 1
+    j, exit_j, s, units, entry, price, pl, r = trades[0]
+    assert (j, exit_j, s, r) == (1, 3, side, reason)
+    assert units == backtester._design_units(
+        balance=1000000, price=100, txns=list()
+    ) > 0
+    assert (entry, price) == (100, exit_price)
+    assert pl == pytest.approx(units * side * (exit_price - 100))
+
+
+def test_simulate_skips_sleeping_and_wide_spread_bars(cf):
+    backtester = Backtester(config_dict=cf)
+    bars = _bars(mid=[100] * 5, sig_dir=[1, 1, 1, 0, 0])
+    bars['awake'][0] = False
+    bars['over_spread'][1] = True
+    trades = backtester._simulate(bars=bars)
+    assert [(t[0], t[1], t[7]) for t in trades] == [(2, 4, 'END')]
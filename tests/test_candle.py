@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+
+import pandas as pd
+
+from fract.util.candle import read_candle_df
+
+
+def test_read_candle_df_indexes_naive_times_as_utc(tmp_path):
+    csv = tmp_path.joinpath('candle.csv')
+    pd.DataFrame({
+        'time': ['2020-01-01 00:00:05', '2020-01-01 00:00:00'],
+        'closeBid': [1.1, 1.0], 'closeAsk': [1.2, 1.1], 'volume': [3, 2]
+    }).to_csv(csv, index=False)
+    df = read_candle_df(data_path=csv)
+    assert str(df.index.tz) == 'UTC'
+    assert df.index.tz_convert('UTC').asi8.tolist() == [
+        1577836800000000000, 1577836805000000000
+    ]
+    assert df['bid'].tolist() == [1.0, 1.1]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+import yaml
+
+import fract
+from fract.model.standalone import StandaloneTrader
+from fract.util.checkpoint import MAGIC, read_checkpoint, write_checkpoint
+from fract.util.fakeapi import FakeV20Account, FakeV20Backend
+from fract.util.synthetic import SimulatedClock, SyntheticMarket
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path.joinpath('fract.ckpt')
+    arrays = {
+        'txn.id': np.arange(5, dtype='<i8'),
+        'txn.instrument': np.array([b'EUR_USD'] * 5, dtype='S16'),
+        'txn.pl': np.linspace(-1, 1, 5),
+        'tick.EUR_USD.bid': np.ones((2, 3), dtype='<f4'),
+        'empty': np.empty(0, dtype='<f8')
+    }
+    write_checkpoint(path=path, meta={'last_txn_id': '5'}, arrays=arrays)
+    meta, loaded = read_checkpoint(path=path)
+    assert meta == {'last_txn_id': '5'}
+    assert list(loaded) == list(arrays)
+    for k, a in arrays.items():
+        assert loaded[k].dtype == a.dtype
+        np.testing.assert_array_equal(loaded[k], a)
+
+
+def test_round_trip_of_empty_arrays(tmp_path):
+    path = tmp_path.joinpath('fract.ckpt')
+    write_checkpoint(
+        path=path, meta=dict(),
+        arrays={'txn.id': np.empty(0, dtype='<i8'), 'txn.pl': np.empty(0)}
+    )
+    _, loaded = read_checkpoint(path=path)
+    assert {k: len(a) for k, a in loaded.items()} == {'txn.id': 0, 'txn.pl': 0}
+
+
+@pytest.mark.parametrize(
+    'corrupt', [
+        lambda b: struct.pack('<8sII', MAGIC, 99, 0) + b[16:],
+        lambda b: b'NOTFRACT' + b[8:],
+        lambda b: b[:10],
+        lambda b: b[:40],
+        lambda b: b[:-8],
+        lambda b: b''
+    ]
+)
+def test_invalid_checkpoint_is_rejected(tmp_path, corrupt):
+    path = tmp_path.joinpath('fract.ckpt')
+    write_checkpoint(
+        path=path, meta={'k': 'v'}, arrays={'a': np.arange(8, dtype='<i8')}
+    )
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(corrupt(data))
+    with pytest.raises(ValueError):
+        read_checkpoint(path=path)
+
+
+def test_trader_state_round_trip(tmp_path):
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        cf = yaml.safe_load(f)
+    cf['feature']['granularities'] = ['M1']
+    path = str(tmp_path.joinpath('fract.ckpt'))
+
+    def _trader():
+        return StandaloneTrader(
+            model='ewma', config_dict=cf, instruments=['EUR_USD'],
+            interval_sec=0, timeout_sec=None, checkpoint_path=path,
+            fake_backend=FakeV20Backend(
+                account=FakeV20Account(
+                    account_id=cf['oanda']['account_id'],
+                    market=SyntheticMarket(
+                        instruments=['EUR_USD'],
+                        clock=SimulatedClock(step_sec=5)
+                    )
+                )
+            ),
+            quiet=True, dry_run=True
+        )
+
+    trader = _trader()
+    trader.pos_dict = {
+        'EUR_USD': {
+            'side': 'long', 'units': 1000,
+            'dt': datetime(2020, 1, 2, 3, 4, 5)
+        }
+    }
+    trader.txn_list = [
+        {'id': '7', 'instrument': 'EUR_USD', 'units': '-1000', 'pl': '1.5'},
+        {'id': '8', 'type': 'HEARTBEAT'}
+    ]
+    trader.shutdown()
+    restored = _trader()
+    assert restored.pos_dict == trader.pos_dict
+    assert [
+        (t['id'], t['instrument'], float(t['units']), float(t['pl']))
+        for t in restored.txn_list
+    ] == [('7', 'EUR_USD', -1000, 1.5)]
+    restored.shutdown()
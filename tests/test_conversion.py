@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pytest
+
+from fract.util.conversion import ConversionIndex
+
+
+def _first_match_bp_value(instrument, prices, account_currency):
+    base, quote = instrument.split('_')
+    acc = account_currency
+    if base == acc:
+        return 1 / prices[instrument]
+    elif quote == acc:
+        return prices[instrument]
+    else:
+        for i in prices:
+            if i == f'{base}_{acc}':
+                return prices[i]
+            elif i == f'{acc}_{base}':
+                return 1 / prices[i]
+            elif i == f'{quote}_{acc}':
+                return prices[instrument] * prices[i]
+            elif i == f'{acc}_{quote}':
+                return prices[instrument] / prices[i]
+
+
+@pytest.mark.parametrize(
+    'instrument, prices', [
+        ('USD_JPY', {'USD_JPY': 151.2}),
+        ('EUR_USD', {'EUR_USD': 1.085}),
+        ('EUR_GBP', {'EUR_GBP': 0.855, 'EUR_USD': 1.085}),
+        ('CHF_JPY', {'CHF_JPY': 170.1, 'USD_CHF': 0.889}),
+        ('EUR_GBP', {'EUR_GBP': 0.855, 'GBP_USD': 1.269}),
+        ('EUR_JPY', {'EUR_JPY': 164.1, 'USD_JPY': 151.2}),
+        (
+            'EUR_GBP',
+            {'EUR_GBP': 0.855, 'GBP_USD': 1.269, 'EUR_USD': 1.085}
+        ),
+        (
+            'AUD_JPY',
+            {'AUD_JPY': 99.8, 'USD_JPY': 151.2, 'AUD_USD': 0.66}
+        )
+    ]
+)
+def test_bp_values_match_the_first_match_rules(instrument, prices):
+    index = ConversionIndex(
+        instruments=list(prices), account_currency='USD',
+        targets={instrument}
+    )
+    assert index.targets == [instrument]
+    assert index.bp_values(prices=list(prices.values()))[0] == pytest.approx(
+        _first_match_bp_value(
+            instrument=instrument, prices=prices, account_currency='USD'
+        )
+    )
+
+
+def test_bp_values_convert_over_two_hops():
+    prices = {'AUD_NZD': 1.09, 'NZD_CAD': 0.83, 'USD_CAD': 1.36}
+    index = ConversionIndex(
+        instruments=list(prices), account_currency='USD',
+        targets={'AUD_NZD'}
+    )
+    assert index.bp_values(prices=list(prices.values()))[0] == pytest.approx(
+        prices['AUD_NZD'] * prices['NZD_CAD'] / prices['USD_CAD']
+    )
+
+
+def test_bp_values_are_nan_without_a_needed_price():
+    index = ConversionIndex(
+        instruments=['EUR_GBP', 'GBP_USD', 'USD_JPY'], account_currency='USD'
+    )
+    bpvs = index.bp_values(prices=[0.855, np.nan, 151.2])
+    assert np.isnan(bpvs[:2]).all()
+    assert bpvs[2] == pytest.approx(1 / 151.2)
+
+
+def test_unconvertible_instrument_is_rejected():
+    with pytest.raises(ValueError):
+        ConversionIndex(instruments=['EUR_GBP'], account_currency='USD')
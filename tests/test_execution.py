@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import threading
+
+from fract.util.execution import OrderExecutor
+
+
+class _BlockingExecute(object):
+    def __init__(self):
+        self.calls = list()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, step, side=None, instrument=None):
+        self.calls.append((instrument, step, side))
+        if len(self.calls) == 1:
+            self.started.set()
+            self.release.wait(timeout=5)
+
+
+def _start_blocked(executor, execute):
+    executor.submit(instrument='BLOCK', steps=[('open', 'long')], version=0)
+    assert execute.started.wait(timeout=5)
+
+
+def _finish(executor, execute):
+    execute.release.set()
+    assert executor.join(timeout=5)
+    executor.shutdown()
+    return execute.calls[1:]
+
+
+def test_close_runs_before_open():
+    execute = _BlockingExecute()
+    executor = OrderExecutor(execute=execute)
+    _start_blocked(executor=executor, execute=execute)
+    executor.submit(instrument='A', steps=[('open', 'long')], version=0)
+    executor.submit(instrument='B', steps=[('close',)], version=0)
+    assert _finish(executor=executor, execute=execute) == [
+        ('B', 'close', None), ('A', 'open', 'long')
+    ]
+
+
+def test_newest_signal_wins():
+    execute = _BlockingExecute()
+    executor = OrderExecutor(execute=execute)
+    _start_blocked(executor=executor, execute=execute)
+    executor.submit(instrument='A', steps=[('open', 'long')], version=0)
+    executor.submit(instrument='A', steps=[('open', 'short')], version=0)
+    executor.submit(instrument='B', steps=[('open', 'long')], version=0)
+    executor.submit(instrument='B', steps=list(), version=0)
+    assert _finish(executor=executor, execute=execute) == [
+        ('A', 'open', 'short')
+    ]
+
+
+def test_stale_version_is_dropped():
+    execute = _BlockingExecute()
+    executor = OrderExecutor(execute=execute)
+    _start_blocked(executor=executor, execute=execute)
+    executor.submit(instrument='A', steps=[('open', 'long')], version=1)
+    # decided before the in-flight order for the same instrument completed
+    executor.submit(instrument='BLOCK', steps=[('close',)], version=0)
+    assert _finish(executor=executor, execute=execute) == list()
+    assert executor.versions() == {'BLOCK': 1}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from fract.util.fakeapi import FakeV20Account, FakeV20Backend, FakeV20Server
+from fract.util.synthetic import SimulatedClock, SyntheticMarket
+
+ACCOUNT_ID = '101-001-0000000-001'
+PATH = f'/v3/accounts/{ACCOUNT_ID}'
+
+
+@pytest.fixture
+def backend():
+    return FakeV20Backend(
+        account=FakeV20Account(
+            account_id=ACCOUNT_ID,
+            market=SyntheticMarket(
+                instruments=['EUR_USD', 'USD_JPY'],
+                clock=SimulatedClock(step_sec=5)
+            )
+        )
+    )
+
+
+def test_account_routes(backend):
+    status, data = backend.handle(method='GET', path='/v3/accounts')
+    assert status == 200
+    assert data['accounts'][0]['id'] == ACCOUNT_ID
+    status, data = backend.handle(method='GET', path=PATH)
+    assert status == 200
+    assert float(data['account']['balance']) == 100000
+    assert data['account']['positions'] == list()
+    status, _ = backend.handle(method='GET', path='/v3/accounts/unknown')
+    assert status == 404
+    status, _ = backend.handle(method='DELETE', path=PATH)
+    assert status == 404
+
+
+def test_order_and_close_routes(backend):
+    status, data = backend.handle(
+        method='POST', path=f'{PATH}/orders',
+        body={'order': {'instrument': 'EUR_USD', 'units': '1000'}}
+    )
+    assert status == 201
+    assert data['orderFillTransaction']['units'] == '1000'
+    assert data['lastTransactionID'] == '2'
+    _, data = backend.handle(method='GET', path=PATH)
+    assert data['account']['positions'][0]['long']['units'] == '1000'
+    status, _ = backend.handle(
+        method='PUT', path=f'{PATH}/positions/EUR_USD/close',
+        body={'longUnits': 'NONE'}
+    )
+    assert status == 400
+    status, data = backend.handle(
+        method='PUT', path=f'{PATH}/positions/EUR_USD/close',
+        body={'longUnits': 'ALL'}
+    )
+    assert status == 200
+    assert data['longOrderFillTransaction']['units'] == '-1000'
+    assert backend.account.positions == dict()
+    status, data = backend.handle(
+        method='GET', path=f'{PATH}/transactions/sinceid', params={'id': '2'}
+    )
+    assert status == 200
+    assert [t['id'] for t in data['transactions']] == ['3', '4']
+
+
+def test_market_data_routes(backend):
+    status, data = backend.handle(
+        method='GET', path='/v3/instruments/USD_JPY/candles',
+        params={'granularity': 'M1', 'count': '10'}
+    )
+    assert status == 200
+    assert data['granularity'] == 'M1'
+    assert len(data['candles']) == 10
+    assert all(c['complete'] for c in data['candles'])
+    status, data = backend.handle(
+        method='GET', path=f'{PATH}/pricing',
+        params={'instruments': 'EUR_USD,USD_JPY'}
+    )
+    assert status == 200
+    assert [p['instrument'] for p in data['prices']] == [
+        'EUR_USD', 'USD_JPY'
+    ]
+    for p in data['prices']:
+        assert float(p['closeoutBid']) < float(p['closeoutAsk'])
+
+
+def test_server_rate_limit(backend):
+    server = FakeV20Server(backend=backend, port=0, rate_limit=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_address[1]}{PATH}/summary'
+    try:
+        with urllib.request.urlopen(url) as res:
+            assert res.status == 200
+            assert json.load(res)['account']['id'] == ACCOUNT_ID
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(url)
+        assert e.value.code == 429
+        assert json.load(e.value)['errorMessage'] == 'Rate limit exceeded'
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pytest
+
+from fract.model.feature import LogReturnFeature
+from fract.util.kalmanfilter import KalmanFilter, KalmanFilterOptimizer
+from fract.util.synthetic import generate_candle_df
+
+TOLERANCE = 1e-8
+
+
+def _series(count, seed):
+    return LogReturnFeature(type='LR Velocity').series(
+        df_rate=generate_candle_df(count=(count + 1), seed=seed)
+    ).dropna()
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('count', [500, 5000])
+@pytest.mark.parametrize('pmv_ratio', [1e-3, 1, 1e3])
+def test_steady_state_loss_error(seed, count, pmv_ratio):
+    y = _series(count=count, seed=seed)
+    log_var = np.log(np.var(y))
+    for a in np.linspace(log_var - 10, log_var + 5, 16):
+        exact, fast = [
+            KalmanFilterOptimizer._loss(
+                a, y, 0, 1e-8, pmv_ratio, steady_state=s
+            ) for s in [False, True]
+        ]
+        assert fast == pytest.approx(exact, rel=TOLERANCE)
+
+
+@pytest.mark.parametrize('q, r', [(1e-10, 1e-6), (1e-8, 1e-8), (1e-6, 1e-9)])
+def test_steady_state_fit(q, r):
+    y = _series(count=1000, seed=0)
+    exact, fast = [
+        KalmanFilter(q=q, r=r, steady_state=s).fit(y=y) for s in [False, True]
+    ]
+    for k in ['x', 'v']:
+        np.testing.assert_allclose(
+            fast[k], exact[k], rtol=0,
+            atol=(TOLERANCE * np.abs(exact[k]).max())
+        )
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import queue
+
+from fract.util.logger import JsonLinesFormatter, _DeferredQueueHandler
+
+
+def test_json_lines_keep_tracebacks_through_the_queue():
+    q = queue.SimpleQueue()
+    logger = logging.getLogger('test_json_lines')
+    logger.addHandler(_DeferredQueueHandler(q))
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception('failed')
+    finally:
+        logger.handlers.clear()
+    d = json.loads(JsonLinesFormatter().format(q.get_nowait()))
+    assert d['message'] == 'failed'
+    assert 'ValueError: boom' in d['exc_info']
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+from types import SimpleNamespace
+
+import pytest
+
+from fract.util.metrics import MetricsRegistry
+
+
+class _Api(object):
+    def __init__(self, status):
+        self.status = status
+
+    def request(self, req):
+        if self.status is None:
+            raise ConnectionError('refused')
+        else:
+            return SimpleNamespace(status=self.status)
+
+
+def _req():
+    return SimpleNamespace(method='GET', base_path='/v3/accounts/{accountID}')
+
+
+def test_instrument_api_counts_status_and_latency():
+    metrics = MetricsRegistry()
+    api = metrics.instrument_api(_Api(status=200))
+    assert api.request(_req()).status == 200
+    api.request(_req())
+    failing = metrics.instrument_api(_Api(status=None))
+    with pytest.raises(ConnectionError):
+        failing.request(_req())
+    lines = metrics.render().splitlines()
+    labels = 'endpoint="/v3/accounts/{accountID}",method="GET"'
+    assert f'fract_api_requests_total{{{labels},status="200"}} 2' in lines
+    assert f'fract_api_requests_total{{{labels},status="error"}} 1' in lines
+    assert f'fract_api_request_seconds_count{{{labels}}} 3' in lines
+    assert (
+        f'fract_api_request_seconds{{{labels},quantile="0.99"}}'
+        in '\n'.join(lines)
+    )
+
+
+def test_instrument_api_is_a_no_op_when_disabled():
+    api = _Api(status=200)
+    request = api.request
+    assert MetricsRegistry(enabled=False).instrument_api(api) is api
+    assert api.request == request
+
+
+def test_render_exposition_format():
+    metrics = MetricsRegistry(prefix='test')
+    metrics.inc('ticks_total', 3, instrument='EUR_USD')
+    metrics.set('cache_length', 10, instrument='EUR_USD')
+    metrics.set_state('state', 'OPEN', instrument='EUR_USD')
+    metrics.describe('custom', 'A custom gauge')
+    metrics.set('custom', 1.5, note='a "quoted"\nvalue')
+    assert metrics.render().splitlines() == [
+        '# HELP test_ticks_total Ticks ingested from the stream',
+        '# TYPE test_ticks_total counter',
+        'test_ticks_total{instrument="EUR_USD"} 3',
+        '# HELP test_cache_length Rows in the tick cache',
+        '# TYPE test_cache_length gauge',
+        'test_cache_length{instrument="EUR_USD"} 10',
+        '# HELP test_custom A custom gauge',
+        '# TYPE test_custom gauge',
+        'test_custom{note="a \\"quoted\\"\\nvalue"} 1.5',
+        '# HELP test_state Current trading state by instrument',
+        '# TYPE test_state gauge',
+        'test_state{instrument="EUR_USD",state="OPEN"} 1'
+    ]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+import pytest
+
+from fract.util.orderspec import OrderSpec
+
+USD_JPY = {
+    'displayPrecision': 3, 'minimumTrailingStopDistance': '0.050',
+    'maximumTrailingStopDistance': '100.000',
+    'maximumOrderUnits': '100000000', 'marginRate': '0.04'
+}
+EUR_USD = {
+    'displayPrecision': 5, 'minimumTrailingStopDistance': '0.00050',
+    'maximumTrailingStopDistance': '1.00000',
+    'maximumOrderUnits': '1000', 'marginRate': '0.02'
+}
+
+
+def _spec(instrument, inst_entry, tp=0.01, sl=0.01, ts=0.01):
+    return OrderSpec(
+        instrument=instrument, inst_entry=inst_entry,
+        position_config={
+            'limit_price_ratio': {
+                'take_profit': tp, 'stop_loss': sl, 'trailing_stop': ts
+            },
+            'margin_nav_ratio': {'unit': 0.01, 'init': 0.02, 'preserve': 0.04}
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    'instrument, inst_entry, price, side, tp, sl, ts', [
+        ('USD_JPY', USD_JPY, 151.234, 'long', '152.746', '149.722', '1.500'),
+        ('USD_JPY', USD_JPY, 151.234, 'short', '149.722', '152.746', '1.500'),
+        (
+            'EUR_USD', EUR_USD, 1.08567, 'long', '1.09653', '1.07481',
+            '0.01050'
+        )
+    ]
+)
+def test_limits_follow_display_precision(instrument, inst_entry, price, side,
+                                         tp, sl, ts):
+    limits = _spec(instrument=instrument, inst_entry=inst_entry).limits(
+        price=price, side=side
+    )
+    assert limits['takeProfitOnFill'] == {'price': tp, 'timeInForce': 'GTC'}
+    assert limits['stopLossOnFill'] == {'price': sl, 'timeInForce': 'GTC'}
+    assert limits['trailingStopLossOnFill'] == {
+        'distance': ts, 'timeInForce': 'GTC'
+    }
+
+
+@pytest.mark.parametrize(
+    'ts_ratio, distance', [(1e-6, '0.00050'), (0.9, '1.00000')]
+)
+def test_trailing_stop_is_clamped(ts_ratio, distance):
+    spec = _spec(instrument='EUR_USD', inst_entry=EUR_USD, ts=ts_ratio)
+    assert spec.limits(price=1.2, side='long')[
+        'trailingStopLossOnFill'
+    ]['distance'] == distance
+
+
+def test_sizes():
+    spec = _spec(instrument='EUR_USD', inst_entry=EUR_USD)
+    assert spec.sizes(balance=10000, margin_avail=1000, unit_cost=0.03) == {
+        'unit': 3334, 'init': 6667, 'avail': 20000
+    }
+    assert spec.sizes(
+        balance=10000, margin_avail=300, unit_cost=0.03
+    )['avail'] == 0
+
+
+@pytest.mark.parametrize(
+    'size, side, units', [
+        (300, 'long', '300'), (300, 'short', '-300'),
+        (5000, 'long', '1000'), (5000, 'short', '-1000')
+    ]
+)
+def test_units_are_capped_by_maximum_order_units(size, side, units):
+    spec = _spec(instrument='EUR_USD', inst_entry=EUR_USD)
+    assert spec.units(size=size, side=side) == units
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import pytest
+
+from fract.util.conversion import ConversionIndex
+from fract.util.paper import PaperBroker
+
+MARGIN_RATE = 0.04
+
+
+def _update(broker, prices):
+    index = ConversionIndex(instruments=list(prices), account_currency='USD')
+    bpvs = index.bp_values(prices=list(prices.values()))
+    broker.update(
+        prices={i: {'bid': p, 'ask': p} for i, p in prices.items()},
+        bp_values=dict(zip(index.targets, bpvs)),
+        margin_rates={i: MARGIN_RATE for i in prices}
+    )
+
+
+@pytest.mark.parametrize(
+    'instrument, prices_open, prices_close, pl, margin', [
+        (
+            'EUR_USD', {'EUR_USD': 1.10}, {'EUR_USD': 1.11},
+            100.0, 10000 * 1.11 * MARGIN_RATE
+        ),
+        (
+            'USD_JPY', {'USD_JPY': 110.0}, {'USD_JPY': 111.1},
+            10000 * 1.1 / 111.1, 10000 * MARGIN_RATE
+        ),
+        (
+            'EUR_GBP', {'EUR_GBP': 0.85, 'GBP_USD': 1.30},
+            {'EUR_GBP': 0.86, 'GBP_USD': 1.30},
+            130.0, 10000 * 0.86 * 1.30 * MARGIN_RATE
+        )
+    ]
+)
+def test_paper_pl_and_margin(instrument, prices_open, prices_close, pl,
+                             margin):
+    broker = PaperBroker()
+    broker.open_account(balance=100000, currency='USD')
+    _update(broker=broker, prices=prices_open)
+    status, _ = broker.create_order({'instrument': instrument, 'units': 10000})
+    assert status == 201
+    _update(broker=broker, prices=prices_close)
+    account = broker.account_dict()
+    assert account['unrealizedPL'] == pytest.approx(pl)
+    assert account['marginUsed'] == pytest.approx(margin)
+    status, res = broker.close_position(instrument=instrument)
+    assert status == 200
+    assert float(res['longOrderFillTransaction']['pl']) == pytest.approx(
+        pl, abs=1e-4
+    )
+    assert broker.balance == pytest.approx(100000 + pl)
+
+
+@pytest.mark.parametrize(
+    'units, on_fill, path, reason', [
+        (
+            10000, {'takeProfitOnFill': {'price': '1.1050'}},
+            [1.1020, 1.1060], 'TAKE_PROFIT_ORDER'
+        ),
+        (
+            10000, {'stopLossOnFill': {'price': '1.0950'}},
+            [1.0980, 1.0940], 'STOP_LOSS_ORDER'
+        ),
+        (
+            -10000, {'takeProfitOnFill': {'price': '1.0950'}},
+            [1.0980, 1.0940], 'TAKE_PROFIT_ORDER'
+        ),
+        (
+            -10000, {'stopLossOnFill': {'price': '1.1050'}},
+            [1.1020, 1.1060], 'STOP_LOSS_ORDER'
+        ),
+        (
+            10000, {'trailingStopLossOnFill': {'distance': '0.0030'}},
+            [1.1040, 1.1020, 1.1005], 'TRAILING_STOP_LOSS_ORDER'
+        ),
+        (
+            -10000, {'trailingStopLossOnFill': {'distance': '0.0030'}},
+            [1.0960, 1.0980, 1.0995], 'TRAILING_STOP_LOSS_ORDER'
+        )
+    ]
+)
+def test_paper_exit_triggers(units, on_fill, path, reason):
+    broker = PaperBroker()
+    broker.open_account(balance=100000, currency='USD')
+    _update(broker=broker, prices={'EUR_USD': 1.1000})
+    status, _ = broker.create_order(
+        {'instrument': 'EUR_USD', 'units': units, **on_fill}
+    )
+    assert status == 201
+    for p in path[:-1]:
+        _update(broker=broker, prices={'EUR_USD': p})
+        assert 'EUR_USD' in broker.positions
+    _update(broker=broker, prices={'EUR_USD': path[-1]})
+    assert 'EUR_USD' not in broker.positions
+    fill = broker.txns[-1]
+    assert fill['reason'] == reason
+    assert int(fill['units']) == -units
+    assert float(fill['pl']) == pytest.approx(
+        (path[-1] - 1.1000) * units, abs=1e-4
+    )
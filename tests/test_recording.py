@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import os
+
+import pytest
+import yaml
+
+import fract
+from fract.call.replay import invoke_replay
+from fract.model.standalone import StandaloneTrader
+from fract.util.fakeapi import INSTRUMENTS, FakeV20Account, FakeV20Backend
+from fract.util.recording import (RecordingExhausted, SessionPlayer,
+                                  SessionRecorder)
+from fract.util.synthetic import SimulatedClock, SyntheticMarket
+
+
+@pytest.fixture
+def cf():
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        cf = yaml.safe_load(f)
+    cf['feature']['granularities'] = ['M1']
+    cf['feature']['cache'] = 100
+    cf['volatility']['sleeping'] = 0
+    cf['model']['ewma']['sigma_band'] = 0
+    return cf
+
+
+def test_replay_reproduces_recorded_decisions_and_orders(cf, tmp_path):
+    path = str(tmp_path.joinpath('session.json.gz'))
+    backend = FakeV20Backend(
+        account=FakeV20Account(
+            account_id=cf['oanda']['account_id'],
+            market=SyntheticMarket(
+                instruments=INSTRUMENTS, clock=SimulatedClock(step_sec=5)
+            )
+        )
+    )
+    trader = StandaloneTrader(
+        model='ewma', config_dict=cf, instruments=['EUR_USD', 'USD_JPY'],
+        interval_sec=0, timeout_sec=None, fake_backend=backend,
+        record_path=path, quiet=True
+    )
+    for _ in range(4):
+        trader._trade_once()
+    trader.shutdown()
+    assert [t['type'] for t in backend.account.txns].count('ORDER_FILL')
+    player = SessionPlayer(path=path)
+    meta = player.meta
+    player.close()
+    trader = StandaloneTrader(
+        model=meta['model'], config_dict=meta['config'],
+        instruments=meta['instruments'], interval_sec=0, timeout_sec=None,
+        replay_path=path, quiet=True
+    )
+    summary = trader.replay()
+    assert summary['turns'] == 4
+    assert summary['decisions'] == 8
+    assert summary['orders'] > 0
+    assert summary['decision_mismatches'] == 0
+    assert summary['order_mismatches'] == 0
+    invoke_replay(recording_path=path, quiet=True)
+
+
+def test_truncated_recording_is_exhausted(tmp_path):
+    path = tmp_path.joinpath('session.json.gz')
+    recorder = SessionRecorder(path=path)
+    recorder.write('meta', model='ewma')
+    for n in range(1000):
+        recorder.write('clock', t=f'2020-01-01T00:00:{n % 60:02d}')
+    recorder.close()
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:(len(data) // 2)])
+    player = SessionPlayer(path=path)
+    assert player.meta == {'model': 'ewma'}
+    n_read = 0
+    with pytest.raises(RecordingExhausted):
+        while True:
+            player.now()
+            n_read += 1
+    assert 0 < n_read < 1000
+    player.close()
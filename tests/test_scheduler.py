@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+import os
+
+import pandas as pd
+import pytest
+import yaml
+
+import fract
+from fract.model.kvs import RedisTrader
+from fract.model.standalone import StandaloneTrader
+from fract.util.fakeapi import INSTRUMENTS, FakeV20Account, FakeV20Backend
+from fract.util.scheduler import ActivityScheduler
+from fract.util.shmring import TickRingWriter
+from fract.util.synthetic import SimulatedClock, SyntheticMarket
+
+
+def test_priority_follows_position_and_band():
+    s = ActivityScheduler(instruments=['A', 'B', 'C'], max_period_sec=60)
+    assert s.observe(instrument='A', now=0, position=True) == 0
+    assert s.observe(instrument='B', now=0) == 60
+    near = {'sig_ewmbbl': -0.01, 'sig_ewmbbu': 1.0}
+    assert s.observe(instrument='C', now=0, sig=near) < 10
+    assert s.due(now=1) == ['A', 'C']
+    assert s.wait_sec(now=1) == 0
+
+
+@pytest.fixture
+def cf():
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        cf = yaml.safe_load(f)
+    cf['feature']['granularities'] = ['M1']
+    cf['feature']['cache'] = 100
+    cf['volatility']['sleeping'] = 0
+    cf['scheduler'] = {'max_period_sec': 60}
+    return cf
+
+
+@pytest.fixture
+def backend(cf):
+    return FakeV20Backend(
+        account=FakeV20Account(
+            account_id=cf['oanda']['account_id'],
+            market=SyntheticMarket(
+                instruments=INSTRUMENTS, clock=SimulatedClock(step_sec=5)
+            )
+        )
+    )
+
+
+@pytest.fixture
+def trader(cf, backend):
+    t = StandaloneTrader(
+        model='ewma', config_dict=cf, instruments=['EUR_USD'],
+        interval_sec=0, timeout_sec=None, fake_backend=backend, quiet=True,
+        dry_run=True
+    )
+    yield t
+    t.shutdown()
+
+
+def test_open_position_is_polled_without_new_ticks(trader):
+    trader._trade_once()
+    trader.pos_dict['EUR_USD'] = {
+        'side': 'long', 'units': 1, 'dt': pd.Timestamp.now()
+    }
+    trader._observe_activity(instrument='EUR_USD')
+    assert trader.scheduler.priorities['EUR_USD'] == 1
+
+
+def test_ring_trader_is_rescheduled_on_empty_tick_batches(cf, backend):
+    cf['scheduler'] = {'max_period_sec': 0}
+    name = f'fract_test_{os.getpid()}'
+    market = backend.market
+    writer = TickRingWriter(instruments=['EUR_USD'], name=name, capacity=64)
+    trader = RedisTrader(
+        model='ewma', config_dict=cf, instruments=['EUR_USD'],
+        shm_name=name, interval_sec=0, timeout_sec=None,
+        fake_backend=backend, quiet=True, dry_run=True
+    )
+    try:
+        trader._trade_once()
+        for _ in range(3):
+            p = market.price(instrument='EUR_USD')
+            writer.write(
+                instrument='EUR_USD',
+                time_ns=int(market.clock.advance() * 1e9), bid=p['bid'],
+                ask=p['ask']
+            )
+        trader._trade_once()
+        assert trader.scheduler.priorities['EUR_USD'] < 1
+        backend.account.fill(instrument='EUR_USD', units=1000)
+        trader._trade_once()
+        assert trader.pos_dict['EUR_USD']
+        assert trader.scheduler.priorities['EUR_USD'] == 1
+        backend.account.close(instrument='EUR_USD')
+        trader._trade_once()
+        assert not trader.pos_dict.get('EUR_USD')
+        assert trader.scheduler.priorities['EUR_USD'] < 1
+    finally:
+        trader.shutdown()
+        writer.close()
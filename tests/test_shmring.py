@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import os
+
+import pytest
+
+from fract.util.shmring import TickRingReader, TickRingWriter
+
+
+@pytest.fixture
+def name():
+    return f'fract_test_{os.getpid()}'
+
+
+def _write(writer, times):
+    for t in times:
+        writer.write(instrument='EUR_USD', time_ns=t, bid=1.1, ask=1.2)
+
+
+def test_reader_tracks_its_cursor_and_drops_overruns(name):
+    writer = TickRingWriter(instruments=['EUR_USD'], name=name, capacity=8)
+    reader = TickRingReader(instruments=['EUR_USD'], name=name)
+    try:
+        assert not len(reader.read(instrument='EUR_USD'))
+        _write(writer=writer, times=range(5))
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == [
+            0, 1, 2, 3, 4
+        ]
+        _write(writer=writer, times=range(5, 25))
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == list(
+            range(18, 25)
+        )
+        assert reader.dropped == {'EUR_USD': 13}
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reader_never_copies_the_slot_under_rewrite(name):
+    writer = TickRingWriter(instruments=['EUR_USD'], name=name, capacity=8)
+    reader = TickRingReader(instruments=['EUR_USD'], name=name)
+    try:
+        reader.read(instrument='EUR_USD')
+        _write(writer=writer, times=range(7))
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == list(
+            range(7)
+        )
+        assert reader.dropped == {'EUR_USD': 0}
+        _write(writer=writer, times=range(7, 15))
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == list(
+            range(8, 15)
+        )
+        assert reader.dropped == {'EUR_USD': 1}
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reader_follows_a_restarted_writer(name):
+    writer = TickRingWriter(instruments=['EUR_USD'], name=name, capacity=8)
+    reader = TickRingReader(instruments=['EUR_USD'], name=name, check_sec=0)
+    try:
+        reader.read(instrument='EUR_USD')
+        _write(writer=writer, times=range(3))
+        assert len(reader.read(instrument='EUR_USD')) == 3
+        new_writer = TickRingWriter(
+            instruments=['EUR_USD'], name=name, capacity=8
+        )
+        writer.close(unlink=False)
+        writer = new_writer
+        _write(writer=writer, times=[10, 11])
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == [10, 11]
+        _write(writer=writer, times=[12])
+        assert reader.read(instrument='EUR_USD')['time'].tolist() == [12]
+    finally:
+        reader.close()
+        writer.close()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+import fract
+from fract.model.ensemble import Ensemble
+from fract.model.ewma import Ewma
+from fract.util.candle import CandleFrame
+
+
+@pytest.fixture
+def cf():
+    with open(
+            os.path.join(
+                os.path.dirname(fract.__file__), 'static/default_fract.yml'
+            ), 'r'
+    ) as f:
+        return yaml.safe_load(f)
+
+
+def _history_by_instrument(granularities, seed=0):
+    rng = np.random.default_rng(seed)
+    history_by_instrument = dict()
+    for i, n in [('EUR_USD', 120), ('USD_JPY', 100), ('GBP_USD', 80)]:
+        history_by_instrument[i] = dict()
+        for g in granularities:
+            mid = np.exp(np.cumsum(rng.normal(0, 1e-3, size=n)))
+            spread = mid * rng.uniform(1e-5, 5e-5, size=n)
+            history_by_instrument[i][g] = CandleFrame(
+                time=(np.arange(n, dtype=np.int64) * 60 * 10**9),
+                bid=(mid - spread), ask=(mid + spread),
+                volume=rng.integers(1, 100, size=n), instrument=i,
+                granularity=g
+            )
+    return history_by_instrument
+
+
+@pytest.mark.parametrize('model', ['ewma', 'ewma,kalman'])
+@pytest.mark.parametrize('granularities', [['M1'], ['M1', 'M5']])
+def test_batched_signals_match_per_instrument(cf, model, granularities):
+    if model == 'ewma':
+        ai = Ewma(config_dict=cf)
+    else:
+        ai = Ensemble(config_dict=cf, models=model.split(','))
+    history_by_instrument = _history_by_instrument(
+        granularities=granularities
+    )
+    contrary_dict = {'EUR_USD': False, 'USD_JPY': True, 'GBP_USD': False}
+    sigs = ai.detect_signals(
+        history_by_instrument=history_by_instrument,
+        contrary_dict=contrary_dict
+    )
+    assert set(sigs) == set(history_by_instrument)
+    for i, h in history_by_instrument.items():
+        sig = ai.detect_signal(history_dict=h, contrary=contrary_dict[i])
+        assert sigs[i]['sig_act'] == sig['sig_act']
+        assert sigs[i]['granularity'] == sig['granularity']
+        for k, v in sig.items():
+            if k.startswith('sig_') and isinstance(v, float):
+                assert sigs[i][k] == pytest.approx(v, rel=1e-6, abs=1e-12)